@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
     name = 'accounts'
+
+    def ready(self):
+        # This import is used to register the exchange rate matrix signals
+        import accounts.signals
@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from accounts.models import CustomUser, UserNotes
+from inventory.models import InventoryHistoryEvent
 from shopping_list.models import UserShoppingList
 from allauth.account.admin import EmailAddress
 from core.views import get_exchange_rate
-import json
 
 
 class EmailAddressSerializer(serializers.ModelSerializer):
@@ -56,21 +56,24 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class UserHistorySerializer(serializers.ModelSerializer):
-    history = serializers.SerializerMethodField()
-
-    def get_history(self, obj):
-        history_list = (
-            json.loads(obj.history) if isinstance(obj.history, str) else obj.history
-        )
-        # Sort the history items by timestamp in descending order
-        sorted_history = sorted(
-            history_list, key=lambda x: x["timestamp"], reverse=True
-        )
-        return sorted_history
-
     class Meta:
-        model = CustomUser
-        fields = ["history"]
+        model = InventoryHistoryEvent
+        fields = [
+            "component_id",
+            "quantity_before",
+            "quantity_after",
+            "location_before",
+            "location_after",
+            "timestamp",
+        ]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Location keys are only present on entries that involve a location
+        if data["location_before"] is None and data["location_after"] is None:
+            del data["location_before"]
+            del data["location_after"]
+        return data
 
 
 class UserNotesSerializer(serializers.ModelSerializer):
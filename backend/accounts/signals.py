@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import ExchangeRate
+from core.exchange_rates import clear_rate_matrix
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_exchange_rate_matrix(sender, **kwargs):
+    # Other processes reload once their matrix TTL expires, this one right away
+    clear_rate_matrix()
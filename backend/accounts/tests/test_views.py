@@ -4,6 +4,14 @@ from accounts.models import CustomUser
 from allauth.account.models import EmailAddress
 from modules.models import Manufacturer, WantToBuildModules, BuiltModules, Module
 from accounts.models import UserNotes
+from datetime import timedelta
+from django.utils import timezone
+from inventory.history import (
+    build_history_event,
+    prune_inventory_history,
+    record_inventory_history,
+)
+from inventory.models import InventoryHistoryEvent
 from uuid import uuid4
 
 
@@ -180,3 +188,68 @@ class UserNotesViewTest(APITestCase):
         url = f"/api/user-notes/want-to-build/{uuid4()}/"
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Url: /api/get-user-history/
+# Frontend: useAuthenticatedUserHistory.js
+class GetUserHistoryTest(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        self.other_user = CustomUser.objects.create_user(
+            username="otheruser", password="testpassword"
+        )
+        start = timezone.now()
+        record_inventory_history(
+            [
+                build_history_event(
+                    user.id,
+                    uuid4(),
+                    index,
+                    index + 1,
+                    None,
+                    ["Shelf"] if index else None,
+                )
+                for user in (self.user, self.other_user)
+                for index in range(5)
+            ]
+        )
+        for event in InventoryHistoryEvent.objects.all():
+            event.timestamp = start + timedelta(minutes=event.quantity_before)
+            event.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/get-user-history/"
+
+    def test_history_is_paginated_newest_first(self):
+        response = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(
+            [entry["quantity_before"] for entry in response.data["history"]], [4, 3, 2]
+        )
+
+        response = self.client.get(
+            self.url, {"page_size": 3, "cursor": response.data["next_cursor"]}
+        )
+        history = response.data["history"]
+        self.assertEqual([entry["quantity_before"] for entry in history], [1, 0])
+        self.assertIsNone(response.data["next_cursor"])
+        # Entries without a location keep the legacy shape
+        self.assertEqual(history[0]["location_after"], ["Shelf"])
+        self.assertNotIn("location_after", history[1])
+
+    def test_prune_keeps_most_recent_events_per_user(self):
+        self.assertEqual(prune_inventory_history(keep=2), 6)
+        self.assertEqual(
+            sorted(
+                InventoryHistoryEvent.objects.filter(user=self.user).values_list(
+                    "quantity_before", flat=True
+                )
+            ),
+            [3, 4],
+        )
+        self.assertEqual(
+            InventoryHistoryEvent.objects.filter(user=self.other_user).count(), 2
+        )
@@ -14,7 +14,10 @@ from django.db.transaction import non_atomic_requests
 from django.contrib.auth.models import AnonymousUser
 from django.http import HttpResponse
 from .models import CustomUser, KofiPayment, UserNotes, WantToBuildModules, BuiltModules
+from core.pagination import InvalidCursor, paginate_by_cursor
 from core.views import get_exchange_rate
+from inventory.history import HISTORY_LIMIT
+from inventory.models import InventoryHistoryEvent
 from datetime import datetime, timedelta
 from django.utils.decorators import method_decorator
 from decimal import Decimal
@@ -71,9 +74,41 @@ def get_user_me(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_user_history(request):
-    user = request.user
-    serializer = UserHistorySerializer(user)
-    return Response(serializer.data)
+    """
+    Return the user's inventory history, newest first. Pages hold up to
+    `page_size` events (default and maximum HISTORY_LIMIT); pass the returned
+    next_cursor as `cursor` to get the following page.
+    """
+    try:
+        page_size = min(
+            int(request.query_params.get("page_size", HISTORY_LIMIT)), HISTORY_LIMIT
+        )
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return Response(
+            {"detail": "page_size must be a positive integer."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        page = paginate_by_cursor(
+            InventoryHistoryEvent.objects.filter(user=request.user),
+            ("-timestamp", "-id"),
+            cursor=request.query_params.get("cursor"),
+            page_size=page_size,
+        )
+    except InvalidCursor as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = UserHistorySerializer(page.object_list, many=True)
+    return Response(
+        {
+            "history": serializer.data,
+            "count": page.count,
+            "next_cursor": page.next_cursor,
+        }
+    )
 
 
 @api_view(["DELETE"])
@@ -16,6 +16,7 @@ from modules.views import (
     UserModulesView,
     ModuleDetailView,
     get_module_bom_list_items,
+    get_module_bom_overlay,
     module_cost_stats,
     rate_component,
     get_average_rating,
@@ -33,6 +34,7 @@ from components.views import (
     get_component_dropdowns,
     create_component,
     get_components_by_ids,
+    get_component_trees_view,
 )
 
 # User inventory-related views
@@ -55,6 +57,8 @@ from shopping_list.views import (
     add_all_user_shopping_list_to_inventory,
     get_user_shopping_list_total_price,
     get_user_shopping_list_total_component_price,
+    get_user_shopping_list_pricing,
+    optimize_shopping_list_suppliers,
     get_user_shopping_list_total_quantity,
     archive_shopping_list,
     get_user_anonymous_shopping_list_quantity,
@@ -174,6 +178,16 @@ urlpatterns = [
         get_user_shopping_list_total_component_price,
         name="user-shopping-list-total-component-price",
     ),
+    path(
+        "shopping-list/pricing/",
+        get_user_shopping_list_pricing,
+        name="user-shopping-list-pricing",
+    ),
+    path(
+        "shopping-list/optimize/",
+        optimize_shopping_list_suppliers,
+        name="user-shopping-list-optimize",
+    ),
     path(
         "shopping-list/total-quantity/",
         get_user_shopping_list_total_quantity,
@@ -203,6 +217,7 @@ urlpatterns = [
     path("components/", ComponentView.as_view(), name="component-list"),
     path("components/options/", get_component_dropdowns, name="component-options"),
     path("components/create/", create_component, name="component-create"),
+    path("components/trees/", get_component_trees_view, name="component-trees"),
     path("components/<str:pks>/", get_components_by_ids, name="component-list-by-ids"),
     path("module/<slug:slug>/", ModuleDetailView.as_view(), name="module-detail"),
     path(
@@ -210,6 +225,11 @@ urlpatterns = [
         get_module_bom_list_items,
         name="module-bom-list-items",
     ),
+    path(
+        "module/<uuid:module_pk>/bom-overlay/",
+        get_module_bom_overlay,
+        name="module-bom-overlay",
+    ),
     path(
         "module/cost-stats/<uuid:module_id>/",
         module_cost_stats,
@@ -3,7 +3,7 @@ from types import SimpleNamespace
 from django.shortcuts import render, get_object_or_404
 from .models import BlogPost, Category
 from django.core.paginator import Paginator
-from core.calculate_diy_savings_stats import calculate_diy_savings_stats
+from core.calculate_diy_savings_stats import get_diy_savings_stats
 from django.http import HttpResponse
 
 
@@ -61,7 +61,7 @@ def blog_detail(request, slug):
 
 def blog_detail_diy_savings(request):
     # Fetch DIY savings stats
-    diy_savings_stats = calculate_diy_savings_stats()
+    diy_savings_stats = get_diy_savings_stats()
 
     post = get_object_or_404(BlogPost, slug="how-much-cheaper-is-diy")
 
@@ -1,9 +1,10 @@
 from django.shortcuts import get_object_or_404, redirect, render
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseBadRequest, HttpResponseForbidden
 from django_comments_xtd.models import XtdComment
 from django.contrib.auth.decorators import login_required
 from django import forms
 from django.core.paginator import Paginator
+from core.pagination import InvalidCursor, paginate_by_cursor
 
 
 def latest_comments(request):
@@ -12,19 +13,36 @@ def latest_comments(request):
         .select_related("customxtdcomment")
         .order_by("-submit_date")
     )
-    paginator = Paginator(comments, 5)
-    page_number = request.GET.get("page", 1)
-    page_obj = paginator.get_page(page_number)
+    # A "cursor" parameter (empty for the first page) opts into keyset
+    # pagination; the cursor of the following page is sent in X-Next-Cursor
+    cursor = request.GET.get("cursor")
+    if cursor is not None:
+        try:
+            page_obj = paginate_by_cursor(
+                comments, ("-submit_date", "id"), cursor=cursor, page_size=5
+            )
+        except InvalidCursor as e:
+            return HttpResponseBadRequest(str(e))
+    else:
+        paginator = Paginator(comments, 5)
+        page_number = request.GET.get("page", 1)
+        page_obj = paginator.get_page(page_number)
 
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         end_of_comments = not page_obj.has_next()
-        return render(
+        response = render(
             request,
             "pages/comments_list.html",
             {"page_obj": page_obj, "end_of_comments": end_of_comments},
         )
+    else:
+        response = render(
+            request, "pages/latest_comments.html", {"page_obj": page_obj}
+        )
 
-    return render(request, "pages/latest_comments.html", {"page_obj": page_obj})
+    if cursor is not None and page_obj.next_cursor:
+        response["X-Next-Cursor"] = page_obj.next_cursor
+    return response
 
 
 class CustomXtdCommentForm(forms.ModelForm):
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ComponentsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "components"
+
+    def ready(self):
+        # This import is used to register the signals for the search columns
+        import components.signals
@@ -0,0 +1,581 @@
+import csv
+import itertools
+import os
+import pickle
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from difflib import get_close_matches
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from djmoney.money import Money
+
+from components.models import (
+    Category,
+    Component,
+    ComponentManufacturer,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    SizeStandard,
+    Types,
+)
+from components.search import update_component_search_index
+from core.cache_versions import (
+    COMPONENT_FACETS,
+    MODULE_BOMS,
+    SITEMAPS,
+    bump_cache_version,
+)
+from modules.cost_snapshots import refresh_bom_item_cost_snapshots
+from modules.models import ModuleBomListItem
+
+IMPORT_CHUNK_SIZE = 1000
+
+MOUNTING_STYLES = {
+    "smt": "Surface Mount",
+    "th": "Through Hole",
+}
+
+
+@dataclass
+class RowError:
+    line: int
+    row: dict
+    message: str
+
+
+@dataclass
+class ParsedRow:
+    """A valid CSV row: the supplier item number and what to write for it."""
+
+    line: int
+    row: dict
+    sku: str
+    component: dict
+    price: Money = None
+    link: str = None
+    pcs: int = 1
+    # Empty descriptions are generated like Component.save does
+    description: str = ""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+
+@dataclass
+class DiffRow:
+    line: int
+    sku: str
+    price: Money = None
+    old_price: Money = None
+    # Names of the fields the import would change
+    changes: list = field(default_factory=list)
+
+
+@dataclass
+class ImportDiff:
+    """What importing a CSV file would change, and how fast it was checked."""
+
+    new: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    # Rows repeating a supplier item number found earlier in the file
+    duplicates: int = 0
+    rows: int = 0
+    chunks: int = 0
+    workers: int = 1
+    elapsed: float = 0.0
+    seen_skus: set = field(default_factory=set, repr=False)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+# The importer of the current dry run process pool worker
+_worker_importer = None
+
+
+def _init_worker(pickled_importer):
+    global _worker_importer
+    # Spawned workers must set Django up before unpickling model instances
+    django.setup()
+    _worker_importer = pickle.loads(pickled_importer)
+
+
+def _parse_chunk_in_worker(chunk):
+    return _worker_importer.parse_chunk(chunk)
+
+
+class ComponentCSVImporter:
+    """
+    Imports one supplier's catalog of components from a CSV file.
+
+    Rows are streamed and handled in chunks of chunk_size. Sizes, categories,
+    manufacturers, the supplier and the component type are resolved from maps
+    loaded once. Each chunk's components and supplier items are then written
+    with one bulk upsert each, matching existing components through their
+    (supplier, supplier_item_no) supplier item.
+
+    A row that cannot be parsed, or whose chunk fails to write and which then
+    fails again on its own, is reported as a RowError; the other rows are
+    still imported. Subclasses implement parse_row() for their CSV layout.
+
+    A dry_run importer never writes: sizes, categories, manufacturers and
+    suppliers it would create stay unsaved, and only diff() may be used.
+    """
+
+    component_type_name = None
+    supplier_name = "Tayda Electronics"
+    # Create missing suppliers, sizes and categories instead of failing the row
+    create_supplier = False
+    create_sizes = False
+    create_categories = False
+    # Component fields written by parse_row(), updated on existing components
+    component_fields = ()
+    chunk_size = IMPORT_CHUNK_SIZE
+
+    def __init__(self, chunk_size=None, dry_run=False):
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.component_type = self._get_or_create(Types, self.component_type_name)
+        if self.create_supplier:
+            self.supplier = self._get_or_create(ComponentSupplier, self.supplier_name)
+        else:
+            try:
+                self.supplier = ComponentSupplier.objects.get(name=self.supplier_name)
+            except ComponentSupplier.DoesNotExist:
+                raise ValueError(
+                    f"Supplier '{self.supplier_name}' does not exist in the database."
+                )
+        self.sizes = self._load_names(SizeStandard)
+        self.categories = self._load_names(Category)
+        self.manufacturers = self._load_names(ComponentManufacturer)
+
+    def _get_or_create(self, model, name):
+        if self.dry_run:
+            return model.objects.filter(name=name).first() or model(name=name)
+        return model.objects.get_or_create(name=name)[0]
+
+    def _create(self, model, name):
+        return model(name=name) if self.dry_run else model.objects.create(name=name)
+
+    @staticmethod
+    def _load_names(model):
+        """{name: instance}, with None for names shared by several instances."""
+        instances = {}
+        for instance in model.objects.all():
+            instances[instance.name] = None if instance.name in instances else instance
+        return instances
+
+    def _lookup(self, instances, model, name, create):
+        if name not in instances:
+            if not create:
+                raise ValueError(
+                    f"{model._meta.verbose_name.title()} '{name}' does not exist."
+                )
+            instances[name] = self._create(model, name)
+        instance = instances[name]
+        if instance is None:
+            raise ValueError(
+                f"Several {model._meta.verbose_name_plural} are named '{name}'."
+            )
+        return instance
+
+    def size(self, name):
+        return self._lookup(self.sizes, SizeStandard, name, self.create_sizes)
+
+    def category(self, name):
+        return self._lookup(self.categories, Category, name, self.create_categories)
+
+    def manufacturer(self, name):
+        """The manufacturer named exactly name, or None."""
+        return self.manufacturers.get(name)
+
+    def similar_manufacturer(self, name):
+        """
+        The manufacturer with the closest name, created when no existing name
+        is close enough.
+        """
+        closest = get_close_matches(
+            name, [key for key, value in self.manufacturers.items() if value], n=1
+        )
+        if closest:
+            return self.manufacturers[closest[0]]
+        manufacturer = self._create(ComponentManufacturer, name)
+        self.manufacturers[name] = manufacturer
+        return manufacturer
+
+    @staticmethod
+    def mounting_style(row, sku):
+        mounting_style = row["Mounting Style"].lower()
+        if mounting_style not in MOUNTING_STYLES:
+            raise ValueError(f"Invalid Mounting Style '{mounting_style}' for SKU {sku}")
+        return mounting_style
+
+    @staticmethod
+    def price(row):
+        if not row["Price"]:
+            return None
+        try:
+            return Money(Decimal(row["Price"]), "USD")
+        except InvalidOperation:
+            raise ValueError(f"Invalid Price '{row['Price']}'")
+
+    def parse_row(self, line, row):
+        """Return the ParsedRow of a CSV row; raise ValueError when invalid."""
+        raise NotImplementedError
+
+    def chunks(self, file):
+        """Yield the (line, row) pairs of an open CSV file in chunks."""
+        rows = enumerate(csv.DictReader(file), start=2)
+        while chunk := list(itertools.islice(rows, self.chunk_size)):
+            yield chunk
+
+    def parse_chunk(self, chunk):
+        """Parse (line, row) pairs into a list of ParsedRow and one of RowError."""
+        parsed, errors = {}, []
+        for line, row in chunk:
+            try:
+                parsed_row = self.parse_row(line, row)
+            except (KeyError, TypeError, ValueError) as e:
+                message = f"Missing column {e}" if isinstance(e, KeyError) else e
+                errors.append(RowError(line, row, str(message)))
+                continue
+            # The last row of a supplier item number wins
+            parsed[parsed_row.sku] = parsed_row
+        return list(parsed.values()), errors
+
+    def run(self, file):
+        """Import every row of an open CSV file and return an ImportResult."""
+        if self.dry_run:
+            raise ValueError("A dry run importer cannot write.")
+        result = ImportResult()
+        for chunk in self.chunks(file):
+            parsed, errors = self.parse_chunk(chunk)
+            result.errors.extend(errors)
+            self._write(parsed, result)
+
+        # Bulk writes send none of the signals bumping these versions
+        for name in (COMPONENT_FACETS, MODULE_BOMS, SITEMAPS):
+            bump_cache_version(name)
+        return result
+
+    def diff(self, file, workers=1):
+        """
+        Compare an open CSV file with the supplier's items, writing nothing,
+        and return an ImportDiff.
+
+        A row is changed when the import would write a different value to any
+        field of its component or supplier item, and unchanged otherwise.
+
+        With several workers, chunks are parsed by a process pool while the
+        parent compares the parsed chunks, in file order, with one query per
+        chunk. At most two chunks per worker are in flight, so memory stays
+        bounded by the chunk size and the supplier item numbers seen. No
+        transaction is held across chunks.
+        """
+        started = time.monotonic()
+        diff = ImportDiff(workers=workers)
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(pickle.dumps(self),),
+            ) as executor:
+                pending = deque()
+                for chunk in self.chunks(file):
+                    pending.append(
+                        (executor.submit(_parse_chunk_in_worker, chunk), len(chunk))
+                    )
+                    if len(pending) >= 2 * workers:
+                        future, rows = pending.popleft()
+                        self._compare(*future.result(), rows, diff)
+                while pending:
+                    future, rows = pending.popleft()
+                    self._compare(*future.result(), rows, diff)
+        else:
+            for chunk in self.chunks(file):
+                self._compare(*self.parse_chunk(chunk), len(chunk), diff)
+        diff.elapsed = time.monotonic() - started
+        return diff
+
+    def _compared_fields(self):
+        """The component fields written by _upsert()."""
+        return [
+            Component._meta.get_field(name)
+            for name in (*self.component_fields, "type", "description")
+        ]
+
+    def _written_values(self, parsed_row, fields):
+        """{field name: value} of what _upsert() writes for parsed_row."""
+        component = self._component(parsed_row, None)
+        return {
+            "price": parsed_row.price,
+            "pcs": parsed_row.pcs,
+            "link": parsed_row.link,
+            **{
+                field.name: field.to_python(field.value_from_object(component))
+                for field in fields
+            },
+        }
+
+    def _compare(self, parsed, errors, rows, diff):
+        diff.chunks += 1
+        diff.rows += rows
+        diff.errors.extend(errors)
+        # parse_chunk() keeps one row per supplier item number
+        diff.duplicates += rows - len(parsed) - len(errors)
+
+        fields = self._compared_fields()
+        existing = {}
+        # An unsaved supplier, to be created by the import, has no items yet
+        if self.supplier.pk is not None:
+            for sku, price, currency, pcs, link, *values in (
+                ComponentSupplierItem.objects.filter(
+                    supplier=self.supplier,
+                    supplier_item_no__in=[parsed_row.sku for parsed_row in parsed],
+                ).values_list(
+                    "supplier_item_no",
+                    "price",
+                    "price_currency",
+                    "pcs",
+                    "link",
+                    *[f"component__{field.attname}" for field in fields],
+                )
+            ):
+                existing[sku] = {
+                    "price": None if price is None else Money(price, currency),
+                    "pcs": pcs,
+                    "link": link,
+                    **{
+                        field.name: field.to_python(value)
+                        for field, value in zip(fields, values)
+                    },
+                }
+
+        for parsed_row in parsed:
+            if parsed_row.sku in diff.seen_skus:
+                # Written over the row found earlier in the file
+                diff.duplicates += 1
+                continue
+            diff.seen_skus.add(parsed_row.sku)
+
+            row = DiffRow(parsed_row.line, parsed_row.sku, parsed_row.price)
+            if parsed_row.sku not in existing:
+                diff.new.append(row)
+                continue
+            stored = existing[parsed_row.sku]
+            row.old_price = stored["price"]
+            row.changes = [
+                name
+                for name, value in self._written_values(parsed_row, fields).items()
+                if value != stored[name]
+            ]
+            if row.changes:
+                diff.changed.append(row)
+            else:
+                diff.unchanged.append(row)
+
+    def _write(self, parsed, result):
+        """
+        Write parsed rows in a savepoint. When that fails, retry each row in
+        its own savepoint so only the rows that cannot be written are lost.
+        """
+        if not parsed:
+            return
+        try:
+            with transaction.atomic():
+                created, updated = self._upsert(parsed)
+        except DatabaseError as e:
+            if len(parsed) == 1:
+                result.errors.append(RowError(parsed[0].line, parsed[0].row, str(e)))
+                return
+            for parsed_row in parsed:
+                self._write([parsed_row], result)
+            return
+        result.created += created
+        result.updated += updated
+
+    def _component(self, parsed_row, component_id):
+        """The Component written for parsed_row, unsaved."""
+        component = Component(
+            id=component_id, type=self.component_type, **parsed_row.component
+        )
+        component.description = (
+            parsed_row.description or component.generate_description()
+        )
+        return component
+
+    def _upsert(self, parsed):
+        existing = dict(
+            ComponentSupplierItem.objects.filter(
+                supplier=self.supplier,
+                supplier_item_no__in=[parsed_row.sku for parsed_row in parsed],
+            ).values_list("supplier_item_no", "component_id")
+        )
+
+        components = [
+            self._component(parsed_row, existing.get(parsed_row.sku, uuid.uuid4()))
+            for parsed_row in parsed
+        ]
+        Component.objects.bulk_create(
+            components,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[
+                *self.component_fields,
+                "type",
+                "description",
+                "datetime_updated",
+            ],
+        )
+
+        ComponentSupplierItem.objects.bulk_create(
+            [
+                ComponentSupplierItem(
+                    component=component,
+                    supplier=self.supplier,
+                    supplier_item_no=parsed_row.sku,
+                    price=parsed_row.price,
+                    pcs=parsed_row.pcs,
+                    link=parsed_row.link,
+                )
+                for component, parsed_row in zip(components, parsed)
+            ],
+            update_conflicts=True,
+            unique_fields=["supplier", "supplier_item_no"],
+            update_fields=[
+                "price",
+                "price_currency",
+                "pcs",
+                "link",
+                "datetime_updated",
+            ],
+        )
+
+        # Bulk writes send no signals
+        update_component_search_index([component.pk for component in components])
+        # New components are in no BOM yet, updated prices change the BOM costs
+        if existing:
+            refresh_bom_item_cost_snapshots(
+                ModuleBomListItem.objects.filter(
+                    components_options__in=existing.values()
+                ).values_list("id", flat=True)
+            )
+        return len(parsed) - len(existing), len(existing)
+
+
+class ComponentCSVImportCommand(BaseCommand):
+    """
+    Base of the commands importing a CSV file with a ComponentCSVImporter in a
+    single transaction, reporting the rows that could not be imported.
+    """
+
+    importer_class = None
+    csv_help = "Path to the CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", type=str, help=self.csv_help)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Number of rows written per bulk upsert.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file and count what would change, writing nothing.",
+        )
+        parser.add_argument(
+            "--diff",
+            action="store_true",
+            help="With --dry-run, list every new, changed, unchanged and invalid row.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes validating rows during a dry run.",
+        )
+
+    def handle(self, *args, **kwargs):
+        csv_file = kwargs["csv_file"]
+        if kwargs["diff"] and not kwargs["dry_run"]:
+            raise CommandError("--diff requires --dry-run.")
+        if kwargs["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        try:
+            with open(csv_file, "r", encoding="utf-8") as file:
+                if kwargs["dry_run"]:
+                    importer = self.importer_class(
+                        chunk_size=kwargs["chunk_size"], dry_run=True
+                    )
+                    diff = importer.diff(file, workers=kwargs["workers"])
+                else:
+                    with transaction.atomic():
+                        importer = self.importer_class(chunk_size=kwargs["chunk_size"])
+                        result = importer.run(file)
+        except FileNotFoundError:
+            self.stderr.write(self.style.ERROR(f"File not found: {csv_file}"))
+            return
+        except ValueError as e:
+            self.stderr.write(self.style.ERROR(f"Error reading CSV file: {e}"))
+            return
+
+        if kwargs["dry_run"]:
+            self.report_diff(diff, kwargs["diff"])
+            return
+
+        self.report_errors(result.errors)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Database update completed: {result.created} created, "
+                f"{result.updated} updated, {len(result.errors)} failed."
+            )
+        )
+
+    def report_errors(self, errors):
+        for error in errors:
+            self.stderr.write(
+                self.style.ERROR(f"Error processing row {error.line}: {error.message}")
+            )
+
+    def report_diff(self, diff, list_rows):
+        if list_rows:
+            for row in diff.new:
+                self.stdout.write(f"+ {row.sku} {row.price}")
+            for row in diff.changed:
+                self.stdout.write(
+                    f"~ {row.sku} {row.old_price} -> {row.price} "
+                    f"({', '.join(row.changes)})"
+                )
+            for row in diff.unchanged:
+                self.stdout.write(f"= {row.sku} {row.price}")
+            for error in diff.errors:
+                self.stdout.write(f"! line {error.line}: {error.message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dry run: {len(diff.new)} new, {len(diff.changed)} changed, "
+                f"{len(diff.unchanged)} unchanged, {diff.duplicates} duplicate, "
+                f"{len(diff.errors)} invalid."
+            )
+        )
+        self.stdout.write(
+            f"Checked {diff.rows} rows in {diff.chunks} chunks with "
+            f"{diff.workers} workers in {diff.elapsed:.2f}s "
+            f"({diff.rows_per_second:.0f} rows/s)."
+        )
@@ -0,0 +1,119 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from components.models import Component, ComponentManufacturer, ComponentSupplier, Types
+from core.cache_versions import COMPONENT_FACETS, get_cache_version
+
+# The cache and its versions are per process: writes made through another
+# process, the import commands included, show up once entries expire
+FACETS_TIMEOUT = 60
+
+
+def _build_facet_catalog():
+    unique_manufacturers = ComponentManufacturer.objects.values("name", "pk").order_by(
+        "name"
+    )
+    unique_suppliers = ComponentSupplier.objects.values("name", "pk").order_by("name")
+
+    return {
+        "ohms": Component.get_unique_ohms_or_farads_values("ohms", "ohms_unit"),
+        "farads": Component.get_unique_ohms_or_farads_values("farads", "farads_unit"),
+        "voltage_rating": Component.get_unique_values("voltage_rating", str),
+        "tolerance": Component.get_unique_values("tolerance", str),
+        "mounting_style": Component.get_mounting_styles(),
+        "manufacturer": [
+            {"label": manufacturer["name"], "value": str(manufacturer["pk"])}
+            for manufacturer in unique_manufacturers
+        ],
+        "supplier": [
+            {"label": supplier["name"], "value": str(supplier["pk"])}
+            for supplier in unique_suppliers
+        ],
+        "type": list(
+            Types.objects.values_list("name", flat=True).distinct().order_by("name")
+        ),
+    }
+
+
+def _build_facet_counts(components):
+    """Count the components per facet value, keyed like the catalog values."""
+    components = components.order_by()
+
+    def count_by(*fields):
+        return (
+            components.values(*fields)
+            .annotate(count=Count("pk", distinct=True))
+            .values_list(*fields, "count")
+        )
+
+    def measurement_counts(value_field, unit_field):
+        return {
+            f"{float(value)} {unit}": count
+            for value, unit, count in count_by(value_field, unit_field)
+            if value is not None and unit
+        }
+
+    def plain_counts(field):
+        return {
+            str(value): count
+            for value, count in count_by(field)
+            if value is not None
+        }
+
+    return {
+        "ohms": measurement_counts("ohms", "ohms_unit"),
+        "farads": measurement_counts("farads", "farads_unit"),
+        "voltage_rating": plain_counts("voltage_rating"),
+        "tolerance": plain_counts("tolerance"),
+        "mounting_style": plain_counts("mounting_style"),
+        "manufacturer": plain_counts("manufacturer"),
+        "supplier": plain_counts("supplier_items__supplier"),
+        "type": plain_counts("type__name"),
+    }
+
+
+def _digest(value):
+    return hashlib.md5(
+        json.dumps(value, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _cached_with_digest(key, build):
+    """Return (value, digest of value) cached under key, building it if missing."""
+    entry = cache.get(key)
+    if entry is None:
+        value = build()
+        entry = (value, _digest(value))
+        cache.set(key, entry, timeout=FACETS_TIMEOUT)
+    return entry
+
+
+def get_facets(components, search_query, filters):
+    """
+    Return ({"unique_values": ..., "facet_counts": ...}, etag) for the
+    component list.
+
+    unique_values is the catalog of every filterable value. It is cached under
+    the component facets cache version, which the components signals bump on
+    Component, ComponentSupplier, ComponentSupplierItem, ComponentManufacturer
+    and Types writes, for FACETS_TIMEOUT seconds. facet_counts are the number
+    of components matching the active search and filters (the unsliced
+    components queryset) per value, cached per filter combination the same way.
+
+    The etag is a digest of the facets themselves, so every process gives the
+    same etag for the same facets.
+    """
+    version = get_cache_version(COMPONENT_FACETS)
+    signature = _digest([search_query, filters])
+    catalog, catalog_digest = _cached_with_digest(
+        f"component_facet_catalog_{version}", _build_facet_catalog
+    )
+    counts, counts_digest = _cached_with_digest(
+        f"component_facet_counts_{version}_{signature}",
+        lambda: _build_facet_counts(components),
+    )
+    etag = '"%s"' % _digest([catalog_digest, counts_digest])
+    return {"unique_values": catalog, "facet_counts": counts}, etag
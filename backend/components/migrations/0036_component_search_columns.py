@@ -0,0 +1,89 @@
+# Generated by Django 5.0 on 2026-10-18 12:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+
+def populate_search_columns(apps, schema_editor):
+    # Frozen copy of components.search.component_search_columns
+    Component = apps.get_model("components", "Component")
+    ComponentSupplierItem = apps.get_model("components", "ComponentSupplierItem")
+    ComponentManufacturer = apps.get_model("components", "ComponentManufacturer")
+    Types = apps.get_model("components", "Types")
+
+    supplier_text = Subquery(
+        ComponentSupplierItem.objects.filter(component=OuterRef("pk"))
+        .order_by()
+        .values("component")
+        .annotate(
+            text=StringAgg(
+                Concat("supplier__name", Value(" "), "supplier_item_no"),
+                delimiter=" ",
+            )
+        )
+        .values("text")
+    )
+    manufacturer_name = Subquery(
+        ComponentManufacturer.objects.filter(pk=OuterRef("manufacturer_id")).values(
+            "name"
+        )
+    )
+    type_name = Subquery(Types.objects.filter(pk=OuterRef("type_id")).values("name"))
+
+    Component.objects.update(
+        search_document=(
+            SearchVector("description", weight="A")
+            + SearchVector(supplier_text, weight="B")
+            + SearchVector(manufacturer_name, "manufacturer_part_no", weight="C")
+            + SearchVector(type_name, weight="D")
+        ),
+        search_text=Concat(
+            "description",
+            Value(" "),
+            "manufacturer_part_no",
+            Value(" "),
+            Coalesce(manufacturer_name, Value("")),
+            Value(" "),
+            Coalesce(type_name, Value("")),
+            Value(" "),
+            Coalesce(supplier_text, Value("")),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0035_remove_component_unit_price_component_pin_spacing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='component',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='component_search_doc_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='component_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(populate_search_columns, migrations.RunPython.noop),
+    ]
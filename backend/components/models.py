@@ -1,6 +1,8 @@
 import re
 from djmoney.models.fields import MoneyField
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
 from core.models import BaseModel
@@ -274,6 +276,13 @@ class Component(BaseModel):
     )
     allow_comments = models.BooleanField("allow comments", default=True)
 
+    # Denormalized search columns, maintained by components.search
+    search_document = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(blank=True, default="", editable=False)
+
+    # Approving a pending component approves its supplier items, see save()
+    tracked_fields = ("user_submitted_status",)
+
     @cached_property
     def octopart_url(self):
         """
@@ -298,9 +307,8 @@ class Component(BaseModel):
                 self.submitted_by = current_user
 
         if not self._state.adding:  # Ensure this is not a new object
-            previous_instance = Component.objects.get(pk=self.pk)
             if (
-                previous_instance.user_submitted_status == "pending"
+                self.loaded_value("user_submitted_status") == "pending"
                 and self.user_submitted_status == "approved"
             ):
                 # Update all related supplier items to approved
@@ -452,6 +460,14 @@ class Component(BaseModel):
     class Meta:
         verbose_name_plural = "Components"
         ordering = ["type", "mounting_style", "description"]
+        indexes = [
+            GinIndex(fields=["search_document"], name="component_search_doc_gin"),
+            GinIndex(
+                fields=["search_text"],
+                name="component_search_text_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         type_name = self.type.name if self.type else "Unknown Type"
@@ -750,6 +766,10 @@ class ComponentSupplierItem(BaseModel):
         max_length=10, choices=STATUS_CHOICES, default="approved"
     )
 
+    # Moving an item to another component changes the BOM costs of both, see
+    # the modules signals
+    tracked_fields = ("component",)
+
     class Meta:
         unique_together = [
             ("component", "supplier"),
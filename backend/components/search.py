@@ -0,0 +1,118 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Lookup, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+from components.models import (
+    Component,
+    ComponentManufacturer,
+    ComponentSupplierItem,
+    Types,
+)
+
+# Upper bound on the number of rows a search may return
+MAX_SEARCH_RESULTS = 500
+
+
+class ILikeContains(Lookup):
+    """
+    Case-insensitive substring match compiled to a plain ``column ILIKE
+    '%value%'``, which a gin_trgm_ops index can serve. The icontains lookup
+    compiles to ``UPPER(column::text) LIKE UPPER(...)`` instead, which no
+    index on the column can.
+    """
+
+    lookup_name = "ilike_contains"
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
+
+
+Component._meta.get_field("search_text").register_lookup(ILikeContains)
+
+
+def component_search_columns():
+    """
+    Return the update() kwargs that compute Component.search_document and
+    Component.search_text in the database. The related names are read through
+    subqueries so a single UPDATE can refresh any number of components.
+
+    Weights: description (A), supplier names and item numbers (B),
+    manufacturer name and part number (C), type name (D).
+    """
+    supplier_text = Subquery(
+        ComponentSupplierItem.objects.filter(component=OuterRef("pk"))
+        .order_by()
+        .values("component")
+        .annotate(
+            text=StringAgg(
+                Concat("supplier__name", Value(" "), "supplier_item_no"),
+                delimiter=" ",
+            )
+        )
+        .values("text")
+    )
+    manufacturer_name = Subquery(
+        ComponentManufacturer.objects.filter(pk=OuterRef("manufacturer_id")).values(
+            "name"
+        )
+    )
+    type_name = Subquery(Types.objects.filter(pk=OuterRef("type_id")).values("name"))
+
+    return {
+        "search_document": (
+            SearchVector("description", weight="A")
+            + SearchVector(supplier_text, weight="B")
+            + SearchVector(manufacturer_name, "manufacturer_part_no", weight="C")
+            + SearchVector(type_name, weight="D")
+        ),
+        "search_text": Concat(
+            "description",
+            Value(" "),
+            "manufacturer_part_no",
+            Value(" "),
+            Coalesce(manufacturer_name, Value("")),
+            Value(" "),
+            Coalesce(type_name, Value("")),
+            Value(" "),
+            Coalesce(supplier_text, Value("")),
+        ),
+    }
+
+
+def update_component_search_index(component_ids=None):
+    """
+    Refresh the stored search columns of the given components (all components
+    when component_ids is None) with a single UPDATE statement.
+    """
+    components = Component.objects.all()
+    if component_ids is not None:
+        components = components.filter(pk__in=component_ids)
+    return components.update(**component_search_columns())
+
+
+def search_components(components, query):
+    """
+    Filter components matching the query through the stored search columns,
+    so both the full-text and the trigram lookups can use their GIN indexes.
+    Matches are annotated with rank (full text) and similarity (trigram).
+    """
+    search_query = SearchQuery(query, search_type="websearch")
+    return components.annotate(
+        rank=SearchRank(F("search_document"), search_query),
+        similarity=TrigramWordSimilarity(query, "search_text"),
+    ).filter(
+        Q(search_document=search_query)
+        | Q(search_text__trigram_word_similar=query)
+        | Q(search_text__ilike_contains=query)
+    )
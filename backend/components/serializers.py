@@ -13,7 +13,8 @@ from components.models import (
     ComponentManufacturer,
 )
 from rest_framework import serializers
-from core.views import get_exchange_rate
+from components.trees import get_component_trees, index_tree
+from core.exchange_rates import CurrencyConverter
 
 
 class ComponentSupplierItemSerializer(serializers.ModelSerializer):
@@ -37,27 +38,46 @@ class ComponentSupplierItemSerializer(serializers.ModelSerializer):
         """
         Normalize the price to the user's currency as a decimal.
         """
-        if obj.price is None:
-            return None
-
-        target_currency = self.get_target_currency()
-        stored_currency = obj.price.currency.code
-        amount = obj.price.amount
-
-        return self.normalize_currency(amount, stored_currency, target_currency)
+        return self.get_converted_prices(obj)[0]
 
     def get_unit_price(self, obj):
         """
         Normalize the unit price to the user's currency as a decimal.
         """
-        if obj.unit_price is None:
-            return None
+        return self.get_converted_prices(obj)[1]
 
-        target_currency = self.get_target_currency()
-        stored_currency = obj.price.currency.code  # Use the price's currency
-        amount = obj.unit_price
+    def get_converted_prices(self, obj):
+        """
+        Return (price, unit_price) in the target currency. List views convert
+        every supplier item of a page up front (see supplier_item_price_context);
+        items missing from that pass are converted here.
+        """
+        converted = self.context.get("supplier_item_prices", {}).get(obj.pk)
+        if converted is not None:
+            return converted
+        if obj.price is None:
+            return None, None
 
-        return self.normalize_currency(amount, stored_currency, target_currency)
+        currency = obj.price.currency.code
+        try:
+            return tuple(
+                self.get_currency_converter().convert_many(
+                    [(obj.price.amount, currency), (obj.unit_price, currency)]
+                )
+            )
+        except ValueError as e:
+            raise serializers.ValidationError(f"Error normalizing currency: {e}")
+
+    def get_currency_converter(self):
+        """
+        Return the converter shared by the whole serialization, creating it on
+        first use.
+        """
+        converter = self.context.get("currency_converter")
+        if converter is None:
+            converter = CurrencyConverter(self.get_target_currency())
+            self.root._context["currency_converter"] = converter
+        return converter
 
     def get_target_currency(self):
         """
@@ -71,22 +91,64 @@ class ComponentSupplierItemSerializer(serializers.ModelSerializer):
             return getattr(request.user, "default_currency", "USD")
         return request.query_params.get("currency", "USD")
 
-    def normalize_currency(self, amount, stored_currency, target_currency):
-        """
-        Normalize an amount from the stored currency to the target currency.
-        """
-        if stored_currency == target_currency:
-            # No conversion needed
-            return round(float(amount), 2)
 
+def convert_supplier_item_prices(supplier_items, converter):
+    """
+    Convert the price and unit price of supplier items in a single pass.
+    Returns {supplier item pk: (price, unit_price)}; both are Decimals in the
+    converter's currency (None when the item has no price). Items whose
+    currency cannot be converted are left out.
+    """
+    converted, keys, amounts = {}, [], []
+    for item in supplier_items:
+        if item.price is None:
+            converted[item.pk] = (None, None)
+            continue
+        currency = item.price.currency.code
         try:
-            # Convert directly from the stored currency to the target currency
-            exchange_rate = get_exchange_rate(stored_currency, target_currency)
-            normalized_amount = float(amount) * float(exchange_rate)
-
-            return round(normalized_amount, 2)
-        except Exception as e:
-            raise serializers.ValidationError(f"Error normalizing currency: {e}")
+            converter.rate_from(currency)
+        except ValueError:
+            continue
+        keys.append(item.pk)
+        amounts += [(item.price.amount, currency), (item.unit_price, currency)]
+
+    amounts = converter.convert_many(amounts)
+    for index, pk in enumerate(keys):
+        converted[pk] = (amounts[2 * index], amounts[2 * index + 1])
+    return converted
+
+
+def supplier_item_price_context(components, target_currency="USD", **context):
+    """
+    Build the serializer context for listing components: every supplier item
+    price of the page is converted into target_currency in one pass before
+    serialization. components must have their supplier_items prefetched.
+    """
+    converter = CurrencyConverter(target_currency)
+    supplier_items = [
+        item for component in components for item in component.supplier_items.all()
+    ]
+    return {
+        **context,
+        "currency_converter": converter,
+        "supplier_item_prices": convert_supplier_item_prices(supplier_items, converter),
+    }
+
+
+def get_tree_node(serializer, tree, obj):
+    """
+    Return the nested dict of obj from the cached component trees (see
+    components.trees), indexed once per serialization in the root context.
+    Nodes missing from the cached trees are built from the database.
+    """
+    indexes = serializer.context.get("component_tree_indexes")
+    if indexes is None:
+        indexes = {
+            name: index_tree(roots) for name, roots in get_component_trees().items()
+        }
+        serializer.root._context["component_tree_indexes"] = indexes
+    node = indexes[tree].get(obj.pk)
+    return node if node is not None else obj.to_nested_dict()
 
 
 class NestedCategorySerializer(serializers.ModelSerializer):
@@ -100,7 +162,7 @@ class NestedCategorySerializer(serializers.ModelSerializer):
         """
         Returns the nested structure for the category.
         """
-        return obj.to_nested_dict()
+        return get_tree_node(self, "categories", obj)
 
 
 class NestedSizeStandardSerializer(serializers.ModelSerializer):
@@ -114,7 +176,7 @@ class NestedSizeStandardSerializer(serializers.ModelSerializer):
         """
         Returns the nested structure for the size standard.
         """
-        return obj.to_nested_dict()
+        return get_tree_node(self, "sizes", obj)
 
 
 class ComponentSerializer(serializers.ModelSerializer):
@@ -128,7 +190,13 @@ class ComponentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Component
-        exclude = ["allow_comments", "user_submitted_status", "submitted_by"]
+        exclude = [
+            "allow_comments",
+            "user_submitted_status",
+            "submitted_by",
+            "search_document",
+            "search_text",
+        ]
 
     def get_qualities(self, obj):
         """
@@ -153,6 +221,17 @@ class ComponentSerializer(serializers.ModelSerializer):
         return obj.octopart_url
 
 
+class CompactComponentSerializer(ComponentSerializer):
+    """
+    Read-only list representation of a component: category and size are
+    returned as IDs instead of nested trees. Clients resolve them against the
+    cached payload of components.trees.get_component_trees.
+    """
+
+    category = serializers.PrimaryKeyRelatedField(read_only=True)
+    size = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
 class AddComponentDropdownOptionsSerializer:
     @staticmethod
     def get_data():
@@ -208,7 +287,7 @@ class CreateComponentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Component
-        fields = "__all__"
+        exclude = ["search_document", "search_text"]
 
     def validate(self, data):
         # Check for duplicate manufacturer part number
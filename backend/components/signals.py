@@ -0,0 +1,86 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from mptt.signals import node_moved
+
+from components.models import (
+    Category,
+    Component,
+    ComponentManufacturer,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    SizeStandard,
+    Types,
+)
+from components.search import update_component_search_index
+from core.cache_versions import COMPONENT_FACETS, COMPONENT_TREES, bump_cache_version
+
+# Component fields that feed the stored search columns
+SEARCH_FIELDS = {"description", "manufacturer", "manufacturer_part_no", "type"}
+
+
+@receiver(post_save, sender=Component)
+def update_search_index_for_component(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_component_search_index([instance.pk])
+
+
+@receiver(post_save, sender=ComponentSupplierItem)
+@receiver(post_delete, sender=ComponentSupplierItem)
+def update_search_index_for_supplier_item(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_component_search_index([instance.component_id])
+
+
+@receiver(post_save, sender=ComponentSupplier)
+def update_search_index_for_supplier(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_component_search_index(
+        ComponentSupplierItem.objects.filter(supplier=instance).values("component_id")
+    )
+
+
+@receiver(post_save, sender=ComponentManufacturer)
+def update_search_index_for_manufacturer(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_component_search_index(
+        Component.objects.filter(manufacturer=instance).values("pk")
+    )
+
+
+@receiver(post_save, sender=Types)
+def update_search_index_for_type(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_component_search_index(Component.objects.filter(type=instance).values("pk"))
+
+
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+@receiver(post_save, sender=ComponentSupplier)
+@receiver(post_delete, sender=ComponentSupplier)
+@receiver(post_save, sender=ComponentSupplierItem)
+@receiver(post_delete, sender=ComponentSupplierItem)
+@receiver(post_save, sender=ComponentManufacturer)
+@receiver(post_delete, sender=ComponentManufacturer)
+@receiver(post_save, sender=Types)
+@receiver(post_delete, sender=Types)
+def invalidate_component_facets(sender, **kwargs):
+    bump_cache_version(COMPONENT_FACETS)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(node_moved, sender=Category)
+@receiver(post_save, sender=SizeStandard)
+@receiver(post_delete, sender=SizeStandard)
+@receiver(node_moved, sender=SizeStandard)
+def invalidate_component_trees(sender, **kwargs):
+    bump_cache_version(COMPONENT_TREES)
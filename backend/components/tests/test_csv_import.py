@@ -0,0 +1,302 @@
+import io
+import tempfile
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from components.models import (
+    Category,
+    Component,
+    ComponentManufacturer,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    SizeStandard,
+    Types,
+)
+from core.management.commands.add_caps_from_csv import CapacitorCSVImporter
+from core.management.commands.add_components_from_csv import ResistorCSVImporter
+from core.management.commands.add_transistors_from_csv import TransistorCSVImporter
+from modules.cost_snapshots import get_module_cost_total
+from modules.models import Manufacturer, Module, ModuleBomListItem
+
+RESISTOR_HEADER = (
+    "SKU,Ohms,Ohms Unit,Tolerance,Wattage,Price,Link,Mounting Style,Size,Category\n"
+)
+
+
+def resistor_row(sku, ohms="1.0", price="0.01", mounting_style="smt"):
+    return (
+        f"{sku},{ohms},K,1%,1/8W,{price},https://example.com/{sku},"
+        f"{mounting_style},0805,Fixed Resistors\n"
+    )
+
+
+class ResistorCSVImporterTests(TestCase):
+    def setUp(self):
+        self.supplier = ComponentSupplier.objects.create(name="Tayda Electronics")
+        self.royal_ohm = ComponentManufacturer.objects.create(name="Royal Ohm")
+        self.size = SizeStandard.objects.create(name="0805")
+        self.category = Category.objects.create(name="Fixed Resistors")
+
+    def run_import(self, *rows, chunk_size=None):
+        importer = ResistorCSVImporter(chunk_size=chunk_size)
+        return importer.run(io.StringIO(RESISTOR_HEADER + "".join(rows)))
+
+    def test_creates_components_and_supplier_items(self):
+        result = self.run_import(resistor_row("A-1"), resistor_row("A-2", ohms="10"))
+
+        self.assertEqual((result.created, result.updated, result.errors), (2, 0, []))
+        item = ComponentSupplierItem.objects.select_related("component").get(
+            supplier=self.supplier, supplier_item_no="A-1"
+        )
+        self.assertEqual(item.price.amount, Decimal("0.01"))
+        self.assertEqual(item.link, "https://example.com/A-1")
+        self.assertEqual(item.component.ohms_unit, "kΩ")
+        self.assertEqual(item.component.manufacturer, self.royal_ohm)
+        self.assertEqual(item.component.size, self.size)
+        self.assertEqual(item.component.type.name, "Resistor")
+        self.assertTrue(item.component.description)
+
+    def test_reimport_updates_matched_components(self):
+        self.run_import(resistor_row("A-1"))
+        component_id = ComponentSupplierItem.objects.get(
+            supplier_item_no="A-1"
+        ).component_id
+
+        result = self.run_import(resistor_row("A-1", ohms="4.7", price="0.05"))
+
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual(Component.objects.count(), 1)
+        item = ComponentSupplierItem.objects.select_related("component").get(
+            supplier_item_no="A-1"
+        )
+        self.assertEqual(item.component_id, component_id)
+        self.assertEqual(item.component.ohms, 4.7)
+        self.assertEqual(item.price.amount, Decimal("0.05"))
+
+    def test_reimport_refreshes_module_costs(self):
+        self.run_import(resistor_row("A-1", price="0.10"))
+        component = ComponentSupplierItem.objects.get(supplier_item_no="A-1").component
+        module = Module.objects.create(
+            name="Mixer",
+            manufacturer=Manufacturer.objects.create(name="Synth Co"),
+            description="A mixer",
+        )
+        bom_item = ModuleBomListItem.objects.create(
+            description="10k", module=module, type=component.type, quantity=4
+        )
+        bom_item.components_options.add(component)
+        self.assertEqual(get_module_cost_total(module.id).low, Decimal("0.40"))
+
+        self.run_import(resistor_row("A-1", price="0.25"))
+
+        self.assertEqual(get_module_cost_total(module.id).low, Decimal("1.00"))
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        result = self.run_import(
+            resistor_row("A-1"),
+            resistor_row("A-2", mounting_style="glued"),
+            resistor_row("A-3", price="cheap"),
+            resistor_row("A-4"),
+            chunk_size=2,
+        )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error.line for error in result.errors], [3, 4])
+        self.assertIn("Invalid Mounting Style", result.errors[0].message)
+        self.assertEqual(
+            set(ComponentSupplierItem.objects.values_list("supplier_item_no", flat=True)),
+            {"A-1", "A-4"},
+        )
+
+    def test_rows_failing_to_write_are_reported_alone(self):
+        # supplier_item_no is unique across suppliers, so this row cannot be written
+        other_supplier = ComponentSupplier.objects.create(name="Mouser")
+        ComponentSupplierItem.objects.create(
+            component=Component.objects.create(
+                description="Taken", type=Types.objects.create(name="Resistor")
+            ),
+            supplier=other_supplier,
+            supplier_item_no="A-2",
+        )
+
+        result = self.run_import(
+            resistor_row("A-1"), resistor_row("A-2"), resistor_row("A-3")
+        )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error.line for error in result.errors], [3])
+        self.assertEqual(
+            ComponentSupplierItem.objects.filter(
+                supplier=self.supplier, supplier_item_no__in=["A-1", "A-3"]
+            ).count(),
+            2,
+        )
+
+    def test_unknown_size_is_a_row_error(self):
+        result = self.run_import(resistor_row("A-1").replace("0805", "1206"))
+
+        self.assertEqual(result.created, 0)
+        self.assertIn("'1206' does not exist", result.errors[0].message)
+
+    def test_missing_manufacturer_fails_the_import(self):
+        self.royal_ohm.delete()
+
+        with self.assertRaises(ValueError):
+            ResistorCSVImporter()
+
+
+class ResistorCSVDiffTests(TestCase):
+    def setUp(self):
+        ComponentSupplier.objects.create(name="Tayda Electronics")
+        ComponentManufacturer.objects.create(name="Royal Ohm")
+        SizeStandard.objects.create(name="0805")
+        Category.objects.create(name="Fixed Resistors")
+        ResistorCSVImporter().run(
+            io.StringIO(
+                RESISTOR_HEADER + resistor_row("A-1") + resistor_row("A-2", price="")
+            )
+        )
+        self.csv = RESISTOR_HEADER + "".join(
+            [
+                resistor_row("A-1"),
+                resistor_row("A-2", price="0.02"),
+                resistor_row("A-3"),
+                resistor_row("A-4", mounting_style="glued"),
+            ]
+        )
+
+    def test_diff_classifies_rows_without_writing(self):
+        importer = ResistorCSVImporter(chunk_size=2, dry_run=True)
+
+        diff = importer.diff(io.StringIO(self.csv))
+
+        self.assertEqual([row.sku for row in diff.new], ["A-3"])
+        self.assertEqual([row.sku for row in diff.changed], ["A-2"])
+        self.assertIsNone(diff.changed[0].old_price)
+        self.assertEqual(diff.changed[0].price.amount, Decimal("0.02"))
+        self.assertEqual([row.sku for row in diff.unchanged], ["A-1"])
+        self.assertEqual([error.line for error in diff.errors], [5])
+        self.assertEqual((diff.rows, diff.chunks), (4, 2))
+        self.assertEqual(ComponentSupplierItem.objects.count(), 2)
+
+    def test_diff_compares_every_written_field(self):
+        importer = ResistorCSVImporter(dry_run=True)
+
+        diff = importer.diff(
+            io.StringIO(RESISTOR_HEADER + resistor_row("A-1", ohms="4.7"))
+        )
+
+        self.assertEqual([row.sku for row in diff.changed], ["A-1"])
+        self.assertEqual(diff.changed[0].changes, ["ohms", "description"])
+        self.assertEqual(diff.unchanged, [])
+
+    def test_diff_counts_repeated_skus_once(self):
+        importer = ResistorCSVImporter(chunk_size=2, dry_run=True)
+
+        diff = importer.diff(
+            io.StringIO(
+                RESISTOR_HEADER
+                + resistor_row("A-3")
+                + resistor_row("A-3", price="0.02")
+                + resistor_row("A-3", price="0.03")
+            )
+        )
+
+        self.assertEqual([row.sku for row in diff.new], ["A-3"])
+        self.assertEqual((diff.duplicates, diff.rows, diff.chunks), (2, 3, 2))
+
+    def test_dry_run_importer_cannot_write(self):
+        with self.assertRaises(ValueError):
+            ResistorCSVImporter(dry_run=True).run(io.StringIO(self.csv))
+
+    def test_command_diff_with_process_pool(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as csv_file:
+            csv_file.write(self.csv)
+            csv_file.flush()
+            out = io.StringIO()
+            call_command(
+                "add_components_from_csv",
+                csv_file.name,
+                "--dry-run",
+                "--diff",
+                "--workers=2",
+                "--chunk-size=1",
+                stdout=out,
+            )
+
+        output = out.getvalue()
+        self.assertIn("+ A-3 $0.01", output)
+        self.assertIn("~ A-2 None -> $0.02 (price)", output)
+        self.assertIn("= A-1 $0.01", output)
+        self.assertIn("! line 5: Invalid Mounting Style", output)
+        self.assertIn("1 new, 1 changed, 1 unchanged, 0 duplicate, 1 invalid", output)
+        self.assertIn("Checked 4 rows in 4 chunks with 2 workers", output)
+        self.assertEqual(ComponentSupplierItem.objects.count(), 2)
+
+    def test_diff_requires_dry_run(self):
+        with self.assertRaises(CommandError):
+            call_command("add_components_from_csv", "missing.csv", "--diff")
+
+
+class CapacitorCSVImporterTests(TestCase):
+    def setUp(self):
+        ComponentSupplier.objects.create(name="Tayda Electronics")
+        self.nichicon = ComponentManufacturer.objects.create(name="Nichicon")
+
+    def test_creates_sizes_categories_and_descriptions(self):
+        csv_file = io.StringIO(
+            "SKU,Farads,Farads Unit,Voltage,Tolerance,Manufacturer,Size,"
+            "Mounting Style,Price,Link,Category\n"
+            "A-7711,47.0,UF,450V,,Nichicon,Radial,th,0.90,"
+            "https://example.com/A-7711,Electrolytic Capacitors\n"
+            "A-7712,4.7,XF,50V,,,Radial,th,0.10,"
+            "https://example.com/A-7712,Electrolytic Capacitors\n"
+        )
+
+        result = CapacitorCSVImporter().run(csv_file)
+
+        self.assertEqual(result.created, 1)
+        self.assertIn("Invalid capacitance unit", result.errors[0].message)
+        component = Component.objects.get(supplier_items__supplier_item_no="A-7711")
+        self.assertEqual(component.farads_unit, "μF")
+        self.assertEqual(component.manufacturer, self.nichicon)
+        self.assertEqual(component.size.name, "Radial")
+        self.assertEqual(component.category.name, "Electrolytic Capacitors")
+        self.assertEqual(
+            component.description,
+            "47.0μF Electrolytic Capacitors (Through Hole) by Nichicon",
+        )
+
+    def test_dry_run_creates_nothing(self):
+        csv_file = io.StringIO(
+            "SKU,Farads,Farads Unit,Voltage,Tolerance,Manufacturer,Size,"
+            "Mounting Style,Price,Link,Category\n"
+            "A-7711,47.0,UF,450V,,Elna,Radial,th,0.90,"
+            "https://example.com/A-7711,Electrolytic Capacitors\n"
+        )
+
+        diff = CapacitorCSVImporter(dry_run=True).diff(csv_file)
+
+        self.assertEqual([row.sku for row in diff.new], ["A-7711"])
+        self.assertFalse(SizeStandard.objects.exists())
+        self.assertFalse(Category.objects.exists())
+        self.assertEqual(ComponentManufacturer.objects.count(), 1)
+
+
+class TransistorCSVImporterTests(TestCase):
+    def test_creates_the_supplier(self):
+        csv_file = io.StringIO(
+            "SKU,Size,Mounting Style,Category,Manufacturer,Price,Link\n"
+            "A-2571,TO-92,th,BJTs,ON SEMICONDUCTOR,0.10,https://example.com/A-2571\n"
+        )
+
+        result = TransistorCSVImporter().run(csv_file)
+
+        self.assertEqual((result.created, result.errors), (1, []))
+        item = ComponentSupplierItem.objects.select_related("component").get()
+        self.assertEqual(item.supplier.name, "Tayda Electronics")
+        self.assertIsNone(item.component.manufacturer)
+        self.assertEqual(item.component.size.name, "TO-92")
@@ -0,0 +1,110 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+from accounts.models import ExchangeRate
+from components.models import (
+    Component,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    Types,
+)
+from components.serializers import ComponentSerializer, supplier_item_price_context
+from core.exchange_rates import clear_rate_matrix, get_cached_exchange_rate
+
+
+class ComponentSupplierItemCurrencyTests(TestCase):
+    """Currency conversion of supplier item prices through the rate matrix."""
+
+    def setUp(self):
+        clear_rate_matrix()
+        ExchangeRate.objects.create(
+            base_currency="USD", target_currency="EUR", rate=Decimal("0.5")
+        )
+        ExchangeRate.objects.create(
+            base_currency="USD", target_currency="GBP", rate=Decimal("0.8")
+        )
+        resistor_type = Types.objects.create(name="Resistor")
+        suppliers = [
+            ComponentSupplier.objects.create(
+                name=f"Supplier {index}",
+                short_name=f"S{index}",
+                url="https://example.com",
+            )
+            for index in range(4)
+        ]
+        for index in range(5):
+            component = Component.objects.create(
+                description=f"Resistor {index}", type=resistor_type
+            )
+            for supplier in suppliers:
+                ComponentSupplierItem.objects.create(
+                    component=component,
+                    supplier=supplier,
+                    supplier_item_no=f"{supplier.short_name}-{index}",
+                    price=Decimal("4.00"),
+                    pcs=2,
+                )
+
+    def serialize(self, currency):
+        request = Request(APIRequestFactory().get("/", {"currency": currency}))
+        components = Component.objects.select_related(
+            "manufacturer", "type", "category", "size"
+        ).prefetch_related("supplier_items__supplier")
+        return ComponentSerializer(
+            components, many=True, context={"request": request}
+        ).data
+
+    def test_conversion_does_not_query_per_supplier_item(self):
+        # Components, supplier items, suppliers, plus loading the rate matrix
+        with self.assertNumQueries(4):
+            data = self.serialize("EUR")
+        items = [item for component in data for item in component["supplier_items"]]
+        self.assertEqual(len(items), 20)
+        self.assertEqual({item["price"] for item in items}, {2.0})
+        self.assertEqual({item["unit_price"] for item in items}, {1.0})
+
+        # The matrix stays loaded in the process
+        with self.assertNumQueries(3):
+            self.serialize("EUR")
+
+    def test_page_prices_are_converted_in_one_decimal_pass(self):
+        ComponentSupplierItem.objects.filter(supplier_item_no="S0-0").update(
+            price=Decimal("0.05"), price_currency="GBP"
+        )
+        components = list(
+            Component.objects.select_related(
+                "manufacturer", "type", "category", "size"
+            ).prefetch_related("supplier_items__supplier")
+        )
+        context = supplier_item_price_context(components, "EUR")
+        # 0.05 GBP = 0.0625 USD = 0.03125 EUR, rounded half up to cents
+        item = ComponentSupplierItem.objects.get(supplier_item_no="S0-0")
+        self.assertEqual(
+            context["supplier_item_prices"][item.pk],
+            (Decimal("0.03"), Decimal("0.02")),
+        )
+
+        with self.assertNumQueries(0):
+            data = ComponentSerializer(components, many=True, context=context).data
+        prices = {
+            item["supplier_item_no"]: item["price"]
+            for component in data
+            for item in component["supplier_items"]
+        }
+        self.assertEqual(prices["S0-0"], Decimal("0.03"))
+        self.assertEqual(prices["S1-0"], Decimal("2.00"))
+
+    def test_matrix_derives_inverse_and_cross_rates(self):
+        self.assertEqual(get_cached_exchange_rate("EUR", "USD"), Decimal(2))
+        self.assertEqual(get_cached_exchange_rate("EUR", "GBP"), Decimal("1.6"))
+        with self.assertRaises(ValueError):
+            get_cached_exchange_rate("USD", "JPY")
+
+    def test_rate_changes_reload_the_matrix(self):
+        self.serialize("EUR")
+        ExchangeRate.objects.filter(target_currency="EUR").update(rate=Decimal("2"))
+        # Queryset updates skip the signals, saves do not
+        ExchangeRate.objects.get(target_currency="EUR").save()
+        items = self.serialize("EUR")[0]["supplier_items"]
+        self.assertEqual(items[0]["price"], 8.0)
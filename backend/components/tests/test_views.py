@@ -2,9 +2,19 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from accounts.models import CustomUser
-from components.models import Component, ComponentSupplierItem, Types, ComponentSupplier
+from components.models import (
+    Category,
+    Component,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    SizeStandard,
+    Types,
+)
 from inventory.models import UserInventory
 from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from components.search import search_components
 
 
 # Url: api/components/create/
@@ -249,3 +259,253 @@ class CreateComponentTests(APITestCase):
         self.assertIn("supplier_item_errors", response.data["fieldErrors"])
         self.assertFalse(Component.objects.exists())
         self.assertFalse(ComponentSupplierItem.objects.exists())
+
+
+# Url: api/components/?search=
+# Frontend: useGetComponents
+class ComponentSearchTests(APITestCase):
+    def setUp(self):
+        self.resistor_type = Types.objects.create(name="Resistor")
+        self.capacitor_type = Types.objects.create(name="Capacitor")
+        self.supplier = ComponentSupplier.objects.create(
+            name="Tayda Electronics",
+            short_name="Tayda",
+            url="https://tayda.example.com",
+        )
+        self.resistor = Component.objects.create(
+            description="10kΩ metal film resistor",
+            type=self.resistor_type,
+            manufacturer_part_no="MF25-10K",
+        )
+        self.capacitor = Component.objects.create(
+            description="100nF ceramic capacitor",
+            type=self.capacitor_type,
+            manufacturer_part_no="CC-100N",
+        )
+        ComponentSupplierItem.objects.create(
+            component=self.capacitor,
+            supplier=self.supplier,
+            supplier_item_no="A-553",
+            price=0.05,
+            pcs=1,
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse("component-list"), {"search": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result["id"] for result in response.data["results"]]
+
+    def test_search_columns_follow_related_changes(self):
+        self.capacitor.refresh_from_db()
+        self.assertIn("A-553", self.capacitor.search_text)
+        self.assertIn("Tayda Electronics", self.capacitor.search_text)
+
+        self.supplier.name = "Mouser"
+        self.supplier.save()
+        self.capacitor.refresh_from_db()
+        self.assertIn("Mouser", self.capacitor.search_text)
+        self.assertNotIn("Tayda", self.capacitor.search_text)
+
+    def test_search_matches_description_supplier_and_part_numbers(self):
+        self.assertEqual(self.search("metal film"), [str(self.resistor.id)])
+        self.assertEqual(self.search("A-553"), [str(self.capacitor.id)])
+        self.assertEqual(self.search("Tayda"), [str(self.capacitor.id)])
+        self.assertEqual(self.search("MF25"), [str(self.resistor.id)])
+        self.assertEqual(self.search("no such part"), [])
+
+    def test_search_matches_substrings(self):
+        self.assertEqual(self.search("film res"), [str(self.resistor.id)])
+
+    def test_search_uses_the_search_indexes(self):
+        components = search_components(Component.objects.order_by(), "ceramic")
+        self.assertNotIn("UPPER", str(components.query))
+        with connection.cursor() as cursor:
+            # Too few rows for the planner to choose an index on its own
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = components.explain()
+        self.assertIn("component_search_doc_gin", plan)
+        self.assertIn("component_search_text_trgm", plan)
+        self.assertNotIn("Seq Scan on components_component", plan)
+
+    def test_search_does_not_duplicate_components_per_supplier_item(self):
+        second_supplier = ComponentSupplier.objects.create(
+            name="Tayda Europe", short_name="TaydaEU", url="https://eu.example.com"
+        )
+        ComponentSupplierItem.objects.create(
+            component=self.capacitor,
+            supplier=second_supplier,
+            supplier_item_no="A-554",
+            price=0.06,
+            pcs=1,
+        )
+        self.assertEqual(self.search("Tayda"), [str(self.capacitor.id)])
+
+    def test_autocomplete_uses_search_columns(self):
+        response = self.client.get(reverse("component-autocomplete"), {"q": "ceramic"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual([result["id"] for result in results], [str(self.capacitor.id)])
+        self.assertEqual(
+            results[0]["suppliers"], [{"name": "Tayda Electronics", "item_no": "A-553"}]
+        )
+
+
+# Url: api/components/
+# Frontend: useGetComponents (filter sidebar)
+class ComponentFacetsTests(APITestCase):
+    def setUp(self):
+        self.resistor_type = Types.objects.create(name="Resistor")
+        self.capacitor_type = Types.objects.create(name="Capacitor")
+        for ohms in (10, 10, 47):
+            Component.objects.create(
+                description=f"{ohms}kΩ resistor",
+                type=self.resistor_type,
+                ohms=ohms,
+                ohms_unit="kΩ",
+                mounting_style="th",
+            )
+        Component.objects.create(
+            description="100nF capacitor",
+            type=self.capacitor_type,
+            farads=100,
+            farads_unit="nF",
+            mounting_style="smt",
+        )
+
+    def get(self, params=None, **headers):
+        response = self.client.get(reverse("component-list"), params or {}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_facets_include_catalog_and_counts(self):
+        data = self.get().data
+        self.assertEqual(data["unique_values"]["ohms"], ["10.0 kΩ", "47.0 kΩ"])
+        self.assertEqual(data["unique_values"]["type"], ["Capacitor", "Resistor"])
+        self.assertEqual(data["facet_counts"]["ohms"], {"10.0 kΩ": 2, "47.0 kΩ": 1})
+        self.assertEqual(data["facet_counts"]["mounting_style"], {"th": 3, "smt": 1})
+
+    def test_facet_counts_respect_active_filters(self):
+        data = self.get({"type": "Capacitor"}).data
+        # The catalog still lists every value, the counts only the matches
+        self.assertEqual(data["unique_values"]["ohms"], ["10.0 kΩ", "47.0 kΩ"])
+        self.assertEqual(data["facet_counts"]["ohms"], {})
+        self.assertEqual(data["facet_counts"]["farads"], {"100.0 nF": 1})
+
+    def test_facets_are_cached_and_skippable(self):
+        etag = self.get().data["facets_etag"]
+
+        # Cached facets: only the page and its prefetches hit the database
+        with self.assertNumQueries(3):
+            self.get()
+
+        not_modified = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertNotIn("unique_values", not_modified.data)
+        self.assertEqual(not_modified["X-Facets-ETag"], etag)
+        self.assertNotIn("facet_counts", self.get({"facets": "0"}).data)
+
+    def test_facets_etag_is_the_same_in_every_process(self):
+        etag = self.get().data["facets_etag"]
+        # A process with its own cache starts from a different version
+        cache.clear()
+        self.assertEqual(self.get()["X-Facets-ETag"], etag)
+        self.assertIsNone(self.get({"facets": "0"}).data["facets_etag"])
+
+    def test_component_writes_invalidate_facets(self):
+        etag = self.get().data["facets_etag"]
+        Component.objects.create(
+            description="1MΩ resistor",
+            type=self.resistor_type,
+            ohms=1,
+            ohms_unit="MΩ",
+        )
+        data = self.get(HTTP_IF_NONE_MATCH=etag).data
+        self.assertNotEqual(data["facets_etag"], etag)
+        self.assertIn("1.0 MΩ", data["unique_values"]["ohms"])
+
+
+# Url: api/components/?cursor=
+# Frontend: useComponents
+class ComponentCursorPaginationTests(APITestCase):
+    def setUp(self):
+        resistor_type = Types.objects.create(name="Resistor")
+        for index in range(35):
+            Component.objects.create(
+                description=f"Resistor {index % 20:02}",
+                type=resistor_type,
+                mounting_style="th",
+            )
+
+    def test_cursor_pages_follow_description_order(self):
+        first = self.client.get(reverse("component-list"), {"cursor": "", "facets": "0"})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["count"], 35)
+        self.assertEqual(len(first.data["results"]), 30)
+
+        second = self.client.get(
+            reverse("component-list"),
+            {"cursor": first.data["next_cursor"], "facets": "0"},
+        )
+        self.assertIsNone(second.data["next_cursor"])
+
+        ids = [item["id"] for item in first.data["results"] + second.data["results"]]
+        expected = [
+            str(pk)
+            for pk in Component.objects.order_by("description", "id").values_list(
+                "id", flat=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+
+
+# Url: api/components/trees/
+# Frontend: useComponentTrees
+class ComponentTreesTests(APITestCase):
+    def setUp(self):
+        self.passive = Category.objects.create(name="Passive")
+        self.resistors = Category.objects.create(name="Resistors", parent=self.passive)
+        self.capacitors = Category.objects.create(
+            name="Capacitors", parent=self.passive
+        )
+        self.active = Category.objects.create(name="Active")
+        self.smd = SizeStandard.objects.create(name="SMD")
+        self.size_0805 = SizeStandard.objects.create(name="0805", parent=self.smd)
+
+    def test_trees_match_nested_dicts(self):
+        data = self.client.get(reverse("component-trees")).data
+        self.assertEqual(
+            data["categories"],
+            [self.active.to_nested_dict(), self.passive.to_nested_dict()],
+        )
+        self.assertEqual(data["sizes"], [self.smd.to_nested_dict()])
+
+    def test_trees_are_cached_with_etag(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("component-trees"))
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                reverse("component-trees"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_trees_etag_is_the_same_in_every_process(self):
+        etag = self.client.get(reverse("component-trees"))["ETag"]
+        # A process with its own cache starts from a different version
+        cache.clear()
+        response = self.client.get(reverse("component-trees"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_tree_edits_invalidate_trees(self):
+        etag = self.client.get(reverse("component-trees"))["ETag"]
+        self.resistors.move_to(self.active)
+
+        response = self.client.get(reverse("component-trees"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        active, passive = response.data["categories"]
+        self.assertEqual(
+            [option["label"] for option in active["options"]], ["Resistors"]
+        )
+        self.assertEqual(
+            [option["label"] for option in passive["options"]], ["Capacitors"]
+        )
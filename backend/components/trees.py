@@ -0,0 +1,90 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from components.models import Category, SizeStandard
+from core.cache_versions import COMPONENT_TREES, get_cache_version
+
+# The cache and its versions are per process: tree edits made through another
+# process show up once the trees expire
+TREES_TIMEOUT = 60
+
+
+def build_tree(model):
+    """
+    Return the forest of an MPTT model as nested {"label", "value", "options"}
+    dicts, like MPTTModel.to_nested_dict, from a single query. Rows come in
+    (tree_id, lft) order, so every parent is read before its children and
+    siblings keep their tree order; roots are sorted by name.
+    """
+    nodes = {}
+    roots = []
+    rows = model.objects.order_by("tree_id", "lft").values_list(
+        "id", "name", "parent_id"
+    )
+    for node_id, name, parent_id in rows:
+        node = {"label": name, "value": node_id, "options": []}
+        nodes[node_id] = node
+        parent = nodes.get(parent_id)
+        if parent is None:
+            roots.append(node)
+        else:
+            parent["options"].append(node)
+    return sorted(roots, key=lambda node: node["label"])
+
+
+def _cached_trees():
+    """Return (trees, digest of trees), building and caching them if missing."""
+    key = f"component_trees_{get_cache_version(COMPONENT_TREES)}"
+    entry = cache.get(key)
+    if entry is None:
+        trees = {"categories": build_tree(Category), "sizes": build_tree(SizeStandard)}
+        digest = hashlib.md5(json.dumps(trees, sort_keys=True).encode()).hexdigest()
+        entry = (trees, digest)
+        cache.set(key, entry, timeout=TREES_TIMEOUT)
+    return entry
+
+
+def get_component_trees_etag():
+    """
+    Return the etag of get_component_trees(), a digest of the trees, so every
+    process gives the same etag for the same trees.
+    """
+    return '"%s"' % _cached_trees()[1]
+
+
+def get_component_trees():
+    """
+    Return the category and size standard trees as
+    {"categories": [...], "sizes": [...]}, each node being
+    {"label", "value", "options"} like MPTTModel.to_nested_dict. Compact list
+    serializers return category and size IDs to be looked up in this payload.
+
+    The trees are cached for TREES_TIMEOUT seconds under the component trees
+    cache version, which the components signals bump whenever a Category or
+    SizeStandard is saved, deleted or moved.
+    """
+    return _cached_trees()[0]
+
+
+def index_tree(roots):
+    """Return {node id: node} for every node of a tree from get_component_trees()."""
+    index = {}
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        index[node["value"]] = node
+        stack.extend(node["options"])
+    return index
+
+
+def flatten_tree(roots):
+    """Return every node of a tree as {"id", "name"}, sorted by name."""
+    return sorted(
+        (
+            {"id": node_id, "name": node["label"]}
+            for node_id, node in index_tree(roots).items()
+        ),
+        key=lambda option: option["name"],
+    )
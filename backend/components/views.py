@@ -5,23 +5,26 @@ from components.models import (
     Types,
     ComponentManufacturer,
     ComponentSupplier,
-    Category,
-    SizeStandard,
     ComponentSupplierItem,
 )
 from components.serializers import (
+    CompactComponentSerializer,
     ComponentSerializer,
     CreateComponentSerializer,
     CreateComponentSupplierItemSerializer,
+    supplier_item_price_context,
 )
 from inventory.models import UserInventory
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import etag
 from django.http import JsonResponse
 from django.db import transaction
 
 from django.core.paginator import Paginator
-from django.contrib.postgres.search import TrigramSimilarity
-from django.db.models import Q, FloatField, Value
+from components.facets import get_facets
+from components.search import MAX_SEARCH_RESULTS, search_components
+from components.trees import flatten_tree, get_component_trees, get_component_trees_etag
+from core.pagination import InvalidCursor, paginate_by_cursor
 from django.contrib.auth.decorators import login_required
 from rest_framework import status
 from rest_framework.decorators import api_view
@@ -89,31 +92,11 @@ class ComponentView(APIView):
             .all()
         )
 
-        # Apply TrigramSimilarity search if present
+        # Search the stored search columns (GIN indexed) if a query is present
         if search_query:
-            trigram_components = components.annotate(
-                similarity=TrigramSimilarity("description", search_query)
-                + TrigramSimilarity("manufacturer__name", search_query)
-                + TrigramSimilarity("manufacturer_part_no", search_query)
-                + TrigramSimilarity("supplier_items__supplier__name", search_query)
-                + TrigramSimilarity("supplier_items__supplier_item_no", search_query)
-                + TrigramSimilarity("type__name", search_query)
-            ).filter(similarity__gt=0.4)
-
-            ilike_components = components.filter(
-                Q(description__icontains=search_query)
-                | Q(manufacturer__name__icontains=search_query)
-                | Q(manufacturer_part_no__icontains=search_query)
-                | Q(supplier_items__supplier__name__icontains=search_query)
-                | Q(supplier_items__supplier_item_no__icontains=search_query)
-                | Q(type__name__icontains=search_query)
-            ).annotate(similarity=Value(0.0, output_field=FloatField()))
-
-            # Combine the QuerySets
-            components = (trigram_components | ilike_components).distinct()
-
-            # Sort components by similarity in descending order
-            components = components.order_by("-similarity")
+            components = search_components(components, search_query).order_by(
+                "-similarity", "-rank"
+            )
 
         # Dynamically apply filters
         try:
@@ -153,66 +136,72 @@ class ComponentView(APIView):
         if "type" in filters:
             components = components.filter(type__name__icontains=filters["type"])
 
-        # Create a paginator instance
-        paginator = Paginator(components, 30)
-
-        # Retrieve the page based on the page number
-        page = paginator.get_page(page_number)
-
-        # Serialize the retrieved Component instances
-        serializer = ComponentSerializer(page, many=True)
+        # Facets are skipped when asked to (?facets=0) and left out when the
+        # client already holds the current ones (?facets_etag= or If-None-Match)
+        facets, facets_etag = {}, None
+        if request.query_params.get("facets") != "0":
+            facets, facets_etag = get_facets(components, search_query, filters)
+            if facets_etag in (
+                request.query_params.get("facets_etag"),
+                request.headers.get("If-None-Match"),
+            ):
+                facets = {}
+
+        # A "cursor" parameter (empty for the first page) opts into keyset
+        # pagination over (description, id); relevance scores are floats and
+        # cannot be resumed from exactly, so search results are listed by
+        # description in this mode and the count is a cached one
+        cursor = request.query_params.get("cursor")
+        if cursor is not None:
+            try:
+                page = paginate_by_cursor(
+                    components, ("description", "id"), cursor=cursor, page_size=30
+                )
+            except InvalidCursor as e:
+                return Response({"error": str(e)}, status=400)
+            pagination = {"count": page.count, "next_cursor": page.next_cursor}
+        else:
+            # Bound the number of search matches that are counted and paginated
+            if search_query:
+                components = components[:MAX_SEARCH_RESULTS]
+
+            # Create a paginator instance
+            paginator = Paginator(components, 30)
+
+            # Retrieve the page based on the page number
+            page = paginator.get_page(page_number)
+            pagination = {
+                "count": paginator.count,
+                "next": page.next_page_number() if page.has_next() else None,
+                "previous": (
+                    page.previous_page_number() if page.has_previous() else None
+                ),
+            }
 
-        # Get unique values
-        unique_ohms = Component.get_unique_ohms_or_farads_values("ohms", "ohms_unit")
-        unique_farads = Component.get_unique_ohms_or_farads_values(
-            "farads", "farads_unit"
+        # Serialize the retrieved Component instances, converting all of the
+        # page's supplier item prices in one pass
+        components = list(page.object_list)
+        serializer_class = (
+            CompactComponentSerializer
+            if request.query_params.get("compact") == "1"
+            else ComponentSerializer
         )
-        unique_voltage_ratings = Component.get_unique_values("voltage_rating", str)
-        unique_tolerances = Component.get_unique_values("tolerance", str)
-        unique_mounting_style = Component.get_mounting_styles()
-
-        # Get unique manufacturer, supplier, and type names
-        unique_manufacturers = list(
-            ComponentManufacturer.objects.values("name", "pk")
-            .distinct()
-            .order_by("name")
-        )
-        unique_suppliers = list(
-            ComponentSupplier.objects.values("name", "pk").distinct().order_by("name")
-        )
-
-        unique_manufacturers = [
-            {"label": manufacturer["name"], "value": str(manufacturer["pk"])}
-            for manufacturer in unique_manufacturers
-        ]
-        unique_suppliers = [
-            {"label": supplier["name"], "value": str(supplier["pk"])}
-            for supplier in unique_suppliers
-        ]
-
-        unique_types = list(
-            Types.objects.values_list("name", flat=True).distinct().order_by("name")
+        serializer = serializer_class(
+            components, many=True, context=supplier_item_price_context(components)
         )
 
         # Prepare the response data
         response_data = {
-            "count": paginator.count,
-            "next": page.next_page_number() if page.has_next() else None,
-            "previous": page.previous_page_number() if page.has_previous() else None,
+            **pagination,
             "results": serializer.data,
-            "unique_values": {
-                "ohms": unique_ohms,
-                "farads": unique_farads,
-                "voltage_rating": unique_voltage_ratings,
-                "tolerance": unique_tolerances,
-                "mounting_style": unique_mounting_style,
-                "manufacturer": unique_manufacturers,
-                "supplier": unique_suppliers,
-                "type": unique_types,
-            },
+            "facets_etag": facets_etag,
+            **facets,
         }
 
-        return Response(response_data)
+        response = Response(response_data)
+        if facets_etag is not None:
+            response["X-Facets-ETag"] = facets_etag
+        return response
 
 
 @api_view(["GET"])
@@ -230,17 +219,39 @@ def get_components_by_ids(request, pks):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    components = Component.objects.filter(pk__in=component_pks)
+    components = list(
+        Component.objects.filter(pk__in=component_pks)
+        .select_related("manufacturer", "type", "category", "size")
+        .prefetch_related("supplier_items__supplier")
+    )
 
-    if not components.exists():
+    if not components:
         return Response(
             {"error": "Components do not exist"}, status=status.HTTP_404_NOT_FOUND
         )
 
-    serializer = ComponentSerializer(components, many=True)
+    serializer_class = (
+        CompactComponentSerializer
+        if request.query_params.get("compact") == "1"
+        else ComponentSerializer
+    )
+    serializer = serializer_class(
+        components, many=True, context=supplier_item_price_context(components)
+    )
     return Response(serializer.data)
 
 
+@etag(lambda request: get_component_trees_etag())
+@api_view(["GET"])
+def get_component_trees_view(request):
+    """
+    Return the category and size standard trees that compact component
+    payloads (?compact=1) refer to by ID. Clients holding the current trees
+    get a 304 by sending their ETag in If-None-Match.
+    """
+    return Response(get_component_trees())
+
+
 @cache_page(60 * 60)
 @login_required
 @api_view(["GET"])
@@ -249,8 +260,9 @@ def get_component_dropdowns(request):
         types = list(Types.objects.values("id", "name"))
         manufacturers = list(ComponentManufacturer.objects.values("id", "name"))
         suppliers = list(ComponentSupplier.objects.values("id", "name"))
-        categories = list(Category.objects.values("id", "name"))
-        sizes = list(SizeStandard.objects.values("id", "name"))
+        trees = get_component_trees()
+        categories = flatten_tree(trees["categories"])
+        sizes = flatten_tree(trees["sizes"])
         return JsonResponse(
             {
                 "types": types,
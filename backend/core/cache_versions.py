@@ -0,0 +1,38 @@
+import time
+
+from django.core.cache import cache
+
+# Names of the cache versions shared between apps
+MODULE_BOMS = "module_boms"
+COMPONENT_FACETS = "component_facets"
+COMPONENT_TREES = "component_trees"
+SITEMAPS = "sitemaps"
+
+
+def _version_key(name):
+    return f"cache_version_{name}"
+
+
+def get_cache_version(name):
+    """
+    Return the current version of a named group of cache entries. Build cache
+    keys from it so bump_cache_version() invalidates the whole group at once.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        # Start from a timestamp so a version lost on eviction is never reused
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(name):
+    """Invalidate every cache entry built from the named version."""
+    key = _version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
@@ -1,14 +1,31 @@
 import statistics
 from decimal import Decimal
-from django.db.models import Sum, F, Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Max
 from modules.models import (
+    DiySavingsSnapshot,
     Module,
     ModuleBomListItem,
 )
 
+# Number of old snapshot versions kept around after a refresh
+DIY_SAVINGS_SNAPSHOTS_KEPT = 5
+# Attempts at claiming the next version when concurrent refreshes collide
+DIY_SAVINGS_VERSION_ATTEMPTS = 5
+
 
 def calculate_diy_savings_stats():
-    """Calculate cost savings when building a DIY module compared to buying assembled, as a kit, or as a partial kit."""
+    """
+    Calculate cost savings when building a DIY module compared to buying assembled, as a kit, or as a partial kit.
+
+    Views should read the materialized result through get_diy_savings_stats()
+    instead of calling this directly.
+    """
+    return _calculate_diy_savings_stats()[0]
+
+
+def _calculate_diy_savings_stats():
+    """Return (stats, number of modules the stats are based on)."""
 
     modules_with_costs = Module.objects.filter(
         cost_built__isnull=False, cost_built__gt=0
@@ -32,28 +49,28 @@ def calculate_diy_savings_stats():
         "partial_kit_vs_full_kit": [],
     }
 
+    # Modules whose BOM has a DIY cost, i.e. at least one priced supplier item
+    modules_with_diy_cost = set(
+        ModuleBomListItem.objects.filter(
+            module_id__in=modules_with_costs.values("id"),
+            components_options__supplier_items__unit_price__gt=0,
+        )
+        .values_list("module_id", flat=True)
+        .distinct()
+    )
+
+    module_count = 0
     for module in modules_with_costs:
-        module_id = module["id"]
+        if module["id"] not in modules_with_diy_cost:
+            continue  # Skip modules where DIY cost is missing
+        module_count += 1
+
         cost_built = module["cost_built"] or Decimal("0")
         cost_kit = module["cost_kit"] or Decimal("0")
         cost_partial_kit = module["cost_partial_kit"] or Decimal("0")
         cost_pcb_only = module["cost_pcb_only"] or Decimal("0")
         cost_pcb_plus_front = module["cost_pcb_plus_front"] or Decimal("0")
 
-        # Calculate DIY cost from BOM (typically representing the DIY kit build)
-        bom_stats = (
-            ModuleBomListItem.objects.filter(module_id=module_id)
-            .annotate(
-                diy_cost=Sum(
-                    F("components_options__supplier_items__unit_price") * F("quantity")
-                )
-            )
-            .aggregate(avg_diy=Avg("diy_cost"))
-        )
-        diy_cost = bom_stats["avg_diy"] or Decimal("0")
-        if diy_cost == 0:
-            continue  # Skip modules where DIY cost is missing
-
         # Comparisons to Assembled cost
         if cost_built > 0:
             if cost_pcb_only > 0:
@@ -107,7 +124,7 @@ def calculate_diy_savings_stats():
             "median_savings": round(statistics.median(values), 2) if values else "N/A",
         }
 
-    return {
+    stats = {
         "pcb_only_vs_assembled": compute_stats(
             cost_differences["pcb_only_vs_assembled"]
         ),
@@ -131,3 +148,62 @@ def calculate_diy_savings_stats():
             cost_differences["partial_kit_vs_full_kit"]
         ),
     }
+    return stats, module_count
+
+
+@transaction.atomic
+def refresh_diy_savings_snapshot():
+    """Recalculate the DIY savings stats and store them as a new snapshot version."""
+    stats, module_count = _calculate_diy_savings_stats()
+    for attempt in range(DIY_SAVINGS_VERSION_ATTEMPTS):
+        latest_version = (
+            DiySavingsSnapshot.objects.aggregate(latest=Max("version"))["latest"] or 0
+        )
+        try:
+            with transaction.atomic():
+                snapshot = DiySavingsSnapshot.objects.create(
+                    version=latest_version + 1, stats=stats, module_count=module_count
+                )
+            break
+        except IntegrityError:
+            # A concurrent refresh claimed the version; read the new latest one
+            if attempt == DIY_SAVINGS_VERSION_ATTEMPTS - 1:
+                raise
+    DiySavingsSnapshot.objects.filter(
+        version__lte=snapshot.version - DIY_SAVINGS_SNAPSHOTS_KEPT
+    ).delete()
+    return snapshot
+
+
+def schedule_diy_savings_refresh():
+    """
+    Refresh the snapshot once the current transaction commits, or right away
+    outside of one. Changes committed together share one refresh: each change
+    registers a numbered callback, and the first of them to run refreshes for
+    every change scheduled so far on the connection. Callbacks dropped by a
+    rollback never run, so they cannot hold later refreshes back.
+    """
+    connection = transaction.get_connection()
+    state = getattr(connection, "diy_savings_refreshes", None)
+    if state is None:
+        state = connection.diy_savings_refreshes = {"scheduled": 0, "refreshed": 0}
+    state["scheduled"] += 1
+    number = state["scheduled"]
+
+    def refresh():
+        if number > state["refreshed"]:
+            state["refreshed"] = state["scheduled"]
+            refresh_diy_savings_snapshot()
+
+    transaction.on_commit(refresh)
+
+
+def get_diy_savings_stats():
+    """
+    Return the stats of the latest DIY savings snapshot. Only the very first
+    call (before any snapshot exists) computes them.
+    """
+    snapshot = DiySavingsSnapshot.objects.order_by("-version").only("stats").first()
+    if snapshot is None:
+        snapshot = refresh_diy_savings_snapshot()
+    return snapshot.stats
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from accounts.models import ExchangeRate
+from core.openexchangerates import CURRENCIES, compute_cross_rates, fetch_latest_rates
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_CODES = [code for code, _ in CURRENCIES]
+
+# How long a process keeps its matrix before reloading it from the database,
+# i.e. how late other processes see rates stored by this one
+MATRIX_TTL = 60
+# Stored rates older than this are downloaded again by the next process
+# reloading its matrix
+RATES_MAX_AGE = timedelta(hours=24)
+
+CENT = Decimal("0.01")
+
+# Reentrant: refreshing stale rates clears the matrix while it is being loaded
+_lock = threading.RLock()
+_matrix = {"loaded_at": None, "rates": {}}
+
+
+def build_rate_matrix(stored_rates):
+    """
+    Return {(base, target): Decimal} for every pair of CURRENCY_CODES that can
+    be derived from stored_rates ({(base, target): rate}). Pairs that are not
+    stored use the inverse of the opposite pair, then a cross rate via USD.
+    """
+
+    def direct(base, target):
+        if base == target:
+            return Decimal(1)
+        rate = stored_rates.get((base, target))
+        if rate:
+            return Decimal(rate)
+        inverse = stored_rates.get((target, base))
+        if inverse:
+            return Decimal(1) / Decimal(inverse)
+        return None
+
+    matrix = {}
+    for base in CURRENCY_CODES:
+        for target in CURRENCY_CODES:
+            rate = direct(base, target)
+            if rate is None:
+                to_usd, from_usd = direct(base, "USD"), direct("USD", target)
+                if to_usd is not None and from_usd is not None:
+                    rate = to_usd * from_usd
+            if rate is not None:
+                matrix[(base, target)] = rate
+    return matrix
+
+
+def _load_rate_matrix():
+    """Return the matrix of the stored rates and their latest update time."""
+    stored_rates, last_updated = {}, None
+    for base, target, rate, updated in ExchangeRate.objects.values_list(
+        "base_currency", "target_currency", "rate", "last_updated"
+    ):
+        stored_rates[(base, target)] = rate
+        if last_updated is None or updated > last_updated:
+            last_updated = updated
+    return build_rate_matrix(stored_rates), last_updated
+
+
+def _refresh_stale_rates():
+    """Download fresh rates and return their matrix, or None on failure."""
+    try:
+        refresh_exchange_rates()
+    except ValueError:
+        logger.warning("Could not refresh stale exchange rates", exc_info=True)
+        return None
+    return _load_rate_matrix()[0]
+
+
+def get_rate_matrix():
+    """
+    Return the process-local exchange rate matrix, {(base, target): Decimal}.
+
+    The matrix is loaded from the ExchangeRate table with a single query and
+    reloaded once it is MATRIX_TTL seconds old, so every process sees stored
+    rates at most that late; changes made by this process reload it right away.
+
+    Rates are kept current by the refresh_exchange_rates command. When a reload
+    finds no rates or only rates older than RATES_MAX_AGE, they are downloaded
+    first; a failed download keeps the stored rates until the next reload.
+    """
+    loaded_at = _matrix["loaded_at"]
+    if loaded_at is not None and time.monotonic() - loaded_at < MATRIX_TTL:
+        return _matrix["rates"]
+
+    with _lock:
+        loaded_at = _matrix["loaded_at"]
+        if loaded_at is None or time.monotonic() - loaded_at >= MATRIX_TTL:
+            rates, last_updated = _load_rate_matrix()
+            if last_updated is None or last_updated < now() - RATES_MAX_AGE:
+                rates = _refresh_stale_rates() or rates
+            _matrix["rates"] = rates
+            _matrix["loaded_at"] = time.monotonic()
+        return _matrix["rates"]
+
+
+def clear_rate_matrix():
+    """Make this process reload the matrix on its next use."""
+    with _lock:
+        _matrix["loaded_at"] = None
+
+
+def get_cached_exchange_rate(base_currency, target_currency):
+    """
+    Return the rate converting base_currency into target_currency as a Decimal.
+
+    Raises ValueError for unknown currencies or when no rate is stored.
+    """
+    base_currency = base_currency.upper()
+    target_currency = target_currency.upper()
+    if base_currency not in CURRENCY_CODES:
+        raise ValueError(f"Invalid base currency: {base_currency}")
+    if target_currency not in CURRENCY_CODES:
+        raise ValueError(f"Invalid target currency: {target_currency}")
+
+    rate = get_rate_matrix().get((base_currency, target_currency))
+    if rate is None:
+        raise ValueError(
+            f"Exchange rate not available for {base_currency} to {target_currency}"
+        )
+    return rate
+
+
+class CurrencyConverter:
+    """
+    Converts amounts into one target currency with Decimal arithmetic, rounded
+    half up to cents. The rate of each source currency is read from the rate
+    matrix once per converter, so a converter built for a response converts
+    any number of amounts without further lookups.
+    """
+
+    def __init__(self, target_currency="USD"):
+        self.target_currency = target_currency.upper()
+        self._rates = {}
+
+    def rate_from(self, currency):
+        currency = currency.upper()
+        if currency == self.target_currency:
+            return Decimal(1)
+        if currency not in self._rates:
+            self._rates[currency] = get_cached_exchange_rate(
+                currency, self.target_currency
+            )
+        return self._rates[currency]
+
+    def convert(self, amount, currency):
+        """Convert one amount; None stays None. Raises ValueError without a rate."""
+        if amount is None:
+            return None
+        return (Decimal(amount) * self.rate_from(currency)).quantize(
+            CENT, rounding=ROUND_HALF_UP
+        )
+
+    def convert_many(self, amounts):
+        """Convert an iterable of (amount, currency) pairs into a list."""
+        return [self.convert(amount, currency) for amount, currency in amounts]
+
+
+def refresh_exchange_rates():
+    """
+    Fetch the latest rates with one upstream request and store every cross
+    rate between CURRENCY_CODES (15 x 14 pairs) with a single upsert, then
+    reload the rate matrix of this process. Returns the number of stored rates.
+
+    Raises ValueError when the rates cannot be fetched; stored rates are left
+    untouched in that case.
+    """
+    cross_rates = compute_cross_rates(fetch_latest_rates())
+    updated_at = now()
+    with transaction.atomic():
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(
+                    base_currency=base,
+                    target_currency=target,
+                    rate=rate,
+                    last_updated=updated_at,
+                )
+                for (base, target), rate in cross_rates.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["base_currency", "target_currency"],
+            update_fields=["rate", "last_updated"],
+        )
+        # bulk_create sends no signals
+        transaction.on_commit(clear_rate_matrix)
+    return len(cross_rates)
@@ -0,0 +1,99 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from shopping_list.optimizer import (
+    DEFAULT_TIME_BUDGET,
+    SupplierOption,
+    SupplierTerms,
+    optimize_suppliers,
+    plan_cost,
+)
+
+
+def synthetic_cart(rng, lines, suppliers):
+    """
+    A cart of `lines` components, each sold by a random subset of the
+    suppliers at prices between 0.05 and 5.00.
+    """
+    cart = []
+    for line in range(lines):
+        sellers = rng.sample(range(suppliers), rng.randint(1, suppliers))
+        cart.append(
+            [
+                SupplierOption(
+                    supplier, (line, supplier), Decimal(rng.randint(5, 500)) / 100
+                )
+                for supplier in sellers
+            ]
+        )
+    return cart
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the shopping list supplier optimizer on synthetic carts and "
+        "compare it with buying every line from its cheapest supplier."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines",
+            type=int,
+            nargs="+",
+            default=[50, 200, 500, 1000, 2000],
+            help="Cart sizes to benchmark (default 50 200 500 1000 2000).",
+        )
+        parser.add_argument(
+            "--suppliers",
+            type=int,
+            default=5,
+            help="Number of suppliers (default 5).",
+        )
+        parser.add_argument(
+            "--overhead",
+            type=Decimal,
+            default=Decimal("7.50"),
+            help="Order overhead of every supplier (default 7.50).",
+        )
+        parser.add_argument(
+            "--minimum",
+            type=Decimal,
+            default=Decimal("20.00"),
+            help="Minimum order value of every supplier (default 20.00).",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=DEFAULT_TIME_BUDGET,
+            help=f"Seconds per cart (default {DEFAULT_TIME_BUDGET}).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        terms = {
+            supplier: SupplierTerms(options["overhead"], options["minimum"])
+            for supplier in range(options["suppliers"])
+        }
+
+        for lines in options["lines"]:
+            cart = synthetic_cart(rng, lines, options["suppliers"])
+            cheapest = plan_cost(
+                [min(line, key=lambda option: option.cost) for line in cart], terms
+            )
+
+            started = time.perf_counter()
+            plan = optimize_suppliers(cart, terms, time_budget=options["time_budget"])
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{lines:>5} lines: {elapsed * 1000:8.1f} ms, "
+                f"{'exact' if plan.exact else 'heuristic':>9}, "
+                f"total {plan.total} vs {cheapest} cheapest per line "
+                f"({len(plan.supplier_subtotals())} suppliers)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
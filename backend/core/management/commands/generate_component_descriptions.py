@@ -1,64 +1,112 @@
-from django.core.management.base import BaseCommand
-from components.models import Component
-from django.db import models
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
 
-class Command(BaseCommand):
-    help = "Update descriptions only for Components with ohms, farads, or a supplier."
+from components.models import Component
+from components.search import update_component_search_index
+from components.utils.generate_component_descriptions import (
+    ComponentDescriptionGenerator,
+)
+from core.cache_versions import COMPONENT_FACETS, MODULE_BOMS, bump_cache_version
+from core.streaming import iter_chunks
 
-    def handle(self, *args, **kwargs):
-        # Filter components with ohms, farads, or any supplier
-        components = Component.objects.filter(
-            models.Q(ohms__isnull=False)
-            | models.Q(farads__isnull=False)
-            | models.Q(supplier__isnull=False)
-        )
-        updated_count = 0
+DESCRIPTION_CHUNK_SIZE = 1000
 
-        for component in components:
-            new_description = self.generate_description(component)
 
-            if new_description and new_description != component.description:
-                component.description = new_description
-                component.save()
-                updated_count += 1
+def describe(components):
+    """Return the (pk, description) pairs of components with a new description."""
+    changed = []
+    for component in components:
+        description = ComponentDescriptionGenerator.generate_description(component)
+        if description and description != component.description:
+            changed.append((component.pk, description))
+    return changed
 
-        self.stdout.write(
-            self.style.SUCCESS(f"{updated_count} Component descriptions updated.")
-        )
 
-    def generate_description(self, component):
-        """
-        Generate a short and logical description for a Component, ensuring clarity
-        and including manufacturer when a part number is present.
-        """
-        description = ""
+class Command(BaseCommand):
+    help = (
+        "Regenerate component descriptions in chunks, writing only the ones "
+        "that changed."
+    )
 
-        # Prioritize value fields
-        if component.ohms and component.ohms_unit:
-            description = f"{component.ohms}{component.ohms_unit} Resistor"
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DESCRIPTION_CHUNK_SIZE,
+            help="Number of components read, described and written at a time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes generating descriptions; 1 generates them inline.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the descriptions that would change, writing nothing.",
+        )
 
-        elif component.farads and component.farads_unit:
-            description = f"{component.farads}{component.farads_unit} Capacitor"
+    def handle(self, *args, **options):
+        chunk_size, workers = options["chunk_size"], options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size and --workers must be at least 1.")
+        self.dry_run = options["dry_run"]
 
-        elif component.forward_current and component.forward_voltage:
-            description = (
-                f"{component.forward_current}, {component.forward_voltage} LED"
-            )
+        components = Component.objects.select_related(
+            "type", "category", "size", "manufacturer"
+        ).order_by("pk")
+        self.total = components.count()
+        self.processed = self.updated = 0
+        chunks = iter_chunks(components, chunk_size)
 
-        elif component.type:
-            description = f"{component.type.name}"
+        if workers == 1:
+            for chunk in chunks:
+                self.write_chunk(chunk, describe(chunk))
+        else:
+            # Spawned workers must set Django up before unpickling components
+            with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+                # At most two chunks per worker are in flight
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(describe, chunk)))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft()
+                        self.write_chunk(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    self.write_chunk(chunk, future.result())
 
-        # Add manufacturer and part number if available
-        if component.manufacturer and component.manufacturer_part_no:
-            description += f" by {component.manufacturer.name} (Part No: {component.manufacturer_part_no})"
+        if self.updated and not self.dry_run:
+            # Bulk writes send no signals
+            bump_cache_version(COMPONENT_FACETS)
+            bump_cache_version(MODULE_BOMS)
 
-        # Add manufacturer if part number is unavailable
-        elif component.manufacturer:
-            description += f" by {component.manufacturer.name}"
+        verb = "would be updated" if self.dry_run else "updated"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{self.updated} of {self.total} Component descriptions {verb}."
+            )
+        )
 
-        # Fallback to part number only if no other info is available
-        elif component.manufacturer_part_no:
-            description += f" (Part No: {component.manufacturer_part_no})"
+    def write_chunk(self, chunk, changed):
+        descriptions = dict(changed)
+        components = [component for component in chunk if component.pk in descriptions]
+        if components and not self.dry_run:
+            now = timezone.now()
+            for component in components:
+                component.description = descriptions[component.pk]
+                component.datetime_updated = now
+            Component.objects.bulk_update(components, ["description", "datetime_updated"])
+            update_component_search_index([component.pk for component in components])
 
-        return description.strip()
+        self.processed += len(chunk)
+        self.updated += len(components)
+        self.stdout.write(
+            f"Processed {self.processed}/{self.total} components, "
+            f"{self.updated} descriptions changed."
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from inventory.history import HISTORY_LIMIT, prune_inventory_history
+
+
+class Command(BaseCommand):
+    help = "Delete all but the most recent inventory history events of every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=HISTORY_LIMIT,
+            help=f"Number of events to keep per user (default {HISTORY_LIMIT}).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_inventory_history(keep=options["keep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} inventory history events.")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from components.search import update_component_search_index
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored full-text and trigram search columns of every component."
+
+    def handle(self, *args, **options):
+        updated = update_component_search_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Search columns rebuilt for {updated} components.")
+        )
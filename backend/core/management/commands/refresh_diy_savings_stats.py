@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.calculate_diy_savings_stats import refresh_diy_savings_snapshot
+
+
+class Command(BaseCommand):
+    help = "Recalculate the DIY savings statistics shown on the homepage and store them as a new snapshot."
+
+    def handle(self, *args, **options):
+        snapshot = refresh_diy_savings_snapshot()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"DIY savings snapshot v{snapshot.version} stored ({snapshot.module_count} modules)."
+            )
+        )
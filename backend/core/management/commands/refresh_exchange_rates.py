@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from accounts.models import ExchangeRate
+from core.exchange_rates import CURRENCY_CODES, refresh_exchange_rates
+
+
+class Command(BaseCommand):
+    help = "Refresh every stored exchange rate from a single Open Exchange Rates download. Run it periodically; requests only download rates once the stored ones are stale."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=24,
+            help="Skip the download when every rate is newer than this many hours (default 24).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Download the rates even if the stored ones are fresh.",
+        )
+
+    def handle(self, *args, **options):
+        stale_before = now() - timedelta(hours=options["max_age"])
+        pair_count = len(CURRENCY_CODES) * (len(CURRENCY_CODES) - 1)
+        fresh_count = ExchangeRate.objects.filter(
+            base_currency__in=CURRENCY_CODES,
+            target_currency__in=CURRENCY_CODES,
+            last_updated__gt=stale_before,
+        ).count()
+        if fresh_count >= pair_count and not options["force"]:
+            self.stdout.write(self.style.SUCCESS("Exchange rates are up to date."))
+            return
+
+        stored = refresh_exchange_rates()
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} exchange rates."))
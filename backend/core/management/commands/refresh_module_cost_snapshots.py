@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from modules.cost_snapshots import refresh_module_cost_snapshots
+from modules.models import Module
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed BOM cost snapshots of every module (or of the given module ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "module_ids", nargs="*", help="Only rebuild the snapshots of these modules."
+        )
+
+    def handle(self, *args, **options):
+        module_ids = options["module_ids"] or list(
+            Module.objects.values_list("id", flat=True)
+        )
+        refresh_module_cost_snapshots(module_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cost snapshots rebuilt for {len(module_ids)} module(s)."
+            )
+        )
@@ -1,8 +1,69 @@
+import copy
+
 from django.db import models
 from django.utils import timezone
 
 
-class BaseModel(models.Model):
+class TrackedFieldsMixin:
+    """
+    Remembers the values that the fields named in tracked_fields had when the
+    instance was read from the database, refreshed or last saved, so saves
+    and signals can tell what changed without reading the row again.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        self._snapshot_tracked_fields(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields(kwargs.get("update_fields"))
+
+    def _snapshot_tracked_fields(self, field_names=None):
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for name in self.tracked_fields:
+            if field_names is not None and name not in field_names:
+                continue
+            field = self._meta.get_field(name)
+            # Deferred fields are read on demand by loaded_value()
+            if field.attname in self.__dict__:
+                # value_from_object() so fields with descriptors, such as
+                # MoneyField, are compared as the values they expose
+                loaded[name] = copy.deepcopy(field.value_from_object(self))
+
+    def loaded_value(self, name):
+        """
+        The value the tracked field name had in the database when the instance
+        was read or last saved. Only meaningful for saved instances; a deferred
+        field is read from the database the first time.
+        """
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        if name not in loaded:
+            loaded[name] = (
+                type(self)
+                ._base_manager.filter(pk=self.pk)
+                .values_list(name, flat=True)
+                .get()
+            )
+        return loaded[name]
+
+    def has_changed(self, name):
+        """Whether the tracked field name differs from its loaded value."""
+        if self._state.adding:
+            return True
+        field = self._meta.get_field(name)
+        return field.value_from_object(self) != self.loaded_value(name)
+
+
+class BaseModel(TrackedFieldsMixin, models.Model):
     datetime_updated = models.DateTimeField(auto_now=True)
     datetime_created = models.DateTimeField(auto_now_add=True, blank=True, null=True)
 
@@ -0,0 +1,143 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Q
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        # Keep the microseconds, the next page starts right after this value
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot use {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, fields):
+    """
+    Return the values of cursor converted by the to_python() of the model
+    fields it was encoded for, raising InvalidCursor for any that is invalid,
+    so tampered cursors never reach the database.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor("Invalid cursor.")
+    try:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+    except (AttributeError, TypeError, ValueError, ValidationError):
+        raise InvalidCursor("Invalid cursor.")
+    if None in values:
+        raise InvalidCursor("Invalid cursor.")
+    return values
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated queryset. Iterates like a Paginator page so
+    templates can use it in place of page_obj.
+    """
+
+    def __init__(self, object_list, next_cursor, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _keyset_filter(ordering, values):
+    """
+    Build the filter selecting the rows that sort after `values` for the given
+    ordering, e.g. for ("-datetime_updated", "id"):
+    datetime_updated < v0 OR (datetime_updated = v0 AND id > v1).
+    """
+    keyset_filter = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": values[index]})
+        for previous_field, previous_value in zip(ordering[:index], values):
+            condition &= Q(**{previous_field.lstrip("-"): previous_value})
+        keyset_filter |= condition
+    return keyset_filter
+
+
+def _row_value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    Return queryset.count(), cached for a few minutes per SQL query. Used as the
+    approximate total of cursor-paginated lists, so scrolling deeper does not
+    pay for a COUNT(*) on every page.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = "queryset_count_" + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=timeout)
+    return count
+
+
+def paginate_by_cursor(queryset, ordering, cursor=None, page_size=10):
+    """
+    Return the CursorPage of queryset that follows cursor (the first page when
+    cursor is empty). ordering lists the sort keys, fields of the queryset's
+    model; the last one must be unique (usually "id") so every row has a stable
+    position. Each page costs one
+    index range scan regardless of how deep the client has scrolled.
+
+    Raises InvalidCursor when the cursor was not produced by this ordering.
+    """
+    ordering = tuple(ordering)
+    queryset = queryset.order_by(*ordering)
+    total = cached_count(queryset)
+    if cursor:
+        fields = [
+            queryset.model._meta.get_field(field.lstrip("-")) for field in ordering
+        ]
+        queryset = queryset.filter(
+            _keyset_filter(ordering, decode_cursor(cursor, fields))
+        )
+
+    rows = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(
+            [_row_value(rows[-1], field.lstrip("-")) for field in ordering]
+        )
+    return CursorPage(rows, next_cursor, count=total)
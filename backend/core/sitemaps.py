@@ -1,48 +1,73 @@
 from django.contrib.sitemaps import Sitemap
-from django.contrib.sites.models import Site
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.db.models import Max
 from django.urls import reverse
 from blog.models import BlogPost
 from modules.models import Module, Manufacturer
-from components.models import Component, Types
+from components.models import Component
+from core.cache_versions import SITEMAPS, get_cache_version
 
+# URLs per sitemap page; larger sections are split into ?p= pages listed by
+# the index
+SITEMAP_PAGE_SIZE = 5000
+# Content changes bump the version, but the cache is per process, so other
+# processes only see them once their pages expire
+SITEMAP_TIMEOUT = 60 * 60 * 24
 
-class ProjectSitemap(Sitemap):
+
+class ModelSitemap(Sitemap):
+    """
+    A sitemap of model instances, paged by SITEMAP_PAGE_SIZE. items() should
+    load only the fields location() and lastmod() read.
+    """
+
+    protocol = "https"
+    limit = SITEMAP_PAGE_SIZE
+
+    def lastmod(self, obj):
+        return obj.datetime_updated
+
+    def get_latest_lastmod(self):
+        # One aggregate instead of calling lastmod() on every item
+        return self.items().aggregate(latest=Max("datetime_updated"))["latest"]
+
+
+class ProjectSitemap(ModelSitemap):
     changefreq = "weekly"
     priority = 0.7
-    protocol = "https"
 
     def items(self):
-        return Module.objects.filter(discontinued=False)
-
-    def lastmod(self, obj):
-        return obj.datetime_updated  # Update to the correct timestamp field
+        return (
+            Module.objects.filter(discontinued=False)
+            .only("id", "slug", "datetime_updated")
+            .order_by("id")
+        )
 
 
-class ManufacturerSitemap(Sitemap):
+class ManufacturerSitemap(ModelSitemap):
     changefreq = "monthly"
     priority = 0.6
-    protocol = "https"
 
     def items(self):
-        return Manufacturer.objects.all()
+        return Manufacturer.objects.only("id", "slug", "datetime_updated").order_by(
+            "id"
+        )
 
     def location(self, obj):
         return reverse("manufacturer_detail", args=[obj.slug])
 
-    def lastmod(self, obj):
-        return obj.datetime_updated  # Ensure this field exists
-
 
-class ComponentSitemap(Sitemap):
+class ComponentSitemap(ModelSitemap):
     changefreq = "daily"
     priority = 0.8
-    protocol = "https"
 
     def items(self):
-        return Component.objects.filter(discontinued=False)
-
-    def lastmod(self, obj):
-        return obj.datetime_updated  # Update to the correct field
+        return (
+            Component.objects.filter(discontinued=False)
+            .only("id", "datetime_updated")
+            .order_by("id")
+        )
 
 
 class StaticViewSitemap(Sitemap):
@@ -57,16 +82,54 @@ class StaticViewSitemap(Sitemap):
         return reverse(item)
 
 
-class BlogSitemap(Sitemap):
+class BlogSitemap(ModelSitemap):
     changefreq = "weekly"
     priority = 0.9
-    protocol = "https"
 
     def items(self):
-        return BlogPost.objects.filter(published=True).order_by("-datetime_updated")
-
-    def lastmod(self, obj):
-        return obj.datetime_updated
+        return (
+            BlogPost.objects.filter(published=True)
+            .only("id", "slug", "datetime_updated")
+            .order_by("-datetime_updated", "id")
+        )
 
     def location(self, obj):
         return reverse("blog:blog_detail", args=[obj.slug])
+
+
+sitemaps = {
+    "projects": ProjectSitemap,
+    "manufacturers": ManufacturerSitemap,
+    "components": ComponentSitemap,
+    "static": StaticViewSitemap,
+    "blog": BlogSitemap,
+}
+
+
+def _cached_response(key, render):
+    """
+    The rendered response cached under key in the current sitemaps version,
+    rendering it with render() when missing. Errors are not cached.
+    """
+    key = f"sitemap_{get_cache_version(SITEMAPS)}_{key}"
+    response = cache.get(key)
+    if response is None:
+        response = render()
+        response.render()
+        cache.set(key, response, SITEMAP_TIMEOUT)
+    return response
+
+
+def sitemap_index(request, sitemaps):
+    return _cached_response("index", lambda: sitemap_views.index(request, sitemaps))
+
+
+def sitemap_section(request, sitemaps, section):
+    page = request.GET.get("p", "1")
+    if not page.isdigit():
+        # Rejected by the sitemap view, keep junk out of the cache
+        return sitemap_views.sitemap(request, sitemaps, section)
+    return _cached_response(
+        f"{section}_{int(page)}",
+        lambda: sitemap_views.sitemap(request, sitemaps, section),
+    )
@@ -0,0 +1,61 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 500
+
+STREAM_CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_chunks(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield the rows of queryset in lists of up to chunk_size. Rows are read with
+    a server-side cursor and prefetch_related lookups run once per chunk, so
+    memory stays bounded whatever the size of the queryset.
+    """
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dumps(item):
+    return json.dumps(item, cls=JSONEncoder, separators=(",", ":"))
+
+
+def _iter_ndjson(serialized_chunks):
+    for items in serialized_chunks:
+        yield "".join(_dumps(item) + "\n" for item in items)
+
+
+def _iter_json_array(serialized_chunks):
+    yield "["
+    separator = ""
+    for items in serialized_chunks:
+        for item in items:
+            yield separator + _dumps(item)
+            separator = ","
+    yield "]"
+
+
+def streaming_json_response(serialized_chunks, mode="json"):
+    """
+    Return a StreamingHttpResponse of the items of serialized_chunks (an
+    iterable of lists of serialized items) as one JSON array (mode "json") or
+    one JSON document per line (mode "ndjson"). Chunks are serialized lazily,
+    while the response is being sent.
+    """
+    stream = (
+        _iter_ndjson(serialized_chunks)
+        if mode == "ndjson"
+        else _iter_json_array(serialized_chunks)
+    )
+    return StreamingHttpResponse(stream, content_type=STREAM_CONTENT_TYPES[mode])
@@ -0,0 +1,138 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now
+
+from accounts.models import ExchangeRate
+from core.exchange_rates import (
+    CURRENCY_CODES,
+    MATRIX_TTL,
+    RATES_MAX_AGE,
+    clear_rate_matrix,
+    get_cached_exchange_rate,
+    refresh_exchange_rates,
+)
+
+FIXTURE = Path(__file__).parent / "fixtures" / "openexchangerates_latest.json"
+
+
+def stub_latest_response(status_code=200):
+    """A stand-in for the requests.get response of latest.json."""
+    response = Mock(status_code=status_code, text="stubbed")
+    response.json.return_value = json.loads(FIXTURE.read_text())
+    return response
+
+
+@patch.dict("os.environ", {"OPENEXCHANGERATES_APP_ID": "test-app-id"})
+class RefreshExchangeRatesTests(TestCase):
+    def setUp(self):
+        clear_rate_matrix()
+
+    @patch("core.openexchangerates.requests.get")
+    def test_single_fetch_stores_every_cross_rate(self, get):
+        get.return_value = stub_latest_response()
+        with self.captureOnCommitCallbacks(execute=True):
+            stored = refresh_exchange_rates()
+
+        pair_count = len(CURRENCY_CODES) * (len(CURRENCY_CODES) - 1)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(stored, pair_count)
+        self.assertEqual(ExchangeRate.objects.count(), pair_count)
+        # Currencies outside CURRENCIES in the payload are ignored
+        self.assertFalse(ExchangeRate.objects.filter(target_currency="MXN").exists())
+
+        self.assertEqual(
+            ExchangeRate.objects.get(base_currency="USD", target_currency="EUR").rate,
+            Decimal("0.920000"),
+        )
+        # 0.79 / 0.92
+        self.assertEqual(
+            ExchangeRate.objects.get(base_currency="EUR", target_currency="GBP").rate,
+            Decimal("0.858696"),
+        )
+        self.assertEqual(get_cached_exchange_rate("EUR", "GBP"), Decimal("0.858696"))
+
+    @patch("core.openexchangerates.requests.get")
+    def test_refresh_updates_existing_rates_in_place(self, get):
+        ExchangeRate.objects.create(
+            base_currency="USD", target_currency="EUR", rate=Decimal("1.5")
+        )
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("1.5"))
+
+        get.return_value = stub_latest_response()
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_exchange_rates()
+
+        self.assertEqual(
+            ExchangeRate.objects.filter(
+                base_currency="USD", target_currency="EUR"
+            ).count(),
+            1,
+        )
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("0.92"))
+
+    @patch("core.openexchangerates.requests.get")
+    def test_failed_fetch_keeps_stored_rates(self, get):
+        ExchangeRate.objects.create(
+            base_currency="USD", target_currency="EUR", rate=Decimal("1.5")
+        )
+        get.return_value = stub_latest_response(status_code=500)
+        with self.assertRaises(ValueError):
+            refresh_exchange_rates()
+        self.assertEqual(ExchangeRate.objects.get().rate, Decimal("1.5"))
+
+    @patch("core.openexchangerates.requests.get")
+    def test_command_skips_fresh_rates(self, get):
+        get.return_value = stub_latest_response()
+        call_command("refresh_exchange_rates", stdout=Mock())
+        call_command("refresh_exchange_rates", stdout=Mock())
+        self.assertEqual(get.call_count, 1)
+        call_command("refresh_exchange_rates", "--force", stdout=Mock())
+        self.assertEqual(get.call_count, 2)
+
+    @patch("core.exchange_rates.time.monotonic")
+    def test_matrix_reloads_rates_stored_elsewhere_after_the_ttl(self, monotonic):
+        monotonic.return_value = 1000.0
+        ExchangeRate.objects.create(
+            base_currency="USD", target_currency="EUR", rate=Decimal("1.5")
+        )
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("1.5"))
+
+        # As stored by another process: no signal reaches this one
+        ExchangeRate.objects.update(rate=Decimal("0.92"))
+        monotonic.return_value += MATRIX_TTL - 1
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("1.5"))
+
+        monotonic.return_value += 1
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("0.92"))
+
+    @patch("core.openexchangerates.requests.get")
+    def test_stale_rates_are_refreshed_on_reload(self, get):
+        ExchangeRate.objects.create(
+            base_currency="USD",
+            target_currency="EUR",
+            rate=Decimal("1.5"),
+            last_updated=now() - RATES_MAX_AGE - timedelta(minutes=1),
+        )
+        get.return_value = stub_latest_response()
+
+        self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("0.92"))
+        self.assertEqual(get.call_count, 1)
+
+    @patch("core.openexchangerates.requests.get")
+    def test_failed_refresh_keeps_stale_rates(self, get):
+        ExchangeRate.objects.create(
+            base_currency="USD",
+            target_currency="EUR",
+            rate=Decimal("1.5"),
+            last_updated=now() - RATES_MAX_AGE - timedelta(minutes=1),
+        )
+        get.return_value = stub_latest_response(status_code=500)
+
+        with self.assertLogs("core.exchange_rates", "WARNING"):
+            self.assertEqual(get_cached_exchange_rate("USD", "EUR"), Decimal("1.5"))
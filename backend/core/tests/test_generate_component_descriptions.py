@@ -0,0 +1,65 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from components.models import Category, Component, ComponentManufacturer, Types
+from components.utils.generate_component_descriptions import (
+    ComponentDescriptionGenerator,
+)
+
+
+class GenerateComponentDescriptionsTests(TestCase):
+    def setUp(self):
+        resistor = Types.objects.create(name="Resistor")
+        category = Category.objects.create(name="Resistors")
+        vishay = ComponentManufacturer.objects.create(name="Vishay")
+        self.stale = [
+            Component.objects.create(
+                description="Stale",
+                type=resistor,
+                category=category,
+                ohms=ohms,
+                ohms_unit="kΩ",
+                manufacturer=vishay,
+            )
+            for ohms in (1, 10, 100)
+        ]
+        self.current = Component.objects.create(
+            description="Current", type=resistor, ohms=47, ohms_unit="Ω"
+        )
+        self.current.description = ComponentDescriptionGenerator.generate_description(
+            self.current
+        )
+        self.current.save()
+        self.current.refresh_from_db()
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command("generate_component_descriptions", *args, stdout=out)
+        return out.getvalue()
+
+    def test_updates_changed_descriptions_only(self):
+        output = self.run_command("--chunk-size=2")
+
+        for component in self.stale:
+            component.refresh_from_db()
+            self.assertEqual(
+                component.description, f"{component.ohms:g}kΩ Resistor by Vishay"
+            )
+        current = Component.objects.get(pk=self.current.pk)
+        self.assertEqual(current.datetime_updated, self.current.datetime_updated)
+        self.assertIn("Processed 2/4 components", output)
+        self.assertIn("3 of 4 Component descriptions updated.", output)
+
+    def test_process_pool(self):
+        output = self.run_command("--chunk-size=1", "--workers=2")
+
+        self.assertIn("3 of 4 Component descriptions updated.", output)
+        self.assertFalse(Component.objects.filter(description="Stale").exists())
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_command("--dry-run")
+
+        self.assertIn("3 of 4 Component descriptions would be updated.", output)
+        self.assertEqual(Component.objects.filter(description="Stale").count(), 3)
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from components.models import (
+    Component,
+    ComponentSupplier,
+    ComponentSupplierItem,
+    Types,
+)
+from inventory.models import UserInventory
+
+User = get_user_model()
+
+
+class TrackedFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tracker", password="password")
+        self.component = Component.objects.create(
+            description="Pending", type=Types.objects.create(name="Resistor")
+        )
+        Component.objects.filter(pk=self.component.pk).update(
+            user_submitted_status="pending"
+        )
+        self.supplier_item = ComponentSupplierItem.objects.create(
+            component=self.component,
+            supplier=ComponentSupplier.objects.create(name="Tayda"),
+            supplier_item_no="A-1",
+            user_submitted_status="pending",
+            submitted_by=self.user,
+        )
+
+    def test_loaded_value_needs_no_query(self):
+        component = Component.objects.get(pk=self.component.pk)
+        component.user_submitted_status = "approved"
+
+        with self.assertNumQueries(0):
+            self.assertEqual(component.loaded_value("user_submitted_status"), "pending")
+            self.assertTrue(component.has_changed("user_submitted_status"))
+
+    def test_deferred_field_is_read_on_demand(self):
+        component = Component.objects.only("id").get(pk=self.component.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(component.loaded_value("user_submitted_status"), "pending")
+
+    def test_approving_a_pending_component_approves_its_supplier_items(self):
+        component = Component.objects.get(pk=self.component.pk)
+        component.user_submitted_status = "approved"
+        component.save()
+
+        self.supplier_item.refresh_from_db()
+        self.assertEqual(self.supplier_item.user_submitted_status, "approved")
+        self.assertEqual(component.loaded_value("user_submitted_status"), "approved")
+
+    def test_inventory_old_fields_come_from_the_loaded_row(self):
+        item = UserInventory.objects.create(
+            user=self.user, component=self.component, quantity=3, location=["Box"]
+        )
+        item = UserInventory.objects.get(pk=item.pk)
+        item.quantity = 5
+        item.location = ["Drawer"]
+        item.save()
+
+        item.refresh_from_db()
+        self.assertEqual((item.old_quantity, item.old_location), (3, ["Box"]))
+
+        # The snapshot follows saves
+        item.quantity = 7
+        item.save()
+        self.assertEqual((item.old_quantity, item.old_location), (5, ["Drawer"]))
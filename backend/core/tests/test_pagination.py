@@ -0,0 +1,29 @@
+import datetime
+
+from django.test import SimpleTestCase
+
+from core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from modules.models import Module
+
+
+class DecodeCursorTests(SimpleTestCase):
+    fields = [Module._meta.get_field("datetime_updated"), Module._meta.get_field("id")]
+
+    def test_values_are_converted_by_their_fields(self):
+        updated = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        module_id = "6f1c1d0e-53c4-4b5e-9a52-4d3c6c2b7a10"
+
+        values = decode_cursor(encode_cursor([updated, module_id]), self.fields)
+
+        self.assertEqual(values[0], updated)
+        self.assertEqual(str(values[1]), module_id)
+
+    def test_tampered_values_are_invalid(self):
+        for values in (
+            ["yesterday", "6f1c1d0e-53c4-4b5e-9a52-4d3c6c2b7a10"],
+            ["2024-05-01T12:30:00+00:00", "not-a-uuid"],
+            [["2024"], "6f1c1d0e-53c4-4b5e-9a52-4d3c6c2b7a10"],
+            [None, "6f1c1d0e-53c4-4b5e-9a52-4d3c6c2b7a10"],
+        ):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(encode_cursor(values), self.fields)
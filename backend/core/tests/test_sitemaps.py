@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from components.models import Component, Types
+from core.sitemaps import ComponentSitemap
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        resistor = Types.objects.create(name="Resistor")
+        self.components = [
+            Component.objects.create(description=f"Resistor {index}", type=resistor)
+            for index in range(3)
+        ]
+        self.section_url = reverse(
+            "django.contrib.sitemaps.views.sitemap", kwargs={"section": "components"}
+        )
+
+    def test_sections_are_paged(self):
+        with patch.object(ComponentSitemap, "limit", 2):
+            index = self.client.get(reverse("sitemap-index"))
+            second_page = self.client.get(self.section_url, {"p": 2})
+
+        self.assertContains(index, "sitemap-components.xml?p=2")
+        self.assertNotContains(index, "sitemap-components.xml?p=3")
+        self.assertContains(second_page, "<url>", count=1)
+
+    def test_pages_are_cached_until_content_changes(self):
+        response = self.client.get(self.section_url)
+        self.assertContains(response, "<url>", count=3)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.section_url)
+
+        self.components[0].delete()
+        self.assertContains(self.client.get(self.section_url), "<url>", count=2)
+
+    def test_invalid_page(self):
+        self.assertEqual(self.client.get(self.section_url, {"p": "x"}).status_code, 404)
+        self.assertEqual(self.client.get(self.section_url, {"p": 9}).status_code, 404)
+
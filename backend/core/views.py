@@ -2,18 +2,14 @@ from decimal import Decimal
 import statistics
 from django.http import HttpResponse
 from django.shortcuts import render
-from core.calculate_diy_savings_stats import calculate_diy_savings_stats
+from core.calculate_diy_savings_stats import get_diy_savings_stats
+from core.exchange_rates import get_cached_exchange_rate
 from blog.models import BlogPost
 from modules.models import Module, Manufacturer, ModuleBomListItem
 from django.views.decorators.cache import cache_page
 from django.urls import reverse
 from components.models import Component
 from django.db import connection
-from datetime import timedelta
-from django.utils.timezone import now
-from accounts.models import ExchangeRate
-from sentry_sdk import capture_exception
-from core.openexchangerates import _get_latest_exchange_rates
 from django.conf import settings
 from django.db.models import Sum, Avg, F
 
@@ -37,71 +33,26 @@ CURRENCIES = [
 ]
 
 
-def get_exchange_rate(base_currency: str, target_currency: str) -> float:
+def get_exchange_rate(base_currency: str, target_currency: str) -> Decimal:
     """
     Retrieve the exchange rate from the given base currency to the target currency.
 
-    If the rate exists in the database and is fresh (updated within the last 24 hours),
-    it will return the cached value. Otherwise, it fetches the latest rate from the
-    Open Exchange Rates API, updates the database, and returns the rate.
+    Rates are read from the process-local rate matrix (see core.exchange_rates),
+    which is loaded from the ExchangeRate table. Nothing is fetched from the Open
+    Exchange Rates API here; the refresh_exchange_rates command keeps the table
+    up to date.
 
     Args:
         base_currency (str): The base currency code (e.g., "USD", "EUR").
         target_currency (str): The target currency code (e.g., "EUR", "GBP").
 
     Returns:
-        float: The exchange rate for base_currency to target_currency.
+        Decimal: The exchange rate for base_currency to target_currency.
 
     Raises:
         ValueError: If the exchange rate is not available for the given currencies.
     """
-    base_currency = base_currency.upper()
-    target_currency = target_currency.upper()
-
-    # Validate input against the predefined currency list
-    valid_currencies = {code for code, _ in CURRENCIES}
-    if base_currency not in valid_currencies:
-        raise ValueError(f"Invalid base currency: {base_currency}")
-    if target_currency not in valid_currencies:
-        raise ValueError(f"Invalid target currency: {target_currency}")
-
-    # If base and target currencies are the same, the exchange rate is always 1.0
-    if base_currency == target_currency:
-        return 1.0
-
-    # Try to retrieve from the database
-    exchange_rate = ExchangeRate.objects.filter(
-        base_currency=base_currency, target_currency=target_currency
-    ).first()
-
-    if exchange_rate and exchange_rate.last_updated > now() - timedelta(hours=24):
-        # Return the cached rate if it's fresh
-        return exchange_rate.rate
-
-    # Fetch the latest rate from the API
-    try:
-        rate = _get_latest_exchange_rates(base_currency, target_currency)
-        if rate is None:
-            raise ValueError(
-                f"Exchange rate not available for {base_currency} to {target_currency}"
-            )
-    except Exception as e:
-        capture_exception(e)
-        raise ValueError(f"Failed to fetch exchange rates: {e}")
-
-    # Update the record if it exists, or create a new one
-    if exchange_rate and rate:
-        exchange_rate.rate = rate
-        exchange_rate.last_updated = now()
-        exchange_rate.save()
-    else:
-        ExchangeRate.objects.create(
-            base_currency=base_currency,
-            target_currency=target_currency,
-            rate=rate,
-        )
-
-    return rate
+    return get_cached_exchange_rate(base_currency, target_currency)
 
 
 def robots_txt(request):
@@ -174,8 +125,8 @@ def homepage(request):
     manufacturer_count = Module.objects.values("manufacturer").distinct().count()
     component_count_display = f"{(component_count // 5) * 5}+"
 
-    # Use the extracted function to compute DIY savings statistics
-    diy_savings_stats = calculate_diy_savings_stats()
+    # Read the materialized DIY savings statistics
+    diy_savings_stats = get_diy_savings_stats()
 
     context = {
         "user": request.user,
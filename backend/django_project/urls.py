@@ -12,15 +12,7 @@ from comments.views import edit_comment, delete_comment
 from pages.views import module_detail
 from django_otp.admin import OTPAdminSite
 from core.views import robots_txt
-from django.contrib.sitemaps import views as sitemap_views
-from core.sitemaps import (
-    ProjectSitemap,
-    ManufacturerSitemap,
-    ComponentSitemap,
-    StaticViewSitemap,
-    BlogSitemap,
-)
-from django.views.decorators.cache import cache_page
+from core.sitemaps import sitemaps, sitemap_index, sitemap_section
 import admin_honeypot
 
 # ----------------------------
@@ -30,17 +22,6 @@ import admin_honeypot
 # Enable OTP on the admin site.
 admin.site.__class__ = OTPAdminSite
 
-# ----------------------------
-# Sitemaps Configuration
-# ----------------------------
-sitemaps = {
-    "projects": ProjectSitemap,
-    "manufacturers": ManufacturerSitemap,
-    "components": ComponentSitemap,
-    "static": StaticViewSitemap,
-    "blog": BlogSitemap,
-}
-
 # ----------------------------
 # API Documentation Setup
 # ----------------------------
@@ -155,16 +136,17 @@ urlpatterns = [
     # Authentication and third-party apps.
     path("accounts/", include("allauth.urls")),
     path("blog/", include("blog.urls")),
-    # Sitemaps (with caching).
+    # Sitemaps (cached per process for up to a day, see SITEMAP_TIMEOUT in
+    # core.sitemaps).
     path(
         "sitemap.xml/",
-        cache_page(86400)(sitemap_views.index),
+        sitemap_index,
         {"sitemaps": sitemaps},
         name="sitemap-index",
     ),
     path(
         "sitemap-<section>.xml",
-        cache_page(86400)(sitemap_views.sitemap),
+        sitemap_section,
         {"sitemaps": sitemaps},
         name="django.contrib.sitemaps.views.sitemap",
     ),
@@ -2,6 +2,9 @@
 
 python manage.py migrate
 
+# Store exchange rates before serving; skipped while the stored ones are fresh
+python manage.py refresh_exchange_rates || echo "Exchange rates not refreshed"
+
 if [ "$PRODUCTION" != "True" ]; then
   python manage.py createsuperuser --noinput
 fi
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from inventory.models import UserInventory
+from inventory.models import InventoryHistoryEvent, UserInventory
 from core.admin import BaseAdmin
 
 
@@ -7,5 +7,18 @@ class UserInventoryAdmin(BaseAdmin):
     model = UserInventory
 
 
+class InventoryHistoryEventAdmin(admin.ModelAdmin):
+    list_display = [
+        "user",
+        "component_id",
+        "quantity_before",
+        "quantity_after",
+        "timestamp",
+    ]
+    list_select_related = ["user"]
+    readonly_fields = ["timestamp"]
+
+
 # Register your models here.
 admin.site.register(UserInventory, UserInventoryAdmin)
+admin.site.register(InventoryHistoryEvent, InventoryHistoryEventAdmin)
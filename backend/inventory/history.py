@@ -0,0 +1,52 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from inventory.models import InventoryHistoryEvent
+
+HISTORY_LIMIT = 1000
+
+
+def build_history_event(
+    user_id,
+    component_id,
+    quantity_before,
+    quantity_after,
+    location_before,
+    location_after,
+):
+    return InventoryHistoryEvent(
+        user_id=user_id,
+        component_id=component_id,
+        quantity_before=quantity_before,
+        quantity_after=quantity_after,
+        location_before=location_before,
+        location_after=location_after,
+    )
+
+
+def record_inventory_history(events):
+    """Insert history events with a single statement."""
+    InventoryHistoryEvent.objects.bulk_create(events)
+
+
+def prune_inventory_history(user_ids=None, keep=HISTORY_LIMIT):
+    """
+    Delete all but the `keep` most recent history events of every user (or of
+    the given users). Returns the number of deleted events.
+    """
+    events = InventoryHistoryEvent.objects.all()
+    if user_ids is not None:
+        events = events.filter(user_id__in=user_ids)
+    expired = (
+        events.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("user_id"),
+                order_by=[F("timestamp").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__gt=keep)
+        .values("id")
+    )
+    deleted, _ = InventoryHistoryEvent.objects.filter(id__in=expired).delete()
+    return deleted
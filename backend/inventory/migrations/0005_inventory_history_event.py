@@ -0,0 +1,74 @@
+# Generated by Django 5.0 on 2026-10-18 12:26
+
+import django.db.models.deletion
+import django.utils.timezone
+import json
+import uuid
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+HISTORY_LIMIT = 1000
+
+
+def copy_user_history(apps, schema_editor):
+    CustomUser = apps.get_model("accounts", "CustomUser")
+    InventoryHistoryEvent = apps.get_model("inventory", "InventoryHistoryEvent")
+
+    users = CustomUser.objects.exclude(history=[]).only("id", "history")
+    for user in users.iterator(chunk_size=200):
+        history = (
+            json.loads(user.history) if isinstance(user.history, str) else user.history
+        )
+        events = []
+        for entry in (history or [])[-HISTORY_LIMIT:]:
+            try:
+                component_id = uuid.UUID(str(entry["component_id"]))
+                timestamp = parse_datetime(str(entry["timestamp"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if timestamp is None:
+                continue
+            events.append(
+                InventoryHistoryEvent(
+                    user_id=user.id,
+                    component_id=component_id,
+                    quantity_before=entry.get("quantity_before"),
+                    quantity_after=entry.get("quantity_after"),
+                    location_before=entry.get("location_before"),
+                    location_after=entry.get("location_after"),
+                    timestamp=timestamp,
+                )
+            )
+        InventoryHistoryEvent.objects.bulk_create(events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_userinventory_date_created'),
+        ('accounts', '0014_remove_usernotes_cookie_consent_status_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryHistoryEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_id', models.UUIDField()),
+                ('quantity_before', models.PositiveIntegerField(blank=True, null=True)),
+                ('quantity_after', models.PositiveIntegerField(blank=True, null=True)),
+                ('location_before', models.JSONField(blank=True, null=True)),
+                ('location_after', models.JSONField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Inventory History Events',
+                'indexes': [models.Index(fields=['user', '-timestamp', '-id'], name='inventory_history_user_ts')],
+            },
+        ),
+        migrations.RunPython(copy_user_history, migrations.RunPython.noop),
+    ]
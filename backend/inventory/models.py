@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import CustomUser
 from components.models import Component
 from core.models import BaseModel
@@ -8,6 +9,21 @@ import bleach
 import uuid
 
 
+def sanitize_location(location):
+    """Return the location with any markup removed by Bleach."""
+    # Convert the list to a JSON string
+    json_string = json.dumps(location)
+
+    # Clean the JSON string with Bleach
+    cleaned_json_string = bleach.clean(json_string)
+
+    try:
+        # Convert the cleaned JSON string back to a list
+        return json.loads(cleaned_json_string)
+    except json.JSONDecodeError:
+        return []
+
+
 class UserInventory(BaseModel):
     id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     component = models.ForeignKey(Component, on_delete=models.CASCADE)
@@ -17,6 +33,9 @@ class UserInventory(BaseModel):
     old_quantity = models.PositiveIntegerField(default=0, blank=False)
     old_location = models.JSONField(null=True, blank=True)
 
+    # Copied into old_quantity and old_location when saved, see signals
+    tracked_fields = ("quantity", "location")
+
     class Meta:
         verbose_name_plural = "User Component Inventory"
         indexes = [
@@ -30,19 +49,36 @@ class UserInventory(BaseModel):
         return f"[ {self.user} ] - [ {self.location} ] - {self.component}"
 
     def save(self, *args, **kwargs):
-        # Convert the list to a JSON string
-        json_string = json.dumps(self.location)
+        # Update the field with the cleaned list
+        self.location = sanitize_location(self.location)
 
-        # Clean the JSON string with Bleach
-        cleaned_json_string = bleach.clean(json_string)
+        super().save(*args, **kwargs)
 
-        try:
-            # Convert the cleaned JSON string back to a list
-            cleaned_list = json.loads(cleaned_json_string)
-        except json.JSONDecodeError:
-            cleaned_list = []
 
-        # Update the field with the cleaned list
-        self.location = cleaned_list
+class InventoryHistoryEvent(models.Model):
+    """
+    One change to a user's inventory. Rows are only ever inserted, and pruned
+    down to the most recent ones per user by prune_inventory_history.
+    """
 
-        super().save(*args, **kwargs)
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="inventory_history"
+    )
+    # Not a foreign key, history outlives deleted components
+    component_id = models.UUIDField()
+    quantity_before = models.PositiveIntegerField(null=True, blank=True)
+    quantity_after = models.PositiveIntegerField(null=True, blank=True)
+    location_before = models.JSONField(null=True, blank=True)
+    location_after = models.JSONField(null=True, blank=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Inventory History Events"
+        indexes = [
+            models.Index(
+                fields=["user", "-timestamp", "-id"], name="inventory_history_user_ts"
+            ),
+        ]
+
+    def __str__(self):
+        return f"[ {self.user_id} ] - {self.component_id} @ {self.timestamp}"
@@ -1,5 +1,5 @@
 import bleach
-from components.serializers import ComponentSerializer
+from components.serializers import CompactComponentSerializer, ComponentSerializer
 from rest_framework import serializers
 from inventory.models import UserInventory
 
@@ -18,3 +18,11 @@ class UserInventorySerializer(serializers.ModelSerializer):
     class Meta:
         model = UserInventory
         fields = ("id", "user", "component", "quantity", "location")
+
+
+class CompactUserInventorySerializer(serializers.ModelSerializer):
+    component = CompactComponentSerializer(read_only=True)
+
+    class Meta:
+        model = UserInventory
+        fields = ("id", "user", "component", "quantity", "location")
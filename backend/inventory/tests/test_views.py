@@ -1,11 +1,14 @@
+import json
 import uuid
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from core.pagination import encode_cursor
 from inventory.models import UserInventory
 from modules.models import ModuleBomListItem, Module, Manufacturer
-from components.models import Component, Types, ComponentManufacturer
+from components.models import Category, Component, Types, ComponentManufacturer
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from uuid import uuid4
 
 User = get_user_model()
@@ -630,6 +633,61 @@ class GetComponentsLocationsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertDictEqual(response.json(), expected_data)
 
+    def test_post_components_locations_columnar(self):
+        """
+        Test that POSTed IDs are answered with one column per field, in one query.
+        """
+        url = reverse("user_inventory_locations_multiple")
+        component_pks = [str(self.component1.pk), str(self.component2.pk)]
+        component_pks += [str(uuid4()) for _ in range(200)] + ["not-a-uuid"]
+
+        # Session, user and the inventory
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                url, {"component_pks": component_pks}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "component_id": [
+                    str(self.component1.pk),
+                    str(self.component1.pk),
+                    str(self.component2.pk),
+                ],
+                "location": [
+                    {"bin": "A", "section": 1},
+                    {"bin": "B", "section": 2},
+                    {"bin": "C", "section": 3},
+                ],
+                "quantity": [10, 20, 15],
+            },
+        )
+
+        response = self.client.post(
+            url, {"component_pks": str(self.component1.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_components_locations_skips_non_string_ids(self):
+        url = reverse("user_inventory_locations_multiple")
+        component_pks = [[1], {"id": 1}, 1, None, str(self.component2.pk)]
+
+        response = self.client.post(
+            url, {"component_pks": component_pks}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "component_id": [str(self.component2.pk)],
+                "location": [{"bin": "C", "section": 3}],
+                "quantity": [15],
+            },
+        )
+
 
 class UserInventoryViewTest(APITestCase):
     def setUp(self):
@@ -666,6 +724,110 @@ class UserInventoryViewTest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["quantity"], 10)
 
+    def test_get_user_inventory_compact(self):
+        root = Category.objects.create(name="Passives")
+        leaf = Category.objects.create(name="Resistors", parent=root)
+        for index in range(10):
+            component = Component.objects.create(
+                description=f"Resistor {index}",
+                type=self.component_type,
+                manufacturer=self.manufacturer,
+                manufacturer_part_no=f"TR-1{index:02}",
+                mounting_style="th",
+                category=leaf,
+            )
+            UserInventory.objects.create(
+                user=self.user, component=component, quantity=index
+            )
+
+        # Inventory with its components, then their supplier items; no per-row
+        # category tree queries
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/inventory/", {"compact": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]["component"]["category"], leaf.id)
+
+        trees = self.client.get(reverse("component-trees")).data
+        self.assertEqual(
+            trees["categories"],
+            [
+                {
+                    "label": "Passives",
+                    "value": root.id,
+                    "options": [
+                        {"label": "Resistors", "value": leaf.id, "options": []}
+                    ],
+                }
+            ],
+        )
+
+    def create_inventory(self, count):
+        for index in range(count):
+            component = Component.objects.create(
+                description=f"Resistor {index}",
+                type=self.component_type,
+                manufacturer=self.manufacturer,
+                manufacturer_part_no=f"TR-2{index:02}",
+                mounting_style="th",
+            )
+            UserInventory.objects.create(
+                user=self.user, component=component, quantity=index
+            )
+
+    def test_get_user_inventory_paginated(self):
+        self.create_inventory(5)
+
+        first = self.client.get("/api/inventory/", {"cursor": "", "page_size": 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["count"], 5)
+        self.assertEqual(len(first.data["results"]), 3)
+
+        second = self.client.get(
+            "/api/inventory/",
+            {"cursor": first.data["next_cursor"], "page_size": 3},
+        )
+        self.assertEqual(len(second.data["results"]), 2)
+        self.assertIsNone(second.data["next_cursor"])
+        self.assertEqual(
+            sorted(
+                item["quantity"]
+                for item in first.data["results"] + second.data["results"]
+            ),
+            [0, 1, 2, 3, 4],
+        )
+
+        invalid = self.client.get("/api/inventory/", {"cursor": "not-a-cursor"})
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        tampered = self.client.get(
+            "/api/inventory/", {"cursor": encode_cursor(["not-a-uuid"])}
+        )
+        self.assertEqual(tampered.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_user_inventory_streamed(self):
+        self.create_inventory(5)
+
+        # Inventory with its components, then their supplier items
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/inventory/", {"stream": "ndjson"})
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            sorted(json.loads(line)["quantity"] for line in lines), [0, 1, 2, 3, 4]
+        )
+
+        response = self.client.get("/api/inventory/", {"stream": "json"})
+        self.assertEqual(response["Content-Type"], "application/json")
+        items = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(items), 5)
+        self.assertEqual(
+            items[0]["component"]["manufacturer"]["name"], "Test Manufacturer"
+        )
+
+        invalid = self.client.get("/api/inventory/", {"stream": "xml"})
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_user_inventory_create(self):
         data = {
             "quantity": 5,
@@ -756,3 +918,116 @@ class UserInventoryViewTest(APITestCase):
         response = self.client.delete(f"/inventory/{non_existent_uuid}/delete/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data["detail"], "User inventory not found")
+
+
+# Url: /api/inventory/tree/
+# Frontend: useGetUserInventoryTree.js
+class UserInventoryTreeViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        component_type = Types.objects.create(name="Resistor")
+        self.resistor = Component.objects.create(
+            description="10k Resistor", type=component_type
+        )
+        self.capacitor = Component.objects.create(
+            description="100nF Capacitor", type=component_type
+        )
+        UserInventory.objects.create(
+            user=self.user,
+            component=self.resistor,
+            quantity=10,
+            location=["Shelf 1", "Box A"],
+        )
+        UserInventory.objects.create(
+            user=self.user,
+            component=self.capacitor,
+            quantity=5,
+            location=["Shelf 1", "Box B"],
+        )
+        UserInventory.objects.create(
+            user=self.user, component=self.resistor, quantity=2, location=["Box A"]
+        )
+
+    def get_tree(self, **params):
+        response = self.client.get(reverse("user-inventory-tree"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["inventory_tree"]
+
+    def test_tree_has_aggregates(self):
+        tree = self.get_tree()
+        self.assertEqual(tree["total_quantity"], 17)
+        self.assertEqual(tree["component_count"], 2)
+        self.assertEqual(
+            tree["children"]["Shelf 1"],
+            {
+                "children": {
+                    "Box A": {
+                        "children": {},
+                        "component": "10k Resistor",
+                        "quantity": 10,
+                        "total_quantity": 10,
+                        "component_count": 1,
+                    },
+                    "Box B": {
+                        "children": {},
+                        "component": "100nF Capacitor",
+                        "quantity": 5,
+                        "total_quantity": 5,
+                        "component_count": 1,
+                    },
+                },
+                "total_quantity": 15,
+                "component_count": 2,
+            },
+        )
+        self.assertEqual(tree["children"]["Box A"]["quantity"], 2)
+
+    def test_location_names_do_not_clash_with_node_keys(self):
+        UserInventory.objects.create(
+            user=self.user,
+            component=self.capacitor,
+            quantity=3,
+            location=["total_quantity", "children"],
+        )
+        tree = self.get_tree()
+        self.assertEqual(tree["total_quantity"], 20)
+        node = tree["children"]["total_quantity"]
+        self.assertEqual(node["total_quantity"], 3)
+        self.assertEqual(node["children"]["children"]["quantity"], 3)
+
+    def test_subtree_by_path(self):
+        tree = self.get_tree(path=["Shelf 1", "Box A"])
+        self.assertEqual(
+            tree,
+            {
+                "children": {},
+                "component": "10k Resistor",
+                "quantity": 10,
+                "total_quantity": 10,
+                "component_count": 1,
+            },
+        )
+        # ["Shelf 1", "Box A"] contains "Box A" but does not start with it
+        tree = self.get_tree(path=["Box A"])
+        self.assertEqual(tree["quantity"], 2)
+        self.assertEqual(tree["total_quantity"], 2)
+
+    def test_tree_is_cached_until_inventory_changes(self):
+        self.get_tree()
+        # Only the aggregate keying the cached tree
+        with self.assertNumQueries(1):
+            self.get_tree()
+
+        # Writes are seen without any signal, e.g. from another process
+        UserInventory.objects.filter(
+            component=self.resistor, location=["Box A"]
+        ).update(quantity=7, datetime_updated=timezone.now())
+        self.assertEqual(self.get_tree()["children"]["Box A"]["quantity"], 7)
+
+        UserInventory.objects.filter(component=self.capacitor).delete()
+        tree = self.get_tree()
+        self.assertEqual(tree["total_quantity"], 17)
+        self.assertNotIn("Box B", tree["children"]["Shelf 1"]["children"])
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from inventory.models import UserInventory
+
+LOCATION_TREE_TIMEOUT = 60 * 60 * 24
+
+
+def _location_node():
+    return {"children": {}, "total_quantity": 0, "component_count": 0}
+
+
+def build_location_tree(rows, path=()):
+    """
+    Build the location tree of inventory rows, (location, component description,
+    quantity, component id) tuples, below path.
+
+    Every node is a dict of
+    - "children": the child nodes keyed by location name, kept apart so no
+      location name can clash with the other keys,
+    - "total_quantity" and "component_count": the summed quantity and the
+      number of distinct components stored at that location or below it,
+    - "component" and "quantity" of an item stored exactly at that location
+      (the last one listed when there are several), if any.
+
+    Rows whose location does not start with path are skipped.
+    """
+    path = list(path)
+    tree = _location_node()
+    component_ids = defaultdict(set)
+    for location, description, quantity, component_id in rows:
+        location = location or []
+        if location[: len(path)] != path:
+            continue
+        relative = location[len(path) :]
+        node = tree
+        nodes = [((), tree)]
+        for depth, name in enumerate(relative, start=1):
+            node = node["children"].setdefault(name, _location_node())
+            nodes.append((tuple(relative[:depth]), node))
+
+        node["component"] = str(description)
+        node["quantity"] = quantity
+        for key, ancestor in nodes:
+            component_ids[key].add(component_id)
+            ancestor["total_quantity"] += quantity
+            ancestor["component_count"] = len(component_ids[key])
+    return tree
+
+
+def get_location_tree(user_id, path=()):
+    """
+    Return the location tree (see build_location_tree) of a user's inventory,
+    or only the subtree below path, a list of location names.
+
+    Trees are built from a single values query, narrowed by path with the GIN
+    indexed location containment lookup, and cached per user and path. Cache
+    keys include the number of inventory rows and their latest datetime_updated,
+    read with one aggregate query, so any write shows up in every process.
+    """
+    path = list(path)
+    state = UserInventory.objects.filter(user_id=user_id).aggregate(
+        count=Count("id"), updated=Max("datetime_updated")
+    )
+    signature = hashlib.md5(
+        json.dumps([path, state["count"], str(state["updated"])]).encode()
+    ).hexdigest()
+    key = f"inventory_location_tree_{user_id}_{signature}"
+    tree = cache.get(key)
+    if tree is None:
+        inventory = UserInventory.objects.filter(user_id=user_id)
+        if path:
+            # Containment ignores the order of names; build_location_tree keeps
+            # the rows whose location actually starts with path
+            inventory = inventory.filter(location__contains=path)
+        rows = inventory.order_by("component__description", "id").values_list(
+            "location", "component__description", "quantity", "component_id"
+        )
+        tree = build_location_tree(rows, path)
+        cache.set(key, tree, timeout=LOCATION_TREE_TIMEOUT)
+    return tree
@@ -1,10 +1,15 @@
+from collections import defaultdict
 from uuid import UUID
 import uuid
 from components.models import Component
+from components.serializers import supplier_item_price_context
 from django.db.models import Sum, Func
 from django.db import models
 from inventory.models import UserInventory
-from inventory.serializers import UserInventorySerializer
+from inventory.serializers import (
+    CompactUserInventorySerializer,
+    UserInventorySerializer,
+)
 from modules.models import ModuleBomListItem
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -18,6 +23,13 @@ import json
 from django.db.models import Q
 from django.http import JsonResponse
 from rest_framework.exceptions import NotFound
+from core.pagination import InvalidCursor, paginate_by_cursor
+from core.streaming import STREAM_CONTENT_TYPES, iter_chunks, streaming_json_response
+from inventory.trees import get_location_tree
+
+# datetime_created is nullable on older rows, so pages follow the primary key
+INVENTORY_ORDERING = ("id",)
+INVENTORY_MAX_PAGE_SIZE = 1000
 
 
 class UserInventoryView(APIView):
@@ -28,10 +40,79 @@ class UserInventoryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        inventory = UserInventory.objects.filter(user=user)
-        serializer = UserInventorySerializer(inventory, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """
+        Return the user's inventory. By default every row is returned at once.
+
+        - `cursor` (empty for the first page) returns one page of `page_size`
+          rows (default 100, maximum INVENTORY_MAX_PAGE_SIZE) as
+          {"results", "count", "next_cursor"}.
+        - `stream=json` or `stream=ndjson` streams every row as a JSON array or
+          one JSON object per line, serialized in bounded chunks.
+        - `compact=1` returns category and size IDs instead of nested trees.
+        """
+        inventory = (
+            UserInventory.objects.filter(user=request.user)
+            .select_related(
+                "component__manufacturer",
+                "component__type",
+                "component__category",
+                "component__size",
+            )
+            .prefetch_related("component__supplier_items__supplier")
+        )
+        serializer_class = (
+            CompactUserInventorySerializer
+            if request.query_params.get("compact") == "1"
+            else UserInventorySerializer
+        )
+
+        def serialize(items):
+            return serializer_class(
+                items,
+                many=True,
+                context=supplier_item_price_context(item.component for item in items),
+            ).data
+
+        stream = request.query_params.get("stream")
+        if stream is not None:
+            if stream not in STREAM_CONTENT_TYPES:
+                return Response(
+                    {"detail": "stream must be one of: json, ndjson."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            chunks = iter_chunks(inventory.order_by(*INVENTORY_ORDERING))
+            return streaming_json_response(map(serialize, chunks), mode=stream)
+
+        cursor = request.query_params.get("cursor")
+        if cursor is not None:
+            try:
+                page_size = min(
+                    int(request.query_params.get("page_size", 100)),
+                    INVENTORY_MAX_PAGE_SIZE,
+                )
+                if page_size < 1:
+                    raise ValueError
+            except ValueError:
+                return Response(
+                    {"detail": "page_size must be a positive integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            try:
+                page = paginate_by_cursor(
+                    inventory, INVENTORY_ORDERING, cursor=cursor, page_size=page_size
+                )
+            except InvalidCursor as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(
+                {
+                    "results": serialize(page.object_list),
+                    "count": page.count,
+                    "next_cursor": page.next_cursor,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        return Response(serialize(list(inventory)), status=status.HTTP_200_OK)
 
     def post(self, request, component_pk):
         user = request.user
@@ -238,75 +319,98 @@ def get_component_locations(request, component_pk):
 
 
 # Tests
-@api_view(["GET"])
+@api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
 def get_components_locations(request):
     """
     Get all unique locations for multiple components in the user's inventory,
-    along with the quantity of each component in each location.
+    along with the quantity of each component in each location, with a single
+    query whatever the number of components.
+
+    GET takes repeated `component_pks` parameters and returns
+    {component_pk: [{"component": {"id", "location", "quantity"}}]}, with an
+    empty list for unknown or invalid IDs.
+
+    POST takes {"component_pks": [...]} in the body, which has no URL length
+    limit, and returns one column per field, a row per location:
+    {"component_id": [...], "location": [...], "quantity": [...]}.
     """
-    component_pks = request.GET.getlist("component_pks")
+    if request.method == "POST":
+        component_pks = request.data.get("component_pks", [])
+        if not isinstance(component_pks, list):
+            return Response(
+                {"error": "component_pks must be a list of component IDs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    else:
+        component_pks = request.GET.getlist("component_pks")
 
-    if not component_pks:
+    if not component_pks and request.method == "GET":
         # Return an empty JSON object if no component_pks provided
         return Response([], status=status.HTTP_200_OK)
 
-    components_locations = {}
-
+    component_ids = {}
     for component_pk in component_pks:
+        if not isinstance(component_pk, str):
+            # JSON bodies may hold numbers, lists or objects; skip them like
+            # invalid UUIDs
+            continue
         try:
-            # Validate UUID
-            uuid.UUID(component_pk)
+            component_ids[component_pk] = str(uuid.UUID(component_pk))
         except ValueError:
             # Skip invalid UUIDs
-            components_locations[component_pk] = []
             continue
 
-        # Fetch unique locations and corresponding quantity for each component using Django ORM
-        locations_and_quantities = (
-            UserInventory.objects.filter(component__id=component_pk, user=request.user)
-            .values(
-                "location",
-                "quantity",
-            )
-            .distinct()
+    rows = []
+    seen = set()
+    for component_id, location, quantity in (
+        UserInventory.objects.filter(
+            user=request.user, component_id__in=set(component_ids.values())
+        )
+        .order_by("datetime_created", "id")
+        .values_list("component_id", "location", "quantity")
+    ):
+        # Unique locations and quantities per component
+        key = (component_id, json.dumps(location, sort_keys=True), quantity)
+        if key not in seen:
+            seen.add(key)
+            rows.append((str(component_id), location, quantity))
+
+    if request.method == "POST":
+        return Response(
+            {
+                "component_id": [row[0] for row in rows],
+                "location": [row[1] for row in rows],
+                "quantity": [row[2] for row in rows],
+            },
+            status=status.HTTP_200_OK,
         )
 
-        # Prepare the response data for each component
-        locations_with_quantity = [
+    locations_by_component = defaultdict(list)
+    for component_id, location, quantity in rows:
+        locations_by_component[component_id].append(
             {
                 "component": {
-                    "id": component_pk,
-                    "location": item["location"],
-                    "quantity": item["quantity"],
+                    "id": component_id,
+                    "location": location,
+                    "quantity": quantity,
                 }
             }
-            for item in locations_and_quantities
-        ]
-
-        components_locations[component_pk] = locations_with_quantity
-
+        )
+    components_locations = {
+        component_pk: locations_by_component.get(component_ids.get(component_pk), [])
+        for component_pk in component_pks
+    }
     return Response(components_locations, status=status.HTTP_200_OK)
 
 
 class UserInventoryTreeView(APIView):
     def get(self, request):
-        user = request.user
-        inventory_items = UserInventory.objects.filter(user=user)
-
-        # Create a nested tree structure
-        inventory_tree = {}
-
-        for item in inventory_items:
-            location_path = item.location if item.location else []
-            current_level = inventory_tree
-
-            for loc in location_path:
-                if loc not in current_level:
-                    current_level[loc] = {}
-                current_level = current_level[loc]
-
-            current_level["component"] = str(item.component.description)
-            current_level["quantity"] = item.quantity
-
+        """
+        Return the user's inventory as a tree of locations with aggregate
+        quantities and component counts (see inventory.trees). Repeated `path`
+        parameters, e.g. ?path=Shelf A&path=Box 1, return only that subtree.
+        """
+        path = request.query_params.getlist("path")
+        inventory_tree = get_location_tree(request.user.id, path)
         return JsonResponse({"inventory_tree": inventory_tree}, safe=False)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ModulesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "modules"
+
+    def ready(self):
+        # This import is used to register the signals for the cost snapshots
+        import modules.signals
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from core.cache_versions import MODULE_BOMS, get_cache_version
+from modules.models import ModuleBomListItem
+
+# The cache and its versions are per process, so MODULE_BOMS bumps only reach
+# the process that made the write; others see BOM edits once entries expire
+BOM_INDEX_TIMEOUT = 60
+
+
+def _index_key(component_id, version):
+    return f"module_bom_index_{component_id}_{version}"
+
+
+def get_component_module_index(component_ids):
+    """
+    Return {component_id: {module_id: [quantities]}}: for every component, the
+    modules whose BOM lists it as an option, with the quantity of each BOM row
+    doing so.
+
+    Entries are cached per component under the module BOMs cache version for
+    BOM_INDEX_TIMEOUT seconds, so the components missing from the cache are
+    loaded with a single query.
+    """
+    version = get_cache_version(MODULE_BOMS)
+    keys = {
+        component_id: _index_key(component_id, version)
+        for component_id in component_ids
+    }
+    cached = cache.get_many(keys.values())
+    index = {
+        component_id: cached[key]
+        for component_id, key in keys.items()
+        if key in cached
+    }
+
+    missing = [component_id for component_id in keys if component_id not in index]
+    if missing:
+        loaded = {component_id: defaultdict(list) for component_id in missing}
+        rows = ModuleBomListItem.objects.filter(
+            components_options__id__in=missing
+        ).values_list("components_options__id", "module_id", "quantity")
+        for component_id, module_id, quantity in rows:
+            loaded[component_id][module_id].append(quantity)
+        loaded = {
+            component_id: dict(modules) for component_id, modules in loaded.items()
+        }
+        cache.set_many(
+            {keys[component_id]: modules for component_id, modules in loaded.items()},
+            timeout=BOM_INDEX_TIMEOUT,
+        )
+        index.update(loaded)
+    return index
+
+
+def _quantity_bounds(min_quantity, max_quantity):
+    """
+    Translate the min/max of a component group into inclusive bounds (None for
+    unbounded). An unset or zero min with an unset or zero max matches any
+    quantity.
+    """
+    if min_quantity not in [None, "", 0] and max_quantity in [None, ""]:
+        return min_quantity, None
+    if max_quantity not in [None, "", 0] and min_quantity in [None, ""]:
+        return 0, max_quantity
+    if min_quantity not in [None, "", 0] and max_quantity not in [None, "", 0]:
+        return min_quantity, max_quantity
+    return None, None
+
+
+def filter_module_ids_by_component_groups(groups):
+    """
+    Return the set of module ids matching every group (AND). groups is a list
+    of (component_id, min_quantity, max_quantity); a module matches a group when
+    one of its BOM rows lists the component with a quantity within the bounds.
+    """
+    index = get_component_module_index(
+        {component_id for component_id, _, _ in groups}
+    )
+
+    module_ids = None
+    for component_id, min_quantity, max_quantity in groups:
+        low, high = _quantity_bounds(min_quantity, max_quantity)
+        matches = {
+            module_id
+            for module_id, quantities in index[component_id].items()
+            if any(
+                (low is None or quantity >= low) and (high is None or quantity <= high)
+                for quantity in quantities
+            )
+        }
+        module_ids = matches if module_ids is None else module_ids & matches
+        if not module_ids:
+            break
+    return module_ids or set()
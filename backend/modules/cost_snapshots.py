@@ -0,0 +1,179 @@
+from collections import defaultdict
+from decimal import Decimal
+import statistics
+
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from modules.models import Module, ModuleBomListItem, ModuleCostSnapshot
+
+ZERO = Decimal("0.00")
+
+
+def _compute_bom_item_stats(bom_item_filter):
+    """
+    Return ({bom_item_id: stats}, {module_ids}) for the BOM list items matching
+    bom_item_filter. The cost options of a BOM list item are
+    supplier_item.unit_price * bom_item.quantity for every supplier item of every
+    component option.
+    """
+    rows = ModuleBomListItem.objects.filter(**bom_item_filter).values(
+        "id",
+        "module_id",
+        "quantity",
+        "components_options__supplier_items__unit_price",
+    )
+
+    bom_costs = defaultdict(list)
+    bom_modules = {}
+    for row in rows:
+        bom_modules[row["id"]] = row["module_id"]
+        unit_price = row["components_options__supplier_items__unit_price"]
+        if unit_price is not None:
+            bom_costs[row["id"]].append(unit_price * row["quantity"])
+
+    stats = {}
+    for bom_id, costs in bom_costs.items():
+        stats[bom_id] = {
+            "low": min(costs),
+            "high": max(costs),
+            "average": sum(costs) / Decimal(len(costs)),
+            "median": Decimal(statistics.median(costs)),
+        }
+    return stats, bom_modules
+
+
+def _lock_modules(module_ids, bom_item_ids=()):
+    """
+    Lock the given modules and those of the given BOM list items until the
+    transaction ends, and return their ids. Concurrent rebuilds of the same
+    snapshots, e.g. two first requests for one module, then run one after the
+    other instead of colliding on the snapshot unique constraints.
+    """
+    return set(
+        Module.objects.select_for_update()
+        .filter(
+            Q(id__in=module_ids)
+            | Q(
+                id__in=ModuleBomListItem.objects.filter(id__in=bom_item_ids).values(
+                    "module_id"
+                )
+            )
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def _write_bom_item_snapshots(stats, bom_modules, bom_item_ids):
+    ModuleCostSnapshot.objects.filter(bom_item_id__in=bom_item_ids).delete()
+    ModuleCostSnapshot.objects.bulk_create(
+        ModuleCostSnapshot(module_id=bom_modules[bom_id], bom_item_id=bom_id, **values)
+        for bom_id, values in stats.items()
+    )
+
+
+def refresh_module_cost_totals(module_ids):
+    """Re-sum the per-BOM snapshots of the given modules into their total rows."""
+    module_ids = set(module_ids)
+    if not module_ids:
+        return
+
+    totals = {
+        row.pop("module_id"): row
+        for row in ModuleCostSnapshot.objects.filter(
+            module_id__in=module_ids, bom_item__isnull=False
+        )
+        .values("module_id")
+        .annotate(
+            low=Sum("low"),
+            high=Sum("high"),
+            average=Sum("average"),
+            median=Sum("median"),
+        )
+    }
+    ModuleCostSnapshot.objects.filter(
+        module_id__in=module_ids, bom_item__isnull=True
+    ).delete()
+    ModuleCostSnapshot.objects.bulk_create(
+        ModuleCostSnapshot(
+            module_id=module_id,
+            bom_item=None,
+            **totals.get(
+                module_id, {"low": ZERO, "high": ZERO, "average": ZERO, "median": ZERO}
+            ),
+        )
+        for module_id in module_ids
+    )
+
+
+@transaction.atomic
+def refresh_bom_item_cost_snapshots(bom_item_ids, module_ids=()):
+    """
+    Recompute the snapshots of the given BOM list items and the totals of their
+    modules. module_ids lists extra modules whose totals must be re-summed, e.g.
+    the module of a BOM list item that was just deleted. Modules that have never
+    been snapshotted are rebuilt in full so their totals cover every BOM row.
+    """
+    bom_item_ids = set(bom_item_ids)
+    if not bom_item_ids and not module_ids:
+        return
+    # Costs are read once the modules are locked, so the last writer wins
+    module_ids = _lock_modules(module_ids, bom_item_ids)
+    if not module_ids:
+        return
+    stats, bom_modules = {}, {}
+    if bom_item_ids:
+        stats, bom_modules = _compute_bom_item_stats({"id__in": bom_item_ids})
+
+    built_module_ids = set(
+        ModuleCostSnapshot.objects.filter(
+            module_id__in=module_ids, bom_item__isnull=True
+        ).values_list("module_id", flat=True)
+    )
+    unbuilt_module_ids = module_ids - built_module_ids
+    if unbuilt_module_ids:
+        refresh_module_cost_snapshots(unbuilt_module_ids)
+
+    incremental_bom_ids = {
+        bom_id
+        for bom_id in bom_item_ids
+        if bom_modules.get(bom_id) not in unbuilt_module_ids
+    }
+    _write_bom_item_snapshots(
+        {bom_id: stats[bom_id] for bom_id in incremental_bom_ids if bom_id in stats},
+        bom_modules,
+        incremental_bom_ids,
+    )
+    refresh_module_cost_totals(built_module_ids)
+
+
+@transaction.atomic
+def refresh_module_cost_snapshots(module_ids):
+    """Rebuild every snapshot of the given modules from scratch."""
+    module_ids = set(module_ids)
+    _lock_modules(module_ids)
+    stats, bom_modules = _compute_bom_item_stats({"module_id__in": module_ids})
+    ModuleCostSnapshot.objects.filter(module_id__in=module_ids).delete()
+    _write_bom_item_snapshots(stats, bom_modules, [])
+    refresh_module_cost_totals(module_ids)
+
+
+def get_module_cost_total(module_id):
+    """
+    Return the total ModuleCostSnapshot of a module (with the module selected),
+    building the module's snapshots first if they do not exist yet. Raises
+    Module.DoesNotExist for unknown modules.
+    """
+    snapshot = (
+        ModuleCostSnapshot.objects.select_related("module")
+        .filter(module_id=module_id, bom_item__isnull=True)
+        .first()
+    )
+    if snapshot is None:
+        Module.objects.only("id").get(id=module_id)
+        refresh_module_cost_snapshots([module_id])
+        snapshot = ModuleCostSnapshot.objects.select_related("module").get(
+            module_id=module_id, bom_item__isnull=True
+        )
+    return snapshot
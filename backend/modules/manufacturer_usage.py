@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+from core.cache_versions import MODULE_BOMS, get_cache_version
+from modules.models import Module, ModuleBomListItem
+
+# MODULE_BOMS bumps only reach the process that made the write, so other
+# processes keep the vectors no longer than manufacturer_detail keeps its page
+USAGE_VECTORS_TIMEOUT = 60 * 60
+
+
+def _build_manufacturer_usage_vectors():
+    usage = defaultdict(lambda: {"total_modules": 0, "components": []})
+
+    for row in Module.objects.values("manufacturer_id").annotate(
+        total_modules=Count("id")
+    ):
+        usage[row["manufacturer_id"]]["total_modules"] = row["total_modules"]
+
+    # A single grouped query covers the BOMs of every manufacturer
+    rows = ModuleBomListItem.objects.values(
+        "module__manufacturer_id",
+        "components_options__id",
+        "components_options__description",
+    ).annotate(count=Count("id"), total_quantity=Sum("quantity"))
+    for row in rows:
+        usage[row.pop("module__manufacturer_id")]["components"].append(row)
+
+    return dict(usage)
+
+
+def get_manufacturer_usage_vectors():
+    """
+    Return {manufacturer_id: {"total_modules": int, "components": [...]}} where
+    each component row holds components_options__id,
+    components_options__description, count (number of BOM rows using the
+    component) and total_quantity.
+
+    The vectors are cached for up to an hour under the module BOMs cache
+    version, which the modules signals bump whenever a module, BOM row or BOM
+    option changes.
+    """
+    cache_key = f"manufacturer_usage_vectors_{get_cache_version(MODULE_BOMS)}"
+    usage = cache.get(cache_key)
+    if usage is None:
+        usage = _build_manufacturer_usage_vectors()
+        cache.set(cache_key, usage, timeout=USAGE_VECTORS_TIMEOUT)
+    return usage
@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-18 12:06
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modules', '0025_module_cost_built_link_module_cost_built_third_party_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModuleCostSnapshot',
+            fields=[
+                ('datetime_updated', models.DateTimeField(auto_now=True)),
+                ('datetime_created', models.DateTimeField(auto_now_add=True, null=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('low', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('high', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('average', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('median', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('bom_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cost_snapshots', to='modules.modulebomlistitem')),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_snapshots', to='modules.module')),
+            ],
+            options={
+                'verbose_name_plural': 'Module Cost Snapshots',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='modulecostsnapshot',
+            constraint=models.UniqueConstraint(fields=('module', 'bom_item'), name='unique_module_bom_item_cost'),
+        ),
+        migrations.AddConstraint(
+            model_name='modulecostsnapshot',
+            constraint=models.UniqueConstraint(condition=models.Q(('bom_item', None)), fields=('module',), name='unique_module_total_cost'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-18 12:07
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modules', '0026_module_cost_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiySavingsSnapshot',
+            fields=[
+                ('datetime_updated', models.DateTimeField(auto_now=True)),
+                ('datetime_created', models.DateTimeField(auto_now_add=True, null=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('stats', models.JSONField()),
+                ('module_count', models.PositiveIntegerField(default=0, help_text='Number of modules that contributed to the stats.')),
+            ],
+            options={
+                'verbose_name_plural': 'DIY Savings Snapshots',
+            },
+        ),
+    ]
@@ -190,6 +190,15 @@ class Module(BaseModel):
     slug = models.SlugField(blank=True, unique=True)
     allow_comments = models.BooleanField("allow comments", default=True)
 
+    # Changes to these refresh the DIY savings stats, see signals
+    tracked_fields = (
+        "cost_built",
+        "cost_kit",
+        "cost_partial_kit",
+        "cost_pcb_only",
+        "cost_pcb_plus_front",
+    )
+
     def is_built_by_user(self, user):
         return self.builtmodules_set.filter(user=user).exists()
 
@@ -390,3 +399,63 @@ class SuggestedComponentForBomListItem(BaseModel):
 
     def __str__(self):
         return f"{self.suggested_component} for {self.module_bom_list_item} ({self.status})"
+
+
+class ModuleCostSnapshot(BaseModel):
+    """
+    Precomputed low/high/average/median BOM cost, kept up to date by the
+    signals in modules.signals. Rows with a bom_item hold the stats of a single
+    BOM list item; the row without one holds the module totals.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
+    module = models.ForeignKey(
+        Module, on_delete=models.CASCADE, related_name="cost_snapshots"
+    )
+    bom_item = models.ForeignKey(
+        ModuleBomListItem,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="cost_snapshots",
+    )
+    low = models.DecimalField(max_digits=14, decimal_places=4)
+    high = models.DecimalField(max_digits=14, decimal_places=4)
+    average = models.DecimalField(max_digits=14, decimal_places=4)
+    median = models.DecimalField(max_digits=14, decimal_places=4)
+
+    class Meta:
+        verbose_name_plural = "Module Cost Snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["module", "bom_item"], name="unique_module_bom_item_cost"
+            ),
+            models.UniqueConstraint(
+                fields=["module"],
+                condition=models.Q(bom_item=None),
+                name="unique_module_total_cost",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.module_id} -- {self.bom_item_id or 'total'}"
+
+
+class DiySavingsSnapshot(BaseModel):
+    """
+    Materialized output of core.calculate_diy_savings_stats. Every refresh
+    stores a new version; readers always use the highest one.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
+    version = models.PositiveIntegerField(unique=True)
+    stats = models.JSONField()
+    module_count = models.PositiveIntegerField(
+        default=0, help_text="Number of modules that contributed to the stats."
+    )
+
+    class Meta:
+        verbose_name_plural = "DIY Savings Snapshots"
+
+    def __str__(self):
+        return f"DIY savings v{self.version}"
@@ -0,0 +1,133 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import BlogPost
+from components.models import Component, ComponentSupplierItem
+from core.cache_versions import MODULE_BOMS, SITEMAPS, bump_cache_version
+from core.calculate_diy_savings_stats import schedule_diy_savings_refresh
+from modules.cost_snapshots import refresh_bom_item_cost_snapshots
+from modules.models import Manufacturer, Module, ModuleBomListItem
+
+
+def _refresh_cost_snapshots_for_components(component_ids):
+    bom_item_ids = ModuleBomListItem.objects.filter(
+        components_options__in=component_ids
+    ).values_list("id", flat=True)
+    refresh_bom_item_cost_snapshots(bom_item_ids)
+
+
+@receiver(post_save, sender=ComponentSupplierItem)
+def refresh_cost_snapshots_for_supplier_item(sender, instance, created, **kwargs):
+    component_ids = {instance.component_id}
+    if not created:
+        # The component the item was loaded with loses its price when it moves
+        component_ids.add(instance.loaded_value("component"))
+    _refresh_cost_snapshots_for_components(component_ids)
+
+
+@receiver(post_delete, sender=ComponentSupplierItem)
+def refresh_cost_snapshots_for_deleted_supplier_item(sender, instance, **kwargs):
+    _refresh_cost_snapshots_for_components([instance.component_id])
+
+
+@receiver(post_save, sender=ModuleBomListItem)
+def refresh_cost_snapshots_for_bom_item(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_bom_item_cost_snapshots([instance.pk])
+
+
+@receiver(post_delete, sender=ModuleBomListItem)
+def refresh_cost_totals_for_deleted_bom_item(sender, instance, **kwargs):
+    refresh_bom_item_cost_snapshots([], module_ids=[instance.module_id])
+
+
+@receiver(m2m_changed, sender=ModuleBomListItem.components_options.through)
+def refresh_cost_snapshots_for_components_options(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_bom_item_cost_snapshots([instance.pk])
+        return
+
+    # The change was made from the component side, e.g.
+    # component.component_identity_to_component.clear()
+    if action == "pre_clear":
+        instance._cleared_bom_item_ids = list(
+            instance.component_identity_to_component.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_bom_item_cost_snapshots(
+            getattr(instance, "_cleared_bom_item_ids", [])
+        )
+    elif action in ("post_add", "post_remove"):
+        refresh_bom_item_cost_snapshots(pk_set or [])
+
+
+MODULE_COST_FIELDS = {
+    "cost_built",
+    "cost_kit",
+    "cost_partial_kit",
+    "cost_pcb_only",
+    "cost_pcb_plus_front",
+}
+
+
+@receiver(post_save, sender=Module)
+def refresh_diy_savings_for_module(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    if update_fields is not None and not MODULE_COST_FIELDS.intersection(
+        update_fields
+    ):
+        return
+    if created:
+        changed = any(getattr(instance, name) for name in MODULE_COST_FIELDS)
+    else:
+        # Compared with the values tracked when the module was loaded
+        changed = any(instance.has_changed(name) for name in MODULE_COST_FIELDS)
+    if changed:
+        schedule_diy_savings_refresh()
+
+
+@receiver(post_delete, sender=Module)
+def refresh_diy_savings_for_deleted_module(sender, instance, **kwargs):
+    # Only modules with a built cost contribute to the stats
+    if instance.cost_built:
+        schedule_diy_savings_refresh()
+
+
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=ModuleBomListItem)
+@receiver(post_delete, sender=ModuleBomListItem)
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+def invalidate_module_boms_cache(sender, **kwargs):
+    # Manufacturer usage vectors, the BOM inverted index and pages derived
+    # from module BOMs
+    bump_cache_version(MODULE_BOMS)
+
+
+@receiver(m2m_changed, sender=ModuleBomListItem.components_options.through)
+def invalidate_module_boms_cache_for_options(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_cache_version(MODULE_BOMS)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_sitemaps(sender, **kwargs):
+    # Pages listed in the sitemaps, or their lastmod, changed
+    bump_cache_version(SITEMAPS)
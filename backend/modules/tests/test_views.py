@@ -1,11 +1,21 @@
 from decimal import Decimal
+from unittest.mock import patch
 from uuid import uuid4
+from core.pagination import encode_cursor
+from core.calculate_diy_savings_stats import (
+    get_diy_savings_stats,
+    refresh_diy_savings_snapshot,
+)
 from modules.models import (
+    DiySavingsSnapshot,
     Module,
     Manufacturer,
+    ModuleBomListComponentForItemRating,
     ModuleBomListItem,
+    ModuleCostSnapshot,
     SuggestedComponentForBomListItem,
 )
+from modules.cost_snapshots import get_module_cost_total
 from components.models import (
     Component,
     ComponentManufacturer,
@@ -16,6 +26,10 @@ from components.models import (
 from rest_framework.test import APITestCase
 from rest_framework import status
 from accounts.models import CustomUser
+from inventory.models import UserInventory
+from shopping_list.models import UserShoppingList
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
@@ -729,3 +743,582 @@ class ModuleCostStatsTests(APITestCase):
         self.assertEqual(overall.get("high"), "22.00")
         self.assertEqual(overall.get("average"), "19.00")
         self.assertEqual(overall.get("median"), "19.00")
+
+    def test_module_cost_stats_follow_price_changes(self):
+        """
+        The stats are served from the persisted snapshot, which must reflect a
+        supplier price edit immediately instead of after a cache expiry.
+        """
+        bom = self.create_bom_with_component(
+            bom_quantity=2, supplier_prices=[Decimal("1.00"), Decimal("2.00")]
+        )
+        url = self.get_url()
+        self.assertEqual(self.client.get(url).data["overall"]["high"], "4.00")
+
+        supplier_item = ComponentSupplierItem.objects.get(price=Decimal("2.00"))
+        supplier_item.price = Decimal("5.00")
+        supplier_item.save()
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data["overall"]["high"], "10.00")
+        self.assertEqual(response.data["overall"]["median"], "6.00")
+
+        bom.quantity = 1
+        bom.save()
+        self.assertEqual(self.client.get(url).data["overall"]["low"], "1.00")
+
+        bom.components_options.clear()
+        self.assertEqual(self.client.get(url).data["overall"]["low"], "0.00")
+
+    def test_module_cost_stats_follow_supplier_items_moving(self):
+        self.create_bom_with_component(
+            bom_quantity=1, supplier_prices=[Decimal("10.00")]
+        )
+        self.create_bom_with_component(
+            bom_quantity=1, supplier_prices=[Decimal("2.00")]
+        )
+        url = self.get_url()
+        self.assertEqual(self.client.get(url).data["overall"]["low"], "12.00")
+
+        supplier_item = ComponentSupplierItem.objects.get(price=Decimal("10.00"))
+        supplier_item.component = Component.objects.create(
+            description="Unused", type=self.resistor_type
+        )
+        supplier_item.save()
+
+        self.assertEqual(self.client.get(url).data["overall"]["low"], "2.00")
+
+    def test_module_cost_snapshots_are_built_under_a_module_lock(self):
+        self.create_bom_with_component(
+            bom_quantity=1, supplier_prices=[Decimal("1.00")]
+        )
+        ModuleCostSnapshot.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            get_module_cost_total(self.module.id)
+
+        locks = [query["sql"] for query in queries if "FOR UPDATE" in query["sql"]]
+        self.assertEqual(len(locks), 1)
+        self.assertIn('"modules_module"', locks[0])
+
+    def test_module_cost_stats_unknown_module(self):
+        url = reverse("module-cost-stats", kwargs={"module_id": uuid4()})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Url: /api/module/<uuid:module_pk>/bom-overlay/
+class ModuleBomOverlayTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="overlayuser",
+            password="testpassword",
+            email="overlayuser@example.com",
+        )
+        self.other_user = CustomUser.objects.create_user(
+            username="otheruser",
+            password="testpassword",
+            email="otheruser@example.com",
+        )
+        self.resistor_type = Types.objects.create(name="Resistor")
+        self.component_manufacturer = ComponentManufacturer.objects.create(
+            id=uuid4(), name="Component Manufacturer"
+        )
+        self.module = Module.objects.create(
+            id=uuid4(),
+            name="Overlay Module",
+            manufacturer=Manufacturer.objects.create(
+                id=uuid4(), name="Module Manufacturer"
+            ),
+            description="A test module",
+        )
+
+        self.component_a = self.create_component("Component A")
+        self.component_b = self.create_component("Component B")
+
+        self.bom_item = ModuleBomListItem.objects.create(
+            id=uuid4(),
+            description="R1",
+            module=self.module,
+            type=self.resistor_type,
+            quantity=2,
+        )
+        self.bom_item.components_options.add(self.component_a, self.component_b)
+        self.empty_bom_item = ModuleBomListItem.objects.create(
+            id=uuid4(),
+            description="R2",
+            module=self.module,
+            type=self.resistor_type,
+            quantity=1,
+        )
+
+        UserInventory.objects.create(
+            user=self.user,
+            component=self.component_a,
+            quantity=5,
+            location=["Drawer", "Bin 1"],
+        )
+        UserInventory.objects.create(
+            user=self.user, component=self.component_a, quantity=3, location=["Shelf"]
+        )
+        UserInventory.objects.create(
+            user=self.other_user, component=self.component_b, quantity=7
+        )
+        UserShoppingList.objects.create(
+            user=self.user,
+            module=self.module,
+            bom_item=self.bom_item,
+            component=self.component_b,
+            quantity=4,
+        )
+        for user, rating in ((self.user, 4), (self.other_user, 5)):
+            ModuleBomListComponentForItemRating.objects.create(
+                module_bom_list_item=self.bom_item,
+                component=self.component_a,
+                user=user,
+                rating=rating,
+            )
+
+    def create_component(self, description):
+        return Component.objects.create(
+            id=uuid4(),
+            description=description,
+            type=self.resistor_type,
+            manufacturer=self.component_manufacturer,
+            manufacturer_part_no=description,
+            mounting_style="th",
+        )
+
+    def get_url(self, module_pk=None):
+        return reverse(
+            "module-bom-overlay", kwargs={"module_pk": module_pk or self.module.id}
+        )
+
+    def test_overlay_for_authenticated_user(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = response.data["bom_list_items"]
+        row = rows[str(self.bom_item.id)]
+        self.assertEqual(row["inventory_quantity"], 8)
+        self.assertEqual(row["shopping_list_quantity"], 4)
+
+        option_a = row["options"][str(self.component_a.id)]
+        self.assertEqual(option_a["inventory_quantity"], 8)
+        self.assertCountEqual(
+            option_a["inventory_locations"],
+            [
+                {"location": ["Drawer", "Bin 1"], "quantity": 5},
+                {"location": ["Shelf"], "quantity": 3},
+            ],
+        )
+        self.assertEqual(option_a["shopping_list_quantity"], 0)
+        self.assertEqual(option_a["average_rating"], 4.5)
+        self.assertEqual(option_a["number_of_ratings"], 2)
+
+        option_b = row["options"][str(self.component_b.id)]
+        self.assertEqual(option_b["inventory_quantity"], 0)
+        self.assertEqual(option_b["inventory_locations"], [])
+        self.assertEqual(option_b["shopping_list_quantity"], 4)
+        self.assertIsNone(option_b["average_rating"])
+
+        self.assertEqual(
+            rows[str(self.empty_bom_item.id)],
+            {"inventory_quantity": 0, "shopping_list_quantity": 0, "options": {}},
+        )
+
+    def test_overlay_for_anonymous_user(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        row = response.data["bom_list_items"][str(self.bom_item.id)]
+        self.assertIsNone(row["inventory_quantity"])
+        option_a = row["options"][str(self.component_a.id)]
+        self.assertIsNone(option_a["inventory_locations"])
+        self.assertEqual(option_a["number_of_ratings"], 2)
+
+    def test_overlay_unknown_module(self):
+        response = self.client.get(self.get_url(uuid4()))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Frontend: homepage and "How much cheaper is DIY?" blog post
+class DiySavingsSnapshotTests(APITestCase):
+    def setUp(self):
+        self.resistor_type = Types.objects.create(name="Resistor")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module = Module.objects.create(
+                id=uuid4(),
+                name="Savings Module",
+                manufacturer=Manufacturer.objects.create(
+                    id=uuid4(), name="Module Manufacturer"
+                ),
+                description="A test module",
+                cost_built=Decimal("100.00"),
+                cost_pcb_only=Decimal("20.00"),
+            )
+        bom = ModuleBomListItem.objects.create(
+            id=uuid4(),
+            description="R1",
+            module=self.module,
+            type=self.resistor_type,
+            quantity=1,
+        )
+        component = Component.objects.create(
+            id=uuid4(),
+            description="Test Component",
+            type=self.resistor_type,
+            manufacturer=ComponentManufacturer.objects.create(
+                id=uuid4(), name="Component Manufacturer"
+            ),
+            manufacturer_part_no="PART123",
+            mounting_style="th",
+        )
+        bom.components_options.add(component)
+        ComponentSupplierItem.objects.create(
+            component=component,
+            supplier=ComponentSupplier.objects.create(id=uuid4(), name="Supplier"),
+            supplier_item_no="SUP1",
+            price=Decimal("1.00"),
+            pcs=1,
+        )
+
+    def test_snapshot_is_versioned_and_read_without_recomputing(self):
+        snapshot = refresh_diy_savings_snapshot()
+        self.assertEqual(snapshot.module_count, 1)
+        self.assertEqual(
+            snapshot.stats["pcb_only_vs_assembled"],
+            {"average_savings": 80.0, "median_savings": 80.0},
+        )
+
+        with self.assertNumQueries(1):
+            stats = get_diy_savings_stats()
+        self.assertEqual(stats, snapshot.stats)
+
+    def test_cost_field_change_refreshes_snapshot(self):
+        version = refresh_diy_savings_snapshot().version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module.cost_pcb_only = Decimal("30.00")
+            self.module.save()
+            self.module.cost_pcb_only = Decimal("40.00")
+            self.module.save()
+            # Deferred until the transaction commits
+            self.assertEqual(
+                DiySavingsSnapshot.objects.order_by("-version").first().version,
+                version,
+            )
+
+        # Both changes share one refresh
+        latest = DiySavingsSnapshot.objects.order_by("-version").first()
+        self.assertEqual(latest.version, version + 1)
+        self.assertEqual(
+            get_diy_savings_stats()["pcb_only_vs_assembled"]["median_savings"], 60.0
+        )
+
+        # Saves that do not change the costs keep the current snapshot
+        module = Module.objects.get(pk=self.module.pk)
+        module.description = "Edited"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            module.save()
+            module.save(update_fields=["description"])
+        self.assertEqual(callbacks, [])
+
+    def test_rolled_back_changes_do_not_hold_later_refreshes(self):
+        version = refresh_diy_savings_snapshot().version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    self.module.cost_pcb_only = Decimal("30.00")
+                    self.module.save()
+                    raise IntegrityError
+            module = Module.objects.get(pk=self.module.pk)
+            module.cost_pcb_only = Decimal("40.00")
+            module.save()
+
+        self.assertEqual(
+            DiySavingsSnapshot.objects.order_by("-version").first().version,
+            version + 1,
+        )
+        self.assertEqual(
+            get_diy_savings_stats()["pcb_only_vs_assembled"]["median_savings"], 60.0
+        )
+
+    def test_concurrent_refresh_retries_the_version(self):
+        taken = refresh_diy_savings_snapshot().version
+        # The first read misses the version a concurrent refresh just claimed
+        stale = [{"latest": taken - 1}]
+        aggregate = DiySavingsSnapshot.objects.aggregate
+
+        def racing_aggregate(*args, **kwargs):
+            return stale.pop() if stale else aggregate(*args, **kwargs)
+
+        with patch.object(
+            DiySavingsSnapshot.objects, "aggregate", side_effect=racing_aggregate
+        ):
+            snapshot = refresh_diy_savings_snapshot()
+        self.assertEqual(snapshot.version, taken + 1)
+
+
+# Url: /manufacturers/<slug:slug>/
+class ManufacturerDetailTests(APITestCase):
+    def setUp(self):
+        self.resistor_type = Types.objects.create(name="Resistor")
+        self.component_manufacturer = ComponentManufacturer.objects.create(
+            id=uuid4(), name="Component Manufacturer"
+        )
+        self.main = Manufacturer.objects.create(id=uuid4(), name="Main Maker")
+        self.other = Manufacturer.objects.create(id=uuid4(), name="Other Maker")
+        Manufacturer.objects.create(id=uuid4(), name="Idle Maker")
+
+        self.common = self.create_component("Common part")
+        self.rare = self.create_component("Rare part")
+        self.unique = self.create_component("Other-only part")
+
+        main_module = self.create_module(self.main, "Main 1")
+        self.create_module(self.main, "Main 2")
+        self.create_bom(main_module, [self.common], quantity=4)
+        self.create_bom(main_module, [self.common], quantity=2)
+        self.create_bom(main_module, [self.rare], quantity=1)
+
+        other_module = self.create_module(self.other, "Other 1")
+        self.create_bom(other_module, [self.rare, self.unique], quantity=3)
+        self.create_bom(other_module, [self.common], quantity=1)
+
+    def create_component(self, description):
+        return Component.objects.create(
+            id=uuid4(),
+            description=description,
+            type=self.resistor_type,
+            manufacturer=self.component_manufacturer,
+            manufacturer_part_no=description,
+            mounting_style="th",
+        )
+
+    def create_module(self, manufacturer, name):
+        return Module.objects.create(
+            id=uuid4(), name=name, manufacturer=manufacturer, description=name
+        )
+
+    def create_bom(self, module, components, quantity):
+        bom = ModuleBomListItem.objects.create(
+            id=uuid4(),
+            description="BOM row",
+            module=module,
+            type=self.resistor_type,
+            quantity=quantity,
+        )
+        bom.components_options.add(*components)
+        return bom
+
+    def get_context(self):
+        response = self.client.get(
+            reverse("manufacturer_detail", kwargs={"slug": self.main.slug})
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_usage_is_pivoted_per_manufacturer(self):
+        context = self.get_context()
+        self.assertEqual(context["total_modules"], 2)
+        self.assertEqual(
+            [
+                (item["components_options__id"], item["count"])
+                for item in context["component_usage_count"]
+            ],
+            [(self.common.id, 2), (self.rare.id, 1)],
+        )
+        self.assertEqual(
+            [
+                (item["components_options__id"], item["weighted_usage_score"])
+                for item in context["component_usage_quantity"]
+            ],
+            [(self.common.id, 3), (self.rare.id, 0.5)],
+        )
+
+        others = {item["name"]: item for item in context["other_manufacturers"]}
+        self.assertEqual(set(others), {"Other Maker", "Idle Maker"})
+        self.assertEqual(others["Idle Maker"]["component_usage_count"], [])
+        # Components unknown to the main manufacturer come first, then the
+        # main manufacturer's order
+        self.assertEqual(
+            [
+                item["components_options__id"]
+                for item in others["Other Maker"]["component_usage_count"]
+            ],
+            [self.unique.id, self.common.id, self.rare.id],
+        )
+
+    def test_cold_cache_query_count_does_not_grow_with_manufacturers(self):
+        for index in range(5):
+            manufacturer = Manufacturer.objects.create(
+                id=uuid4(), name=f"Extra Maker {index}"
+            )
+            self.create_bom(
+                self.create_module(manufacturer, f"Extra {index}"), [self.rare], 1
+            )
+        # Manufacturer, module counts, BOM usage, other manufacturers and the
+        # template's comment count
+        with self.assertNumQueries(5):
+            self.get_context()
+
+    def test_bom_changes_invalidate_cached_page(self):
+        self.get_context()
+        self.create_bom(
+            Module.objects.get(name="Main 2"), [self.rare], quantity=1
+        )
+        context = self.get_context()
+        self.assertEqual(
+            {
+                item["components_options__id"]: item["count"]
+                for item in context["component_usage_count"]
+            },
+            {self.common.id: 2, self.rare.id: 2},
+        )
+
+
+# Url: /api/modules-infinite/
+# Frontend: ModulesList (infinite scroll)
+class ModuleListCursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.manufacturer = Manufacturer.objects.create(id=uuid4(), name="Maker")
+        # Two modules share a name so the id tie-breaker is exercised
+        names = ["Alpha", "Bravo", "Bravo"] + [f"Module {i:02}" for i in range(20)]
+        for index, name in enumerate(names):
+            Module.objects.create(
+                id=uuid4(),
+                name=name,
+                manufacturer=self.manufacturer,
+                description=name,
+                version=str(index),
+            )
+        self.url = reverse("module-list-v2")
+
+    def test_cursor_pages_cover_every_module_once(self):
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            response = self.client.post(self.url, {"cursor": cursor}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pagination = response.data["pagination"]
+            self.assertEqual(pagination["totalItems"], 23)
+            seen.extend(module["id"] for module in response.data["modules"])
+            pages += 1
+            cursor = pagination["nextCursor"]
+            if not pagination["hasNextPage"]:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertIsNone(cursor)
+        expected = [
+            str(pk)
+            for pk in Module.objects.order_by("name", "id").values_list("id", flat=True)
+        ]
+        self.assertEqual(seen, expected)
+
+    def test_page_mode_is_unchanged(self):
+        response = self.client.post(self.url, {"page": 2}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        pagination = response.data["pagination"]
+        self.assertEqual(pagination["currentPage"], 2)
+        self.assertEqual(pagination["totalPages"], 3)
+        self.assertNotIn("nextCursor", pagination)
+
+    def test_invalid_cursor(self):
+        response = self.client.post(
+            self.url, {"cursor": "not-a-cursor"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tampered_cursor(self):
+        # Well formed, but the id is not a UUID
+        for values in (["Module", "not-a-uuid"], ["Module", {"id": 1}]):
+            response = self.client.post(
+                self.url, {"cursor": encode_cursor(values)}, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# Url: /api/modules-infinite/
+# Frontend: ModulesList (component filters)
+class ModuleListComponentGroupTests(APITestCase):
+    def setUp(self):
+        self.resistor_type = Types.objects.create(name="Resistor")
+        manufacturer = Manufacturer.objects.create(id=uuid4(), name="Maker")
+        self.resistor = Component.objects.create(
+            id=uuid4(), description="10k resistor", type=self.resistor_type
+        )
+        self.capacitor = Component.objects.create(
+            id=uuid4(), description="100n capacitor", type=self.resistor_type
+        )
+        self.both = Module.objects.create(
+            id=uuid4(), name="Both", manufacturer=manufacturer, description="Both"
+        )
+        self.resistor_only = Module.objects.create(
+            id=uuid4(), name="Resistor only", manufacturer=manufacturer, description="R"
+        )
+        self.create_bom(self.both, self.resistor, quantity=8)
+        self.create_bom(self.both, self.capacitor, quantity=2)
+        self.create_bom(self.resistor_only, self.resistor, quantity=3)
+
+    def create_bom(self, module, component, quantity):
+        bom = ModuleBomListItem.objects.create(
+            id=uuid4(),
+            description="BOM row",
+            module=module,
+            type=self.resistor_type,
+            quantity=quantity,
+        )
+        bom.components_options.add(component)
+        return bom
+
+    def search(self, component_groups):
+        response = self.client.post(
+            reverse("module-list-v2"),
+            {"component_groups": component_groups},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def module_names(self, component_groups):
+        return [module["name"] for module in self.search(component_groups)["modules"]]
+
+    def test_groups_are_intersected(self):
+        groups = [{"component": str(self.resistor.id)}]
+        self.assertEqual(self.module_names(groups), ["Both", "Resistor only"])
+        groups.append({"component": str(self.capacitor.id)})
+        self.assertEqual(self.module_names(groups), ["Both"])
+
+    def test_quantity_bounds(self):
+        resistor = str(self.resistor.id)
+        self.assertEqual(
+            self.module_names([{"component": resistor, "min": "5"}]), ["Both"]
+        )
+        self.assertEqual(
+            self.module_names([{"component": resistor, "max": "5"}]),
+            ["Resistor only"],
+        )
+        self.assertEqual(
+            self.module_names([{"component": resistor, "min": "4", "max": "7"}]), []
+        )
+
+    def test_descriptions_and_index_follow_bom_changes(self):
+        data = self.search(
+            [{"component": str(self.capacitor.id)}, {"component": str(uuid4())}]
+        )
+        groups = data["filters"]["component_groups"]
+        self.assertEqual(
+            [group["component_description"] for group in groups],
+            ["100n capacitor", "Unknown Component"],
+        )
+
+        groups = [{"component": str(self.capacitor.id)}]
+        self.assertEqual(self.module_names(groups), ["Both"])
+        self.create_bom(self.resistor_only, self.capacitor, quantity=1)
+        self.assertEqual(self.module_names(groups), ["Both", "Resistor only"])
@@ -1,7 +1,5 @@
 from collections import defaultdict
-from decimal import Decimal
 import logging
-import statistics
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
@@ -16,19 +14,20 @@ from components.models import (
     ComponentSupplierItem,
     Types,
 )
+from inventory.models import UserInventory
 from itertools import zip_longest
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import cache_page
-from django.contrib.postgres.search import (
-    SearchVector,
-    SearchQuery,
-    SearchRank,
-    TrigramSimilarity,
-)
+from components.search import search_components
 from uuid import UUID
 from django.db import transaction
 
 from django.shortcuts import get_object_or_404, redirect, render
+from core.cache_versions import MODULE_BOMS, get_cache_version
+from core.pagination import InvalidCursor, paginate_by_cursor
+from modules.bom_index import filter_module_ids_by_component_groups
+from modules.cost_snapshots import get_module_cost_total
+from modules.manufacturer_usage import get_manufacturer_usage_vectors
 from modules.models import (
     BuiltModules,
     Manufacturer,
@@ -49,6 +48,7 @@ from modules.serializers import (
     ModuleManufacturerSerializer,
     SuggestedComponentForBomListItemSerializer,
 )
+from shopping_list.models import UserShoppingList
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
@@ -145,10 +145,20 @@ def module_list(request):
             ),
         )
 
-    # Paginate the result
-    paginator = Paginator(module_list, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Paginate the result. A "cursor" parameter (empty for the first page) opts
+    # into keyset pagination for the infinite scroll.
+    cursor = request.GET.get("cursor")
+    if cursor is not None:
+        try:
+            page_obj = paginate_by_cursor(
+                module_list, ("-datetime_updated", "id"), cursor=cursor, page_size=10
+            )
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+    else:
+        paginator = Paginator(module_list, 10)
+        page_number = request.GET.get("page")
+        page_obj = paginator.get_page(page_number)
 
     # Prepare options for the filter dropdowns
     manufacturers = Manufacturer.objects.values("name").distinct()
@@ -168,7 +178,10 @@ def module_list(request):
         html = render_to_string(
             "modules/module_list_partial.html", {"page_obj": page_obj}
         )
-        return JsonResponse({"html": html, "has_next": page_obj.has_next()})
+        response = {"html": html, "has_next": page_obj.has_next()}
+        if cursor is not None:
+            response["next_cursor"] = page_obj.next_cursor
+        return JsonResponse(response)
 
     # Zip components with component criteria for displaying pills
     zipped_components = list(
@@ -181,6 +194,7 @@ def module_list(request):
         "modules/index.html",
         {
             "page_obj": page_obj,
+            "next_cursor": getattr(page_obj, "next_cursor", None),
             "manufacturers": manufacturers,
             "search": query,
             "manufacturer": manufacturer,
@@ -363,6 +377,104 @@ def get_module_bom_list_items(request, module_pk):
     return Response(serializer.data)
 
 
+@api_view(["GET"])
+def get_module_bom_overlay(request, module_pk):
+    """
+    Return everything the BOM table overlays on top of the module's BOM rows in
+    one response: per-row inventory and shopping list totals, and per-option
+    ratings, inventory quantities and inventory locations.
+
+    The number of queries is constant regardless of how many rows and options
+    the BOM has. User-specific values are None for anonymous users.
+    """
+    # One LEFT JOIN gives every BOM row together with its component options
+    bom_options = list(
+        ModuleBomListItem.objects.filter(module_id=module_pk).values_list(
+            "id", "components_options__id"
+        )
+    )
+    if not bom_options and not Module.objects.filter(pk=module_pk).exists():
+        return Response(
+            {"error": "Module does not exist"}, status=status.HTTP_404_NOT_FOUND
+        )
+
+    is_authenticated = request.user.is_authenticated
+    user_default = 0 if is_authenticated else None
+
+    overlay = {}
+    component_ids = set()
+    for bom_item_id, component_id in bom_options:
+        row = overlay.setdefault(
+            str(bom_item_id),
+            {
+                "inventory_quantity": user_default,
+                "shopping_list_quantity": user_default,
+                "options": {},
+            },
+        )
+        if component_id is None:
+            continue
+        component_ids.add(component_id)
+        row["options"][str(component_id)] = {
+            "inventory_quantity": user_default,
+            "inventory_locations": [] if is_authenticated else None,
+            "shopping_list_quantity": user_default,
+            "average_rating": None,
+            "number_of_ratings": 0,
+        }
+
+    ratings = (
+        ModuleBomListComponentForItemRating.objects.filter(
+            module_bom_list_item__module_id=module_pk
+        )
+        .values("module_bom_list_item_id", "component_id")
+        .annotate(average_rating=Avg("rating"), number_of_ratings=Count("rating"))
+    )
+    for rating in ratings:
+        option = (
+            overlay.get(str(rating["module_bom_list_item_id"]), {})
+            .get("options", {})
+            .get(str(rating["component_id"]))
+        )
+        if option is not None:
+            option["average_rating"] = round(rating["average_rating"], 2)
+            option["number_of_ratings"] = rating["number_of_ratings"]
+
+    if is_authenticated and component_ids:
+        inventory_by_component = defaultdict(list)
+        for item in UserInventory.objects.filter(
+            user=request.user, component_id__in=component_ids
+        ).values("component_id", "location", "quantity"):
+            inventory_by_component[str(item["component_id"])].append(
+                {"location": item["location"], "quantity": item["quantity"]}
+            )
+
+        shopping_list_quantities = defaultdict(int)
+        for item in UserShoppingList.objects.filter(
+            user=request.user, module_id=module_pk
+        ).values("bom_item_id", "component_id", "quantity"):
+            key = (str(item["bom_item_id"]), str(item["component_id"]))
+            shopping_list_quantities[key] += item["quantity"]
+
+        for bom_item_id, row in overlay.items():
+            for component_id, option in row["options"].items():
+                locations = inventory_by_component.get(component_id, [])
+                option["inventory_locations"] = locations
+                option["inventory_quantity"] = sum(
+                    location["quantity"] for location in locations
+                )
+                option["shopping_list_quantity"] = shopping_list_quantities.get(
+                    (bom_item_id, component_id), 0
+                )
+                row["inventory_quantity"] += option["inventory_quantity"]
+                row["shopping_list_quantity"] += option["shopping_list_quantity"]
+
+    return Response(
+        {"module_id": str(module_pk), "bom_list_items": overlay},
+        status=status.HTTP_200_OK,
+    )
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def rate_component(request):
@@ -447,8 +559,53 @@ def get_module_status(request, module_pk):
     return Response({"is_built": is_built, "is_wtb": is_wtb}, status=status.HTTP_200_OK)
 
 
+def _order_by_description(rows):
+    # Match the database ordering: NULL descriptions sort last
+    return sorted(
+        rows,
+        key=lambda row: (
+            row["components_options__description"] is None,
+            row["components_options__description"] or "",
+        ),
+    )
+
+
+def _component_usage_lists(usage):
+    """
+    Split a manufacturer usage vector into the component_usage_count and
+    component_usage_quantity rows the template expects.
+    """
+    total_modules = usage["total_modules"]
+    usage_count = []
+    usage_quantity = []
+    for row in usage["components"]:
+        usage_count.append(
+            {
+                "components_options__description": row[
+                    "components_options__description"
+                ],
+                "components_options__id": row["components_options__id"],
+                "count": row["count"],
+            }
+        )
+        usage_quantity.append(
+            {
+                "components_options__description": row[
+                    "components_options__description"
+                ],
+                "components_options__id": row["components_options__id"],
+                "total_quantity": row["total_quantity"],
+                # This score represents average usage per module
+                "weighted_usage_score": (
+                    row["total_quantity"] / total_modules if total_modules > 0 else 0
+                ),
+            }
+        )
+    return usage_count, usage_quantity
+
+
 def manufacturer_detail(request, slug):
-    cache_key = f"manufacturer_detail_{slug}"
+    cache_key = f"manufacturer_detail_{slug}_{get_cache_version(MODULE_BOMS)}"
     cached_data = cache.get(cache_key)
 
     if cached_data:
@@ -459,79 +616,36 @@ def manufacturer_detail(request, slug):
         # Generate color for the main manufacturer
         main_color, main_border_color = generate_color_from_name(manufacturer.name)
 
-        # Calculate the total number of modules for this manufacturer.
-        total_modules = Module.objects.filter(manufacturer=manufacturer).count()
+        usage_vectors = get_manufacturer_usage_vectors()
+        empty_usage = {"total_modules": 0, "components": []}
+        main_usage = usage_vectors.get(manufacturer.id, empty_usage)
 
-        # Get the component usage data for the main manufacturer and sort by count
-        component_usage_count = (
-            ModuleBomListItem.objects.filter(module__manufacturer=manufacturer)
-            .values("components_options__description", "components_options__id")
-            .annotate(count=Count("id"))
-            .order_by("-count")
+        usage_count, usage_quantity = _component_usage_lists(main_usage)
+        component_usage_count = sorted(
+            _order_by_description(usage_count), key=lambda x: -x["count"]
         )
-
-        component_usage_quantity = (
-            ModuleBomListItem.objects.filter(module__manufacturer=manufacturer)
-            .values("components_options__description", "components_options__id")
-            .annotate(total_quantity=Sum("quantity"))
-            .order_by("-total_quantity")
+        component_usage_quantity = sorted(
+            _order_by_description(usage_quantity), key=lambda x: -x["total_quantity"]
         )
 
-        # Add weighted_usage_score to each component usage entry.
-        # Note: This score represents average usage per module.
-        if total_modules > 0:
-            for item in component_usage_quantity:
-                item["weighted_usage_score"] = item["total_quantity"] / total_modules
-        else:
-            # Just in case there are no modules (to avoid division by zero)
-            for item in component_usage_quantity:
-                item["weighted_usage_score"] = 0
+        # Position of each component in the main manufacturer's chart
+        component_rank = {
+            item["components_options__id"]: index
+            for index, item in enumerate(component_usage_count)
+        }
 
-        # Create a sorted list of component IDs based on the main manufacturer's data
-        sorted_component_ids = [
-            item["components_options__id"] for item in component_usage_count
-        ]
+        def rank(item):
+            return component_rank.get(item["components_options__id"], -1)
 
-        # Get data for other manufacturers
-        other_manufacturers = Manufacturer.objects.exclude(id=manufacturer.id)
+        # Get data for other manufacturers, aligned with the main manufacturer's
+        # component order
         other_manufacturers_data = []
-        for other_manufacturer in other_manufacturers:
-            other_usage_count = (
-                ModuleBomListItem.objects.filter(
-                    module__manufacturer=other_manufacturer
-                )
-                .values("components_options__description", "components_options__id")
-                .annotate(count=Count("id"))
-                .order_by("components_options__description")
-            )
-
-            other_usage_quantity = (
-                ModuleBomListItem.objects.filter(
-                    module__manufacturer=other_manufacturer
-                )
-                .values("components_options__description", "components_options__id")
-                .annotate(total_quantity=Sum("quantity"))
-                .order_by("components_options__description")
-            )
-
-            # Sort other manufacturer data by the sorted component IDs
-            sorted_other_usage_count = sorted(
-                other_usage_count,
-                key=lambda x: (
-                    sorted_component_ids.index(x["components_options__id"])
-                    if x["components_options__id"] in sorted_component_ids
-                    else -1
-                ),
-            )
-            sorted_other_usage_quantity = sorted(
-                other_usage_quantity,
-                key=lambda x: (
-                    sorted_component_ids.index(x["components_options__id"])
-                    if x["components_options__id"] in sorted_component_ids
-                    else -1
-                ),
+        for other_manufacturer in Manufacturer.objects.exclude(
+            id=manufacturer.id
+        ).only("id", "name"):
+            other_count, other_quantity = _component_usage_lists(
+                usage_vectors.get(other_manufacturer.id, empty_usage)
             )
-
             color, border_color = generate_color_from_name(other_manufacturer.name)
 
             other_manufacturers_data.append(
@@ -539,8 +653,12 @@ def manufacturer_detail(request, slug):
                     "name": other_manufacturer.name,
                     "color": color,
                     "border_color": border_color,
-                    "component_usage_count": sorted_other_usage_count,
-                    "component_usage_quantity": sorted_other_usage_quantity,
+                    "component_usage_count": sorted(
+                        _order_by_description(other_count), key=rank
+                    ),
+                    "component_usage_quantity": sorted(
+                        _order_by_description(other_quantity), key=rank
+                    ),
                 }
             )
 
@@ -548,10 +666,10 @@ def manufacturer_detail(request, slug):
             "manufacturer": manufacturer,
             "main_color": main_color,
             "main_border_color": main_border_color,
-            "component_usage_count": list(component_usage_count),
-            "component_usage_quantity": list(component_usage_quantity),
+            "component_usage_count": component_usage_count,
+            "component_usage_quantity": component_usage_quantity,
             "other_manufacturers": other_manufacturers_data,
-            "total_modules": total_modules,  # if you wish to include it
+            "total_modules": main_usage["total_modules"],
         }
 
         # Cache the context data
@@ -570,34 +688,11 @@ def components_autocomplete(request):
         return JsonResponse({"results": results})
 
     try:
-        # Define the SearchVector across multiple fields, including related fields
-        search_vector = (
-            SearchVector("description", weight="A")
-            + SearchVector("supplier_items__supplier__name", weight="B")
-            + SearchVector("supplier_items__supplier_item_no", weight="B")
-            + SearchVector("manufacturer__name", weight="C")
-            + SearchVector("manufacturer_part_no", weight="C")
-        )
-
-        # Define the SearchQuery for natural language processing
-        search_query = SearchQuery(query, search_type="websearch")
-
-        # Apply full-text search and trigram similarity
+        # Full-text and trigram search over the stored, GIN indexed columns
         components = (
-            Component.objects.annotate(
-                search=search_vector,
-                rank=SearchRank(search_vector, search_query),
-                similarity=(
-                    TrigramSimilarity("description", query)
-                    + TrigramSimilarity("manufacturer__name", query)
-                    + TrigramSimilarity("manufacturer_part_no", query)
-                    + TrigramSimilarity("supplier_items__supplier__name", query)
-                    + TrigramSimilarity("supplier_items__supplier_item_no", query)
-                ),
-            )
-            .filter(Q(search=search_query) | Q(similarity__gt=0.1))
-            .order_by("-rank", "-similarity")
-            .distinct()[:50]
+            search_components(Component.objects.all(), query)
+            .prefetch_related("supplier_items__supplier")
+            .order_by("-rank", "-similarity")[:50]
         )
 
         # Prepare the results for the response
@@ -643,16 +738,22 @@ def module_list_v2(request):
         if group.get("component")
     ]
 
-    # Fetch component names based on IDs
+    # Fetch component names based on IDs in one batch
+    component_ids = {}
     for group in component_groups:
-        component_id = group.get("component")
-        if component_id:
-            try:
-                component_uuid = UUID(component_id)
-                component = Component.objects.get(id=component_uuid)
-                group["component_description"] = component.description
-            except (Component.DoesNotExist, ValueError):
-                group["component_description"] = "Unknown Component"
+        try:
+            component_ids[group["component"]] = UUID(str(group["component"]))
+        except ValueError:
+            pass
+    descriptions = dict(
+        Component.objects.filter(id__in=component_ids.values()).values_list(
+            "id", "description"
+        )
+    )
+    for group in component_groups:
+        group["component_description"] = descriptions.get(
+            component_ids.get(group["component"]), "Unknown Component"
+        )
 
     # Initial filtering by basic fields
     module_list = Module.objects.order_by("name").select_related("manufacturer")
@@ -675,44 +776,23 @@ def module_list_v2(request):
             | Q(description__icontains=query)
         )
 
-    # Apply component group filters if they contain valid data
-    for i, group in enumerate(component_groups):
-        component = group.get("component")
-        min_quantity = int(group.get("min", 0)) if group.get("min") else None
-        max_quantity = int(group.get("max", 0)) if group.get("max") else None
-
-        # Set up the component filter
-        component_filter = (
-            Q(modulebomlistitem__components_options__id=component) if component else Q()
-        )
-
-        # Determine min and max filters based on their availability
-        if min_quantity not in [None, "", 0] and max_quantity in [None, ""]:
-            # Min quantity set, max quantity unset -> min_quantity to infinity
-            min_filter = Q(modulebomlistitem__quantity__gte=min_quantity)
-            max_filter = Q()
-        elif max_quantity not in [None, "", 0] and min_quantity in [None, ""]:
-            # Max quantity set, min quantity unset -> 0 to max_quantity
-            min_filter = Q(modulebomlistitem__quantity__gte=0)
-            max_filter = Q(modulebomlistitem__quantity__lte=max_quantity)
-        elif min_quantity not in [None, "", 0] and max_quantity not in [None, "", 0]:
-            # Both min and max quantities are set
-            min_filter = Q(modulebomlistitem__quantity__gte=min_quantity)
-            max_filter = Q(modulebomlistitem__quantity__lte=max_quantity)
+    # Resolve the component groups (AND) against the BOM inverted index
+    # instead of one join per group
+    if component_groups:
+        groups = [
+            (
+                component_ids.get(group["component"]),
+                int(group["min"]) if group.get("min") else None,
+                int(group["max"]) if group.get("max") else None,
+            )
+            for group in component_groups
+        ]
+        if any(component_id is None for component_id, _, _ in groups):
+            module_list = module_list.none()
         else:
-            # Neither min nor max is set; treat as "contains any"
-            min_filter = Q()
-            max_filter = Q()
-
-        # Combine filters
-        combined_filter = (
-            component_filter
-            if component and min_filter == Q() and max_filter == Q()
-            else (component_filter & min_filter & max_filter)
-        )
-
-        # Apply each filter
-        module_list = module_list.filter(combined_filter).distinct()
+            module_list = module_list.filter(
+                id__in=filter_module_ids_by_component_groups(groups)
+            )
 
     # Annotate for user-specific data if the user is authenticated
     if user:
@@ -725,22 +805,38 @@ def module_list_v2(request):
             ),
         )
 
-    # Pagination and response
-    paginator = Paginator(module_list, 10)
-    page_number = data.get("page", 1)
-    page_obj = paginator.get_page(page_number)
+    # Pagination and response. Sending a "cursor" key (null for the first page)
+    # opts into keyset pagination, which stays cheap however deep the client
+    # scrolls; totalItems is then a cached count.
+    if "cursor" in data:
+        try:
+            page_obj = paginate_by_cursor(
+                module_list, ("name", "id"), cursor=data["cursor"], page_size=10
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        pagination = {
+            "nextCursor": page_obj.next_cursor,
+            "hasNextPage": page_obj.has_next(),
+            "totalItems": page_obj.count,
+        }
+    else:
+        paginator = Paginator(module_list, 10)
+        page_number = data.get("page", 1)
+        page_obj = paginator.get_page(page_number)
+        pagination = {
+            "currentPage": page_number,
+            "nextPage": page_number + 1 if page_obj.has_next() else None,
+            "hasNextPage": page_obj.has_next(),
+            "totalPages": paginator.num_pages,
+            "totalItems": paginator.count,
+        }
     module_serializer = ModuleSerializer(page_obj.object_list, many=True)
 
     return Response(
         {
             "modules": module_serializer.data,
-            "pagination": {
-                "currentPage": page_number,
-                "nextPage": page_number + 1 if page_obj.has_next() else None,
-                "hasNextPage": page_obj.has_next(),
-                "totalPages": paginator.num_pages,
-                "totalItems": paginator.count,
-            },
+            "pagination": pagination,
             "filters": {
                 "search": query,
                 "manufacturer": manufacturer,
@@ -943,67 +1039,33 @@ def suggest_component_for_bom_list_item(request, modulebomlistitem_pk):
 
 
 @api_view(["GET"])
-@cache_page(60 * 60 * 24)
 def module_cost_stats(request, module_id):
     """
-    For a given module (specified by module_id), compute and return the low, high,
-    average, and median cost of its BOM components.
+    For a given module (specified by module_id), return the low, high, average,
+    and median cost of its BOM components.
 
-    For each BOM list item:
-      - We collect cost options as: supplier_item.unit_price * bom_item.quantity.
-      - We compute the BOM's low, high, average, and median.
-    Finally, we sum the per-BOM values to produce overall module statistics.
+    The stats are read from the module's total ModuleCostSnapshot, which sums
+    the per-BOM snapshots (cost options = supplier_item.unit_price *
+    bom_item.quantity) and is refreshed by signals whenever a supplier item,
+    BOM list item or BOM component option changes.
     """
-    # Retrieve the module or return a 404 if not found.
-    module = get_object_or_404(Module, id=module_id)
-
-    # Retrieve BOM list item id, quantity, and supplier's unit_price via the components_options relation.
-    qs = module.modulebomlistitem_set.filter(module=module).values(
-        "id", "quantity", "components_options__supplier_items__unit_price"
-    )
-
-    # Group cost options by BOM list item id.
-    bom_costs = defaultdict(list)
-    for row in qs:
-        unit_price = row.get("components_options__supplier_items__unit_price")
-        if unit_price is not None:
-            quantity = row.get("quantity", 1)
-            cost = unit_price * quantity
-            bom_costs[row["id"]].append(cost)
-
-    # Initialize overall totals using Decimal for precision.
-    overall_low = Decimal("0.00")
-    overall_high = Decimal("0.00")
-    overall_avg = Decimal("0.00")
-    overall_median = Decimal("0.00")
-    bom_breakdown = {}
-
-    # Compute per-BOM stats and sum them.
-    for bom_id, costs in bom_costs.items():
-        if costs:
-            bom_low = min(costs)
-            bom_high = max(costs)
-            bom_avg = sum(costs) / Decimal(len(costs))
-            bom_med = Decimal(statistics.median(costs))
-            bom_breakdown[str(bom_id)] = {
-                "low": bom_low,
-                "high": bom_high,
-                "average": bom_avg,
-                "median": bom_med,
-            }
-            overall_low += bom_low
-            overall_high += bom_high
-            overall_avg += bom_avg
-            overall_median += bom_med
+    try:
+        snapshot = get_module_cost_total(module_id)
+    except Module.DoesNotExist:
+        return Response(
+            {"detail": "No Module matches the given query."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    module = snapshot.module
 
     data = {
         "module_id": module.id,
         "module_name": module.name,
         "overall": {
-            "low": overall_low,
-            "high": overall_high,
-            "average": overall_avg,
-            "median": overall_median,
+            "low": snapshot.low,
+            "high": snapshot.high,
+            "average": snapshot.average,
+            "median": snapshot.median,
         },
         "cost_built": module.cost_built,
         "cost_built_link": module.cost_built_link,
@@ -0,0 +1,272 @@
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+ZERO = Decimal("0.00")
+
+# Carts whose assignments number fewer than this are searched exhaustively
+EXACT_SEARCH_LIMIT = 200_000
+DEFAULT_TIME_BUDGET = 1.0
+MAX_TIME_BUDGET = 5.0
+
+
+@dataclass(frozen=True)
+class SupplierOption:
+    """One way to buy a cart line: a supplier item and its pack-rounded cost."""
+
+    supplier_id: object
+    supplier_item_id: object
+    cost: Decimal
+
+
+@dataclass(frozen=True)
+class SupplierTerms:
+    """
+    What ordering from a supplier costs on top of the items: a flat overhead
+    (shipping, handling) and a minimum order value, the shortfall of which is
+    paid when the items ordered cost less.
+    """
+
+    overhead: Decimal = ZERO
+    minimum: Decimal = ZERO
+
+    def order_cost(self, subtotal):
+        return self.overhead + max(ZERO, self.minimum - subtotal)
+
+
+@dataclass
+class Plan:
+    """The supplier option chosen for every line, and what the order costs."""
+
+    choices: list
+    total: Decimal
+    exact: bool
+
+    def supplier_subtotals(self):
+        return _subtotals(self.choices)
+
+
+def _subtotals(choices):
+    subtotals = {}
+    for option in choices:
+        subtotals[option.supplier_id] = subtotals.get(option.supplier_id, ZERO)
+        subtotals[option.supplier_id] += option.cost
+    return subtotals
+
+
+def plan_cost(choices, terms):
+    """Total cost of buying every line with the given options."""
+    return sum(
+        (
+            subtotal + terms.get(supplier_id, SupplierTerms()).order_cost(subtotal)
+            for supplier_id, subtotal in _subtotals(choices).items()
+        ),
+        start=ZERO,
+    )
+
+
+def _search_space(lines):
+    size = 1
+    for options in lines:
+        size *= len(options)
+        if size >= EXACT_SEARCH_LIMIT:
+            break
+    return size
+
+
+def _solve_exact(lines, terms, deadline, incumbent):
+    """
+    Depth-first branch and bound over the lines with a choice, most expensive
+    first; lines with a single option are bought from it up front. The cost of
+    a partial plan counts its items and the overheads of its suppliers but not
+    minimum order shortfalls, which can only shrink as lines are added, so it
+    never overestimates and is a valid bound.
+
+    Returns (choices, total, finished); finished is False when the deadline
+    stopped the search before it was complete.
+    """
+    subtotals, counts = {}, {}
+    partial = ZERO
+    for options in lines:
+        if len(options) == 1:
+            option = options[0]
+            if not counts.get(option.supplier_id):
+                partial += terms.get(option.supplier_id, SupplierTerms()).overhead
+            subtotals[option.supplier_id] = (
+                subtotals.get(option.supplier_id, ZERO) + option.cost
+            )
+            counts[option.supplier_id] = counts.get(option.supplier_id, 0) + 1
+            partial += option.cost
+
+    order = sorted(
+        (index for index, options in enumerate(lines) if len(options) > 1),
+        key=lambda index: -min(option.cost for option in lines[index]),
+    )
+    sorted_lines = [sorted(lines[index], key=lambda o: o.cost) for index in order]
+    # Cheapest cost of all the lines after each position
+    remaining = [ZERO] * (len(order) + 1)
+    for position in range(len(order) - 1, -1, -1):
+        remaining[position] = remaining[position + 1] + sorted_lines[position][0].cost
+
+    best_choices, best_total = incumbent.choices, incumbent.total
+    chosen = [None] * len(order)
+    visited = 0
+
+    def search(position, partial):
+        nonlocal best_choices, best_total, visited
+        visited += 1
+        if visited % 1024 == 0 and time.monotonic() > deadline:
+            raise TimeoutError
+        if position == len(order):
+            total = partial + sum(
+                (
+                    max(
+                        ZERO,
+                        terms.get(supplier_id, SupplierTerms()).minimum - subtotal,
+                    )
+                    for supplier_id, subtotal in subtotals.items()
+                    if counts[supplier_id]
+                ),
+                start=ZERO,
+            )
+            if total < best_total:
+                best_total = total
+                best_choices = [
+                    options[0] if len(options) == 1 else None for options in lines
+                ]
+                for index, option in zip(order, chosen):
+                    best_choices[index] = option
+            return
+
+        for option in sorted_lines[position]:
+            supplier_id = option.supplier_id
+            cost = option.cost
+            if not counts.get(supplier_id):
+                cost += terms.get(supplier_id, SupplierTerms()).overhead
+            if partial + cost + remaining[position + 1] >= best_total:
+                continue
+            chosen[position] = option
+            subtotals[supplier_id] = subtotals.get(supplier_id, ZERO) + option.cost
+            counts[supplier_id] = counts.get(supplier_id, 0) + 1
+            search(position + 1, partial + cost)
+            subtotals[supplier_id] -= option.cost
+            counts[supplier_id] -= 1
+
+    try:
+        search(0, partial)
+    except TimeoutError:
+        return best_choices, best_total, False
+    return best_choices, best_total, True
+
+
+def _supplier_cost(terms, supplier_id, subtotal, lines_count):
+    if not lines_count:
+        return ZERO
+    return subtotal + terms.get(supplier_id, SupplierTerms()).order_cost(subtotal)
+
+
+def _improve(lines, choices, terms, deadline):
+    """
+    Local search from choices: move single lines to another supplier, and
+    close whole suppliers by moving each of their lines to its cheapest
+    option elsewhere, as long as the total decreases and time remains.
+    """
+    choices = list(choices)
+    subtotals = _subtotals(choices)
+    counts = {}
+    for option in choices:
+        counts[option.supplier_id] = counts.get(option.supplier_id, 0) + 1
+
+    def supplier_cost(supplier_id, subtotal_delta=ZERO, count_delta=0):
+        return _supplier_cost(
+            terms,
+            supplier_id,
+            subtotals.get(supplier_id, ZERO) + subtotal_delta,
+            counts.get(supplier_id, 0) + count_delta,
+        )
+
+    def move(index, option):
+        current = choices[index]
+        subtotals[current.supplier_id] -= current.cost
+        counts[current.supplier_id] -= 1
+        subtotals[option.supplier_id] = subtotals.get(option.supplier_id, ZERO)
+        subtotals[option.supplier_id] += option.cost
+        counts[option.supplier_id] = counts.get(option.supplier_id, 0) + 1
+        choices[index] = option
+
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+
+        # Close a supplier: its lines go to their cheapest other option
+        for supplier_id in [s for s, count in counts.items() if count]:
+            moves = []
+            for index, current in enumerate(choices):
+                if current.supplier_id != supplier_id:
+                    continue
+                alternatives = [
+                    option
+                    for option in lines[index]
+                    if option.supplier_id != supplier_id
+                ]
+                if not alternatives:
+                    break
+                moves.append((index, min(alternatives, key=lambda o: o.cost)))
+            else:
+                before = plan_cost(choices, terms)
+                previous = [(index, choices[index]) for index, _ in moves]
+                for index, option in moves:
+                    move(index, option)
+                if plan_cost(choices, terms) < before:
+                    improved = True
+                else:
+                    for index, option in reversed(previous):
+                        move(index, option)
+            if time.monotonic() > deadline:
+                break
+
+        # Move single lines
+        for index, current in enumerate(choices):
+            for option in lines[index]:
+                if option.supplier_id == current.supplier_id:
+                    continue
+                before = supplier_cost(current.supplier_id) + supplier_cost(
+                    option.supplier_id
+                )
+                after = supplier_cost(
+                    current.supplier_id, -current.cost, -1
+                ) + supplier_cost(option.supplier_id, option.cost, 1)
+                if after < before:
+                    move(index, option)
+                    current = option
+                    improved = True
+            if index % 256 == 0 and time.monotonic() > deadline:
+                break
+
+    return choices
+
+
+def optimize_suppliers(lines, terms=None, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Choose one supplier option per cart line so that the items plus each used
+    supplier's overhead and minimum order shortfall (SupplierTerms, by supplier
+    id) cost the least.
+
+    lines is a list of non-empty lists of SupplierOption. Small carts are
+    solved exactly by branch and bound; larger ones, or exact searches that
+    run out of time_budget seconds, get the best plan found by a local search
+    starting from the cheapest option of every line. Plan.exact tells which.
+    """
+    terms = terms or {}
+    deadline = time.monotonic() + time_budget
+    if not lines:
+        return Plan(choices=[], total=ZERO, exact=True)
+
+    cheapest = [min(options, key=lambda option: option.cost) for options in lines]
+    choices = _improve(lines, cheapest, terms, deadline)
+    plan = Plan(choices=choices, total=plan_cost(choices, terms), exact=False)
+
+    if _search_space(lines) < EXACT_SEARCH_LIMIT and time.monotonic() < deadline:
+        choices, total, finished = _solve_exact(lines, terms, deadline, plan)
+        plan = Plan(choices=choices, total=total, exact=finished)
+    return plan
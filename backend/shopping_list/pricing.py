@@ -0,0 +1,178 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import (
+    Case,
+    DecimalField,
+    F,
+    Max,
+    Min,
+    OrderBy,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Ceil, Coalesce, Greatest
+
+from components.models import Component, ComponentSupplierItem
+from core.exchange_rates import CENT, CURRENCY_CODES, CurrencyConverter
+from shopping_list.models import UserShoppingList
+from shopping_list.optimizer import SupplierOption
+
+RATE_FIELD = DecimalField(max_digits=30, decimal_places=12)
+
+
+def _rate_expression(converter, currency_field="supplier_items__price_currency"):
+    """
+    SQL CASE mapping a supplier item's price currency to its rate into the
+    converter's currency. Currencies without a stored rate map to NULL, so
+    their items are left out of every aggregate.
+    """
+    whens = []
+    for code in CURRENCY_CODES:
+        try:
+            rate = converter.rate_from(code)
+        except ValueError:
+            continue
+        whens.append(
+            When(**{currency_field: code}, then=Value(rate, RATE_FIELD))
+        )
+    return Case(*whens, default=Value(None, RATE_FIELD), output_field=RATE_FIELD)
+
+
+def _quantize(amount):
+    return None if amount is None else amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _cart_quantity(shopping_list, component):
+    """Subquery summing the shopping list quantity of component."""
+    return Subquery(
+        shopping_list.filter(component=component)
+        .order_by()
+        .values("component")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+
+
+def get_cart_pricing(user, target_currency="USD"):
+    """
+    Price a user's shopping list in target_currency with a single aggregate
+    query. For every component, quantity is its summed shopping list quantity
+    and, across the component's supplier items:
+
+    - min_price / max_price: quantity x unit_price at the cheapest / dearest
+      supplier item,
+    - chosen_price: the cheapest cost once quantity is rounded up to whole
+      packs of `pcs`, i.e. ceil(quantity / pcs) x price, bought from
+      chosen_supplier_item.
+
+    Prices are None for components without any priced supplier item. Whole
+    cart totals sum the components that have prices.
+
+    Returns None when the shopping list is empty; raises ValueError for an
+    unknown currency.
+    """
+    if target_currency.upper() not in CURRENCY_CODES:
+        raise ValueError(f"Invalid currency: {target_currency}")
+    converter = CurrencyConverter(target_currency)
+    rate = _rate_expression(converter)
+
+    shopping_list = UserShoppingList.objects.filter(user=user)
+    cart_quantity = _cart_quantity(shopping_list, OuterRef("pk"))
+    quantity = Cast(F("cart_quantity"), RATE_FIELD)
+    packs = Ceil(quantity / Greatest(Coalesce(F("supplier_items__pcs"), 1), 1))
+    unit_cost = quantity * F("supplier_items__unit_price") * rate
+    pack_cost = packs * F("supplier_items__price") * rate
+
+    rows = (
+        Component.objects.filter(pk__in=shopping_list.values("component"))
+        .annotate(cart_quantity=cart_quantity)
+        .values("id", "cart_quantity")
+        .annotate(
+            min_price=Min(unit_cost),
+            max_price=Max(unit_cost),
+            chosen_price=Min(pack_cost),
+            # Items without a price or a rate have a NULL cost, which every
+            # aggregate skips and which sorts last
+            supplier_items_by_cost=ArrayAgg(
+                "supplier_items__id", ordering=OrderBy(pack_cost, nulls_last=True)
+            ),
+        )
+        .order_by("description", "id")
+    )
+
+    components = []
+    for row in rows:
+        chosen_price = _quantize(row["chosen_price"])
+        components.append(
+            {
+                "component_id": row["id"],
+                "quantity": row["cart_quantity"],
+                "min_price": _quantize(row["min_price"]),
+                "max_price": _quantize(row["max_price"]),
+                "chosen_price": chosen_price,
+                "chosen_supplier_item": (
+                    row["supplier_items_by_cost"][0]
+                    if chosen_price is not None
+                    else None
+                ),
+            }
+        )
+    if not components:
+        return None
+
+    def total(key):
+        return sum(
+            (component[key] for component in components if component[key] is not None),
+            start=Decimal("0.00"),
+        )
+
+    return {
+        "currency": converter.target_currency,
+        "total_min_price": total("min_price"),
+        "total_max_price": total("max_price"),
+        "total_chosen_price": total("chosen_price"),
+        "components": components,
+    }
+
+
+def get_cart_supplier_options(user, target_currency="USD"):
+    """
+    Return {component_id: [SupplierOption]}: every way to buy each component
+    of a user's shopping list, costing ceil(quantity / pcs) x price converted
+    into target_currency, read with a single query. Supplier items without a
+    price or a rate are left out, as are components without any priced item.
+
+    Raises ValueError for an unknown currency.
+    """
+    if target_currency.upper() not in CURRENCY_CODES:
+        raise ValueError(f"Invalid currency: {target_currency}")
+    converter = CurrencyConverter(target_currency)
+
+    shopping_list = UserShoppingList.objects.filter(user=user)
+    quantity = Cast(
+        _cart_quantity(shopping_list, OuterRef("component")), RATE_FIELD
+    )
+    packs = Ceil(quantity / Greatest(Coalesce(F("pcs"), 1), 1))
+    rows = (
+        ComponentSupplierItem.objects.filter(
+            component__in=shopping_list.values("component")
+        )
+        .annotate(
+            cost=packs * F("price") * _rate_expression(converter, "price_currency")
+        )
+        .filter(cost__isnull=False)
+        .order_by("component_id", "cost", "id")
+        .values_list("component_id", "supplier_id", "id", "cost")
+    )
+
+    options = defaultdict(list)
+    for component_id, supplier_id, supplier_item_id, cost in rows:
+        options[component_id].append(
+            SupplierOption(supplier_id, supplier_item_id, _quantize(cost))
+        )
+    return dict(options)
@@ -1,5 +1,5 @@
 from modules.serializers import ModuleSerializer
-from components.serializers import ComponentSerializer
+from components.serializers import CompactComponentSerializer, ComponentSerializer
 from shopping_list.models import UserShoppingList, UserShoppingListSaved
 from accounts.serializers import UserNotesSerializer
 from rest_framework import serializers
@@ -15,6 +15,16 @@ class UserShoppingListSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class CompactUserShoppingListSerializer(serializers.ModelSerializer):
+    module = ModuleSerializer(allow_null=True, read_only=True)
+    module_name = serializers.CharField(source="module.name", allow_null=True)
+    component = CompactComponentSerializer(read_only=True)
+
+    class Meta:
+        model = UserShoppingList
+        fields = "__all__"
+
+
 class UserShoppingListSavedSerializer(serializers.ModelSerializer):
     module = ModuleSerializer(allow_null=True)
     module_name = serializers.CharField(source="module.name", allow_null=True)
@@ -0,0 +1,83 @@
+import itertools
+import random
+import time
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from core.management.commands.benchmark_supplier_optimizer import synthetic_cart
+from shopping_list.optimizer import (
+    SupplierOption,
+    SupplierTerms,
+    optimize_suppliers,
+    plan_cost,
+)
+
+
+class OptimizeSuppliersTests(SimpleTestCase):
+    def test_consolidates_orders(self):
+        # Tayda is cheaper per line, but one Mouser order saves the overhead
+        lines = [
+            [
+                SupplierOption("tayda", "t1", Decimal("1.00")),
+                SupplierOption("mouser", "m1", Decimal("1.50")),
+            ],
+            [SupplierOption("mouser", "m2", Decimal("3.00"))],
+        ]
+        terms = {
+            "tayda": SupplierTerms(overhead=Decimal("5.00")),
+            "mouser": SupplierTerms(overhead=Decimal("5.00")),
+        }
+        plan = optimize_suppliers(lines, terms)
+        self.assertTrue(plan.exact)
+        self.assertEqual(
+            [option.supplier_item_id for option in plan.choices], ["m1", "m2"]
+        )
+        self.assertEqual(plan.total, Decimal("9.50"))
+
+    def test_minimum_order_is_topped_up(self):
+        lines = [
+            [
+                SupplierOption("tayda", "t1", Decimal("2.00")),
+                SupplierOption("mouser", "m1", Decimal("4.00")),
+            ]
+        ]
+        terms = {"tayda": SupplierTerms(minimum=Decimal("10.00"))}
+        plan = optimize_suppliers(lines, terms)
+        self.assertEqual(plan.choices[0].supplier_item_id, "m1")
+        self.assertEqual(plan.total, Decimal("4.00"))
+
+    def test_small_carts_are_solved_exactly(self):
+        rng = random.Random(0)
+        terms = {
+            supplier: SupplierTerms(Decimal("5.00"), Decimal("10.00"))
+            for supplier in range(4)
+        }
+        for _ in range(25):
+            lines = synthetic_cart(rng, rng.randint(1, 7), 4)
+            best = min(
+                plan_cost(choices, terms) for choices in itertools.product(*lines)
+            )
+            plan = optimize_suppliers(lines, terms)
+            self.assertTrue(plan.exact)
+            self.assertEqual(plan.total, best)
+            self.assertEqual(plan_cost(plan.choices, terms), best)
+
+    def test_large_carts_respect_the_time_budget(self):
+        rng = random.Random(0)
+        lines = synthetic_cart(rng, 2000, 6)
+        terms = {
+            supplier: SupplierTerms(Decimal("7.50"), Decimal("20.00"))
+            for supplier in range(6)
+        }
+        cheapest = plan_cost(
+            [min(line, key=lambda option: option.cost) for line in lines], terms
+        )
+
+        started = time.monotonic()
+        plan = optimize_suppliers(lines, terms, time_budget=0.5)
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertFalse(plan.exact)
+        self.assertEqual(len(plan.choices), 2000)
+        self.assertLessEqual(plan.total, cheapest)
+        self.assertEqual(plan.total, plan_cost(plan.choices, terms))
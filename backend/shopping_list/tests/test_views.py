@@ -1,6 +1,8 @@
 import uuid
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from accounts.models import ExchangeRate
+from inventory.models import InventoryHistoryEvent, UserInventory
 from shopping_list.models import UserShoppingList
 from components.models import (
     Category,
@@ -899,3 +901,209 @@ class GetUserShoppingListQuantityTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)  # Expect 200
         self.assertIn("quantity", response.data)
         self.assertEqual(response.data["quantity"], 0)  # Expect quantity 0
+
+
+# Url: /api/shopping-list/inventory/add/
+# Frontend: useAddAllToInventoryMutation.ts
+class AddAllUserShoppingListToInventoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.login(username="testuser", password="password")
+
+        manufacturer = Manufacturer.objects.create(name="Module Manufacturer")
+        component_type = Types.objects.create(name="Resistor")
+        self.resistor = Component.objects.create(
+            description="Resistor", type=component_type, mounting_style="th"
+        )
+        self.capacitor = Component.objects.create(
+            description="Capacitor", type=component_type, mounting_style="th"
+        )
+        modules = [
+            Module.objects.create(name=f"Module {i}", manufacturer=manufacturer)
+            for i in range(2)
+        ]
+        # The resistor is on the list twice, once per module
+        for module, quantity in zip(modules, (3, 4)):
+            UserShoppingList.objects.create(
+                user=self.user, component=self.resistor, module=module, quantity=quantity
+            )
+        UserShoppingList.objects.create(
+            user=self.user, component=self.capacitor, quantity=5
+        )
+        self.inventory = UserInventory.objects.create(
+            user=self.user, component=self.resistor, quantity=10, location=["Shelf"]
+        )
+        self.url = reverse("add_all_user_shopping_list_to_inventory")
+
+    def test_quantities_are_added_once_per_component(self):
+        # Session, user, savepoint pair, aggregate, locked inventory read,
+        # bulk update, bulk insert, history and shopping list delete
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                self.url, {str(self.resistor.id): ["Shelf"]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["processed_items"], 3)
+
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity, 17)
+        self.assertEqual(self.inventory.old_quantity, 10)
+        capacitor = UserInventory.objects.get(user=self.user, component=self.capacitor)
+        self.assertEqual(capacitor.quantity, 5)
+        self.assertIsNone(capacitor.location)
+        self.assertFalse(UserShoppingList.objects.filter(user=self.user).exists())
+
+        history = InventoryHistoryEvent.objects.filter(user=self.user).order_by(
+            "quantity_before", "quantity_after"
+        )
+        self.assertEqual(
+            [(event.quantity_before, event.quantity_after) for event in history],
+            [(0, 5), (0, 10), (10, 17)],
+        )
+
+    def test_invalid_payload_changes_nothing(self):
+        response = self.client.post(self.url, ["Shelf"], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UserShoppingList.objects.filter(user=self.user).count(), 3)
+
+
+# Url: /api/shopping-list/pricing/
+# Frontend: none yet
+class GetUserShoppingListPricingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.client.force_authenticate(user=self.user)
+        ExchangeRate.objects.create(
+            base_currency="EUR", target_currency="USD", rate=Decimal("1.10")
+        )
+
+        component_type = Types.objects.create(name="Resistor")
+        self.resistor = Component.objects.create(
+            description="10kΩ Resistor", type=component_type
+        )
+        self.jack = Component.objects.create(
+            description="Thonkiconn Jack", type=component_type
+        )
+        module = Module.objects.create(
+            name="Test Module",
+            manufacturer=Manufacturer.objects.create(name="Module Manufacturer"),
+        )
+        bom_item = ModuleBomListItem.objects.create(
+            description="Resistor BOM Item", module=module, type=component_type
+        )
+        UserShoppingList.objects.create(
+            user=self.user, component=self.resistor, quantity=2
+        )
+        UserShoppingList.objects.create(
+            user=self.user,
+            component=self.resistor,
+            module=module,
+            bom_item=bom_item,
+            quantity=3,
+        )
+        UserShoppingList.objects.create(user=self.user, component=self.jack, quantity=1)
+
+        suppliers = [
+            ComponentSupplier.objects.create(
+                name=f"Supplier {index}",
+                short_name=f"S{index}",
+                url=f"https://supplier{index}.example.com",
+            )
+            for index in range(3)
+        ]
+        ComponentSupplierItem.objects.create(
+            component=self.resistor,
+            supplier=suppliers[0],
+            supplier_item_no="R-1",
+            price=Decimal("1.00"),
+            pcs=1,
+        )
+        self.reel = ComponentSupplierItem.objects.create(
+            component=self.resistor,
+            supplier=suppliers[1],
+            supplier_item_no="R-10",
+            price=Decimal("4.00"),
+            pcs=10,
+        )
+        self.eur_pack = ComponentSupplierItem.objects.create(
+            component=self.resistor,
+            supplier=suppliers[2],
+            supplier_item_no="R-5",
+            price=Decimal("2.00"),
+            price_currency="EUR",
+            pcs=5,
+        )
+
+    def test_cart_pricing(self):
+        # The rate matrix is process-local, load it first
+        self.client.get(reverse("user-shopping-list-pricing"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user-shopping-list-pricing"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        resistor, jack = response.data["components"]
+        # 5 resistors: 5 x 0.40 at the cheapest unit price, 5 x 1.00 at the
+        # dearest, one pack of 5 for 2.00 EUR (2.20 USD) once packs are whole
+        self.assertEqual(resistor["component_id"], self.resistor.id)
+        self.assertEqual(resistor["quantity"], 5)
+        self.assertEqual(resistor["min_price"], Decimal("2.00"))
+        self.assertEqual(resistor["max_price"], Decimal("5.00"))
+        self.assertEqual(resistor["chosen_price"], Decimal("2.20"))
+        self.assertEqual(resistor["chosen_supplier_item"], self.eur_pack.id)
+        self.assertIsNone(jack["chosen_price"])
+        self.assertIsNone(jack["chosen_supplier_item"])
+
+        self.assertEqual(response.data["currency"], "USD")
+        self.assertEqual(response.data["total_min_price"], Decimal("2.00"))
+        self.assertEqual(response.data["total_max_price"], Decimal("5.00"))
+        self.assertEqual(response.data["total_chosen_price"], Decimal("2.20"))
+
+    def test_cart_pricing_in_other_currency(self):
+        UserShoppingList.objects.filter(component=self.resistor).update(quantity=5)
+
+        response = self.client.get(
+            reverse("user-shopping-list-pricing"), {"currency": "EUR"}
+        )
+        resistor = response.data["components"][0]
+        # 10 resistors: one reel of 10 for 4.00 USD beats two EUR packs
+        self.assertEqual(resistor["chosen_supplier_item"], self.reel.id)
+        self.assertEqual(resistor["chosen_price"], Decimal("3.64"))
+
+        response = self.client.get(
+            reverse("user-shopping-list-pricing"), {"currency": "XXX"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cart_pricing_empty_shopping_list(self):
+        UserShoppingList.objects.all().delete()
+        response = self.client.get(reverse("user-shopping-list-pricing"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_optimize_suppliers(self):
+        # Ordering from the EUR supplier costs 5.00 more: the reel is cheaper.
+        # The rate matrix, then every supplier option of the cart
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse("user-shopping-list-optimize"),
+                {
+                    "suppliers": {
+                        str(self.eur_pack.supplier_id): {"overhead": "5.00"},
+                    }
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["exact"])
+        self.assertEqual(response.data["total"], Decimal("4.00"))
+        # The jack has no supplier items
+        [resistor] = response.data["components"]
+        self.assertEqual(resistor["component_id"], self.resistor.id)
+        self.assertEqual(resistor["supplier_item_id"], self.reel.id)
+
+        response = self.client.post(
+            reverse("user-shopping-list-optimize"),
+            {"suppliers": {"not-a-uuid": {"overhead": "5.00"}}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,6 +1,7 @@
 import bleach
+import json
 import logging
-from django.db.models import Min, Max, F, Sum, Case, When, Value
+from django.db.models import Min, Max, F, Sum, Case, When, Value, Count, Q
 from accounts.models import UserNotes, CustomUser
 from components.models import Component, ComponentSupplierItem
 from django.core.exceptions import ObjectDoesNotExist
@@ -8,14 +9,24 @@ from django.db import IntegrityError
 from django.db.models import F, FloatField, Sum
 from django.db.models.functions import Cast
 from django.utils import timezone
-from inventory.models import UserInventory
+from inventory.history import build_history_event, record_inventory_history
+from inventory.models import UserInventory, sanitize_location
 from modules.models import Module, ModuleBomListItem
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from shopping_list.models import UserShoppingList, UserShoppingListSaved
+from shopping_list.optimizer import (
+    DEFAULT_TIME_BUDGET,
+    MAX_TIME_BUDGET,
+    SupplierTerms,
+    optimize_suppliers,
+)
+from shopping_list.pricing import get_cart_pricing, get_cart_supplier_options
+from components.serializers import supplier_item_price_context
 from shopping_list.serializers import (
+    CompactUserShoppingListSerializer,
     UserShoppingListSavedSerializer,
     UserShoppingListSerializer,
 )
@@ -35,10 +46,26 @@ class UserShoppingListView(APIView):
         Retrieve the user's own shopping list grouped by module.
         """
         user = request.user
-        shopping_list = UserShoppingList.objects.filter(user=user).order_by(
-            "module__name"
+        shopping_list = list(
+            UserShoppingList.objects.filter(user=user)
+            .order_by("module__name")
+            .select_related(
+                "module__manufacturer", "component__manufacturer", "component__type"
+            )
+            .prefetch_related("component__supplier_items__supplier")
+        )
+        serializer_class = (
+            CompactUserShoppingListSerializer
+            if request.query_params.get("compact") == "1"
+            else UserShoppingListSerializer
+        )
+        serializer = serializer_class(
+            shopping_list,
+            many=True,
+            context=supplier_item_price_context(
+                item.component for item in shopping_list
+            ),
         )
-        serializer = UserShoppingListSerializer(shopping_list, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, component_pk):
@@ -644,6 +671,103 @@ def get_user_shopping_list_total_component_price(request, component_pk):
     return Response(response_data, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_user_shopping_list_pricing(request):
+    """
+    Price the whole shopping list in one aggregate query: per component and
+    whole-cart min/max totals from unit prices, and the cheapest total once
+    quantities are rounded up to whole packs, with the supplier item to buy
+    (see shopping_list.pricing). Prices are converted into ?currency=
+    (default USD).
+    """
+    try:
+        pricing = get_cart_pricing(
+            request.user, request.query_params.get("currency", "USD")
+        )
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if pricing is None:
+        return Response(
+            {"detail": "No components in shopping list."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(pricing, status=status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def optimize_shopping_list_suppliers(request):
+    """
+    Choose a supplier item for every component of the shopping list so that
+    the whole order costs the least, including whole packs and the cost of
+    ordering from each supplier (see shopping_list.optimizer).
+
+    The body may set "currency" (default USD), "time_budget" in seconds
+    (default DEFAULT_TIME_BUDGET, at most MAX_TIME_BUDGET) and "suppliers":
+    {supplier_id: {"overhead": amount, "minimum": amount}} with the flat cost
+    of an order from that supplier and its minimum order value. Components
+    without a priced supplier item are left out.
+    """
+    try:
+        terms = {
+            UUID(str(supplier_id)): SupplierTerms(
+                overhead=Decimal(str(supplier.get("overhead", 0))),
+                minimum=Decimal(str(supplier.get("minimum", 0))),
+            )
+            for supplier_id, supplier in request.data.get("suppliers", {}).items()
+        }
+        time_budget = min(
+            float(request.data.get("time_budget", DEFAULT_TIME_BUDGET)),
+            MAX_TIME_BUDGET,
+        )
+        options = get_cart_supplier_options(
+            request.user, request.data.get("currency", "USD")
+        )
+    except (AttributeError, ArithmeticError, TypeError, ValueError) as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not options:
+        return Response(
+            {"detail": "No priced components in shopping list."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    component_ids = list(options)
+    plan = optimize_suppliers(
+        [options[component_id] for component_id in component_ids],
+        terms,
+        time_budget=max(time_budget, 0),
+    )
+    suppliers = [
+        {
+            "supplier_id": supplier_id,
+            "subtotal": subtotal,
+            "order_cost": terms.get(supplier_id, SupplierTerms()).order_cost(subtotal),
+        }
+        for supplier_id, subtotal in plan.supplier_subtotals().items()
+    ]
+    return Response(
+        {
+            "currency": request.data.get("currency", "USD").upper(),
+            "total": plan.total,
+            "exact": plan.exact,
+            "suppliers": suppliers,
+            "components": [
+                {
+                    "component_id": component_id,
+                    "supplier_id": option.supplier_id,
+                    "supplier_item_id": option.supplier_item_id,
+                    "cost": option.cost,
+                }
+                for component_id, option in zip(component_ids, plan.choices)
+            ],
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
 # tests
 @permission_classes([IsAuthenticated])
 @api_view(["GET"])
@@ -720,7 +844,6 @@ def add_component_to_inventory(request, component_pk):
 @permission_classes([IsAuthenticated])
 def add_all_user_shopping_list_to_inventory(request):
     user = request.user
-    shopping_list = UserShoppingList.objects.filter(user=user)
 
     # Ensure location_list is a dictionary
     if not isinstance(request.data, dict):
@@ -731,55 +854,90 @@ def add_all_user_shopping_list_to_inventory(request):
 
     location_list = request.data
 
-    for shopping_list_item in shopping_list:
-        component_id = str(shopping_list_item.component.id)
-        shopping_list_item_location = location_list.get(component_id, None)
-
-        if shopping_list_item_location is not None:
-            user_inventory_items = UserInventory.objects.filter(
-                user=user,
-                component_id=shopping_list_item.component.id,
-                location__exact=shopping_list_item_location,
+    with transaction.atomic():
+        # Total quantity of every component on the user's shopping list
+        shopping_list = list(
+            UserShoppingList.objects.filter(user=user)
+            .values("component_id")
+            .annotate(quantity=Sum("quantity"), line_count=Count("id"))
+        )
+        targets = {
+            row["component_id"]: (
+                sanitize_location(location_list.get(str(row["component_id"]))),
+                row["quantity"],
             )
-        else:
-            user_inventory_items = UserInventory.objects.filter(
-                user=user,
-                component__id=shopping_list_item.component.id,
-                location__isnull=True,
+            for row in shopping_list
+        }
+
+        # Lock the inventory rows the shopping list adds to, in one query
+        inventory_filter = Q()
+        for component_id, (location, _) in targets.items():
+            if location is None:
+                inventory_filter |= Q(component_id=component_id, location__isnull=True)
+            else:
+                inventory_filter |= Q(component_id=component_id, location=location)
+        existing = {}
+        if targets:
+            for item in (
+                UserInventory.objects.select_for_update()
+                .filter(inventory_filter, user=user)
+                .order_by("pk")
+            ):
+                existing.setdefault(
+                    (item.component_id, _location_key(item.location)), item
+                )
+
+        time_now = timezone.now()
+        to_update, to_create, history_events = [], [], []
+        for component_id, (location, quantity) in targets.items():
+            item = existing.get((component_id, _location_key(location)))
+            if item is not None:
+                item.old_quantity = item.quantity
+                item.old_location = item.location
+                item.quantity += quantity
+                item.datetime_updated = time_now
+                to_update.append(item)
+            else:
+                # Create a new inventory item with the specified location and quantity
+                item = UserInventory(
+                    user=user,
+                    component_id=component_id,
+                    quantity=quantity,
+                    location=location,
+                )
+                to_create.append(item)
+            history_events.append(
+                build_history_event(
+                    user.id,
+                    component_id,
+                    item.old_quantity,
+                    item.quantity,
+                    item.old_location,
+                    item.location,
+                )
             )
 
-        # Get the total quantity of a component from user's shopping list
-        shopping_list_quantity = UserShoppingList.objects.filter(
-            user=user, component__id=shopping_list_item.component.id
+        UserInventory.objects.bulk_update(
+            to_update, ["quantity", "old_quantity", "old_location", "datetime_updated"]
         )
+        UserInventory.objects.bulk_create(to_create)
+        record_inventory_history(history_events)
 
-        quantity = sum(item.quantity for item in shopping_list_quantity)
-
-        # If the user has that item in their inventory
-        if user_inventory_items.exists():
-            inventory_item = user_inventory_items.first()
-            inventory_item.quantity += quantity
-            inventory_item.save()
-        else:
-            # Create a new inventory item with the specified location and quantity
-            UserInventory.objects.create(
-                user=user,
-                component_id=shopping_list_item.component.id,
-                quantity=quantity,
-                location=shopping_list_item_location,
-            )
-
-    UserShoppingList.objects.filter(user=user).delete()
+        UserShoppingList.objects.filter(user=user).delete()
 
     return Response(
         {
             "detail": "Inventory updated successfully.",
-            "processed_items": len(shopping_list),
+            "processed_items": sum(row["line_count"] for row in shopping_list),
         },
         status=status.HTTP_200_OK,
     )
 
 
+def _location_key(location):
+    return json.dumps(location, sort_keys=True)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def archive_shopping_list(request):
@@ -85,68 +85,69 @@ const UserInventoryTree: React.FC = () => {
         level: number = 0,
         path: string = ""
       ) => {
-        Object.keys(node).forEach((key) => {
-          if (key !== "component" && key !== "quantity") {
-            if (node[key] && typeof node[key] === "object") {
-              const newPath = normalizePath(
-                path ? `${path}/${key.trim()}` : key.trim()
+        // Child locations are nested under "children", see inventory/trees.py
+        const children: Record<string, any> = node.children || {};
+        Object.keys(children).forEach((key) => {
+          const child = children[key];
+          if (child && typeof child === "object") {
+            const newPath = normalizePath(
+              path ? `${path}/${key.trim()}` : key.trim()
+            );
+
+            const nodeId = newPath.replace(/\/{2,}/g, "/").trim();
+
+            const componentsList = Object.keys(child)
+              .filter(
+                (subKey) => subKey === "component" || subKey === "quantity"
+              )
+              .map((subKey) => child[subKey])
+              .join(", ");
+
+            const adjustedLevel = Math.min(level, maxLevel);
+
+            const color = colorScale(adjustedLevel / maxLevel).hex();
+            const fontSize = 8 + (maxLevel - adjustedLevel) * 6;
+            const currentNodeCount = (nodeLinkCountMap.get(nodeId) || 0) + 1;
+            nodeLinkCountMap.set(nodeId, currentNodeCount);
+            const nodeSize = 10 + currentNodeCount * 20;
+
+            if (nodeMap.has(nodeId)) {
+              const existingNodeIndex = nodes.findIndex(
+                (n) => n.id === nodeId
               );
+              if (existingNodeIndex !== -1) {
+                nodes[existingNodeIndex].value = nodeSize;
+              }
+            } else {
+              nodes.push({
+                color,
+                font: { size: fontSize },
+                id: nodeId,
+                label: key,
+                title: componentsList || key,
+                value: nodeSize,
+              });
+              nodeMap.set(nodeId, true);
+            }
 
-              const nodeId = newPath.replace(/\/{2,}/g, "/").trim();
-
-              const componentsList = Object.keys(node[key])
-                .filter(
-                  (subKey) => subKey === "component" || subKey === "quantity"
-                )
-                .map((subKey) => node[key][subKey])
-                .join(", ");
-
-              const adjustedLevel = Math.min(level, maxLevel);
-
-              const color = colorScale(adjustedLevel / maxLevel).hex();
-              const fontSize = 8 + (maxLevel - adjustedLevel) * 6;
-              const currentNodeCount = (nodeLinkCountMap.get(nodeId) || 0) + 1;
-              nodeLinkCountMap.set(nodeId, currentNodeCount);
-              const nodeSize = 10 + currentNodeCount * 20;
+            if (parentId) {
+              const edgeId = `${parentId}->${nodeId}`;
+              const currentCount = (edgeCountMap.get(edgeId) || 0) + 1;
+              edgeCountMap.set(edgeId, currentCount);
 
-              if (nodeMap.has(nodeId)) {
-                const existingNodeIndex = nodes.findIndex(
-                  (n) => n.id === nodeId
-                );
-                if (existingNodeIndex !== -1) {
-                  nodes[existingNodeIndex].value = nodeSize;
-                }
+              if (currentCount === 1 && parentId !== nodeId) {
+                edges.push({ from: parentId, to: nodeId, value: currentCount });
               } else {
-                nodes.push({
-                  color,
-                  font: { size: fontSize },
-                  id: nodeId,
-                  label: key,
-                  title: componentsList || key,
-                  value: nodeSize,
-                });
-                nodeMap.set(nodeId, true);
-              }
-
-              if (parentId) {
-                const edgeId = `${parentId}->${nodeId}`;
-                const currentCount = (edgeCountMap.get(edgeId) || 0) + 1;
-                edgeCountMap.set(edgeId, currentCount);
-
-                if (currentCount === 1 && parentId !== nodeId) {
-                  edges.push({ from: parentId, to: nodeId, value: currentCount });
-                } else {
-                  const existingEdgeIndex = edges.findIndex(
-                    (edge) => edge.from === parentId && edge.to === nodeId
-                  );
-                  if (existingEdgeIndex !== -1) {
-                    edges[existingEdgeIndex].value = currentCount;
-                  }
+                const existingEdgeIndex = edges.findIndex(
+                  (edge) => edge.from === parentId && edge.to === nodeId
+                );
+                if (existingEdgeIndex !== -1) {
+                  edges[existingEdgeIndex].value = currentCount;
                 }
               }
-
-              traverseTree(node[key], nodeId, level + 1, newPath);
             }
+
+            traverseTree(child, nodeId, level + 1, newPath);
           }
         });
       };
@@ -1,3 +1,4 @@
+import Cookies from 'js-cookie';
 import axios from 'axios';
 import removeAfterUnderscore from "../utils/removeAfterUnderscore";
 import { useQuery } from "@tanstack/react-query";
@@ -5,13 +6,33 @@ import { useQuery } from "@tanstack/react-query";
 const useGetInventoryLocationsMultiple = (componentPks) => {
   // Assuming componentPks is an array of PKs
   const componentPksCleaned = componentPks.map(pk => removeAfterUnderscore(pk));
-  
+
   const fetchComponentLocations = async () => {
     try {
-      // Construct query parameters for multiple component PKs
-      const queryParams = componentPksCleaned.map(pk => `component_pks=${pk}`).join('&');
-      const response = await axios.get(`/api/inventory/locations/?${queryParams}`);
-      return response.data; // Ensure to return response.data to align with common usage
+      // POST the PKs so whole BOMs fit in one request; the response has one
+      // column per field ({ component_id, location, quantity })
+      const response = await axios.post(
+        '/api/inventory/locations/',
+        { component_pks: componentPksCleaned },
+        {
+          headers: {
+            'X-CSRFToken': Cookies.get('csrftoken'),
+          },
+          withCredentials: true,
+        }
+      );
+      const { component_id, location, quantity } = response.data;
+
+      // Group the rows by component, as { [pk]: [{ component: { id, location, quantity } }] }
+      const locationsByComponent = Object.fromEntries(
+        componentPksCleaned.map(pk => [pk, []])
+      );
+      component_id.forEach((id, index) => {
+        (locationsByComponent[id] ||= []).push({
+          component: { id, location: location[index], quantity: quantity[index] },
+        });
+      });
+      return locationsByComponent;
     } catch (error) {
       throw new Error(error.response.data.error);
     }
@@ -21,7 +42,7 @@ const useGetInventoryLocationsMultiple = (componentPks) => {
     queryKey: ['componentLocations', ...componentPksCleaned],
     queryFn: fetchComponentLocations
   });
-  
+
   return { inventoryData, isLoading, isError, error };
 };
 